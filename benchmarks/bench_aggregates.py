@@ -0,0 +1,88 @@
+"""
+Dashboard Aggregates Benchmark
+Chart counts for one filter selection: value_counts over the loaded article
+frame (the old dashboard path) vs a query on the store's agg_counts table,
+at growing corpus sizes
+
+Run from the project root:
+    python benchmarks/bench_aggregates.py --sizes 1000 10000 100000
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from email.utils import formatdate
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+from article_store import ArticleStore
+from categorize_real_articles import ECONOMIC_CATEGORIES
+from mock_feed_server import TOPICS
+
+def build_store(path, n, n_sources=50, days=90, seed=7):
+    """Synthetic labeled corpus: n articles over `days` days from n_sources publishers"""
+    rng = random.Random(seed)
+    now = time.time()
+    store = ArticleStore(path)
+    articles, labels = [], {}
+    for i in range(n):
+        article_id = f"S{i:07d}"
+        articles.append({
+            'id': article_id,
+            'title': f"{TOPICS[i % len(TOPICS)]} ({i})",
+            'description': f"Synthetic article {i}",
+            'source': f"Source {rng.randrange(n_sources)}",
+            'date': formatdate(now - rng.uniform(0, days * 86400), usegmt=True),
+            'scraped_date': '2026-01-01 00:00:00',
+        })
+        labels[article_id] = rng.choice(ECONOMIC_CATEGORIES)
+    store.append_articles(articles)
+    store.append_labels(labels)
+    return store
+
+def _best_of(fn, repeat=5):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1_000, 10_000, 100_000])
+    args = parser.parse_args()
+
+    categories = ECONOMIC_CATEGORIES[:5]
+    sources = [f"Source {i}" for i in range(0, 50, 2)]
+
+    print("=" * 70)
+    print("DASHBOARD AGGREGATES BENCHMARK (one filter change = category + source counts)")
+    print("=" * 70)
+    print(f"{'articles':>10} {'load frame':>12} {'value_counts':>14} {'agg_counts':>12}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in args.sizes:
+            store = build_store(os.path.join(tmp, f"bench_{n}.sqlite"), n)
+
+            start = time.perf_counter()
+            df = store.read(['source', 'llm_category'], labeled=True)
+            load_seconds = time.perf_counter() - start
+
+            def scan():
+                filtered = df[df['llm_category'].isin(categories) & df['source'].isin(sources)]
+                filtered['llm_category'].value_counts()
+                filtered['source'].value_counts()
+
+            def query():
+                store.aggregate('llm_category', categories=categories, sources=sources)
+                store.aggregate('source', categories=categories, sources=sources)
+
+            print(f"{n:>10,} {load_seconds * 1000:>10.0f}ms {_best_of(scan) * 1000:>12.1f}ms "
+                  f"{_best_of(query) * 1000:>10.1f}ms")
+            store.close()
+
+if __name__ == "__main__":
+    main()
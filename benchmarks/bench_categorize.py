@@ -0,0 +1,87 @@
+"""
+Categorization Benchmark
+Old blocking loop (one request at a time + fixed sleep) vs the async engine,
+against the local mock OpenAI server with latency and random 429s
+
+Run from the project root:
+    python benchmarks/bench_categorize.py --articles 200 --latency 0.2 --rate-429 0.05
+    python benchmarks/bench_categorize.py --batch-size 10 --bad-label-rate 0.05
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+from openai import OpenAI
+
+from async_categorizer import categorize_articles
+from categorize_real_articles import categorize_article
+from mock_feed_server import TOPICS
+from mock_openai_server import MockOpenAIServer, classify
+
+def synthetic_articles(n):
+    return [
+        (f"{TOPICS[i % len(TOPICS)]} ({i})", f"Analysts react to story {i}.")
+        for i in range(n)
+    ]
+
+def categorize_sequential(articles, base_url, delay=0.5):
+    """The pre-async loop: blocking call per article, fixed sleep between calls"""
+    client = OpenAI(api_key='mock', base_url=base_url)
+    categories = []
+    for title, description in articles:
+        categories.append(categorize_article(client, title, description))
+        time.sleep(delay)
+    return categories
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--articles', type=int, default=200)
+    parser.add_argument('--latency', type=float, default=0.2)
+    parser.add_argument('--rate-429', type=float, default=0.05)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--rpm', type=int, default=3000)
+    parser.add_argument('--batch-size', type=int, default=1, help="articles per request in the async engine")
+    parser.add_argument('--bad-label-rate', type=float, default=0.0,
+                        help="fraction of batch items the mock labels invalidly")
+    parser.add_argument('--delay', type=float, default=0.5, help="sleep between calls in the old loop (s)")
+    parser.add_argument('--sequential-sample', type=int, default=20,
+                        help="articles timed with the old loop (extrapolated)")
+    args = parser.parse_args()
+
+    articles = synthetic_articles(args.articles)
+    expected = [classify(title) for title, _ in articles]
+
+    with MockOpenAIServer(latency=args.latency, rate_429=args.rate_429, retry_after=1,
+                          bad_label_rate=args.bad_label_rate) as server:
+        sample = articles[:args.sequential_sample]
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            categorize_sequential(sample, server.base_url, delay=args.delay)
+        sequential_rate = len(sample) / (time.perf_counter() - start)
+
+        start = time.perf_counter()
+        results = categorize_articles(articles, api_key='mock', base_url=server.base_url,
+                                      concurrency=args.concurrency, rpm=args.rpm,
+                                      batch_size=args.batch_size)
+        async_seconds = time.perf_counter() - start
+        throttled = server.throttled
+
+    async_rate = len(articles) / async_seconds
+    print("=" * 70)
+    print("CATEGORIZATION BENCHMARK")
+    print("=" * 70)
+    print(f"Mock API: {args.latency}s latency, {args.rate_429:.0%} random 429s")
+    print(f"Sequential (old loop):  {sequential_rate:7.1f} articles/s  ({len(sample)} sampled)")
+    print(f"Async engine (batch {args.batch_size:>3}): {async_rate:7.1f} articles/s  ({len(articles)} articles, "
+          f"{throttled} throttled responses)")
+    print(f"Speedup:                {async_rate / sequential_rate:7.1f}x")
+    print(f"Results in input order and correct: {results == expected}")
+
+if __name__ == "__main__":
+    main()
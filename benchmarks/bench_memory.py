@@ -0,0 +1,109 @@
+"""
+Article Memory Benchmark
+Resident size and load time of the old representation - pd.read_csv of
+categorized_real_articles.csv, every column as object strings including the
+raw content HTML - vs the store's compact read: categorical source/category,
+parsed datetime64 dates, and no text beyond the title. The dashboard fetches
+description/link only for the page on screen, so that is measured too.
+
+Rows mimic the scraped Google News items (long redirect links repeated in
+the description and content HTML).
+
+Run from the project root:
+    python benchmarks/bench_memory.py --sizes 100000 1000000
+"""
+
+import argparse
+import gc
+import os
+import random
+import sys
+import tempfile
+import time
+from email.utils import formatdate
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+from article_store import ArticleStore
+from categorize_real_articles import ECONOMIC_CATEGORIES
+from mock_feed_server import TOPICS
+
+COMPACT_COLUMNS = ['id', 'title', 'source', 'published', 'llm_category']
+PAGE_SIZE = 25
+
+def synthetic_rows(start, stop, rng, now, n_sources=50):
+    """Legacy CSV rows sized like the real scrape (~80 char titles, ~190 char links)"""
+    rows = []
+    for i in range(start, stop):
+        source = f"Source {rng.randrange(n_sources)}"
+        title = f"{TOPICS[i % len(TOPICS)]} ({i}) - {source}"
+        token = ''.join(rng.choices('ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789', k=150))
+        link = f"https://news.google.com/rss/articles/{token}?oc=5"
+        anchor = f'<a href="{link}" target="_blank">{title}</a>&nbsp;&nbsp;<font color="#6f6f6f">{source}</font>'
+        rows.append({
+            'id': f"S{i:07d}",
+            'title': title,
+            'description': anchor,
+            'content': f'<ol><li>{anchor}</li><li>Related coverage of "{TOPICS[(i + 1) % len(TOPICS)]}"</li></ol>',
+            'source': source,
+            'date': formatdate(now - rng.uniform(0, 90 * 86400), usegmt=True),
+            'link': link,
+            'scraped_date': '2026-01-01 00:00:00',
+            'llm_category': rng.choice(ECONOMIC_CATEGORIES),
+        })
+    return rows
+
+def build(tmp, n, chunk=50_000, seed=5):
+    """Write the legacy CSV and an equivalent store, one chunk at a time"""
+    rng = random.Random(seed)
+    now = time.time()
+    csv_path = os.path.join(tmp, f"categorized_{n}.csv")
+    store = ArticleStore(os.path.join(tmp, f"articles_{n}.sqlite"))
+    for start in range(0, n, chunk):
+        rows = synthetic_rows(start, min(n, start + chunk), rng, now)
+        pd.DataFrame(rows).to_csv(csv_path, mode='a', header=start == 0, index=False)
+        store.append_articles(rows)
+        store.append_labels({row['id']: row['llm_category'] for row in rows})
+    return csv_path, store
+
+def _measure(load):
+    gc.collect()
+    start = time.perf_counter()
+    df = load()
+    seconds = time.perf_counter() - start
+    return df, seconds, df.memory_usage(deep=True).sum() / 2**20
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100_000, 1_000_000])
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("ARTICLE MEMORY BENCHMARK (resident DataFrame size, deep)")
+    print("=" * 70)
+    print(f"{'articles':>10} {'representation':<28} {'load':>9} {'memory':>11} {'per row':>9}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in args.sizes:
+            csv_path, store = build(tmp, n)
+
+            df, seconds, mib = _measure(lambda: pd.read_csv(csv_path))
+            print(f"{n:>10,} {'read_csv (all columns)':<28} {seconds * 1000:>7.0f}ms {mib:>9.1f}MiB "
+                  f"{mib * 2**20 / n:>7.0f}B")
+            del df
+            df, seconds, mib = _measure(lambda: store.read(COMPACT_COLUMNS, labeled=True))
+            print(f"{n:>10,} {'store compact read':<28} {seconds * 1000:>7.0f}ms {mib:>9.1f}MiB "
+                  f"{mib * 2**20 / n:>7.0f}B")
+            del df
+
+            page, seconds, mib = _measure(
+                lambda: store.read(COMPACT_COLUMNS, labeled=True, order_by='newest', limit=PAGE_SIZE)
+            )
+            text, text_seconds, text_mib = _measure(lambda: store.read(['id', 'description', 'link'], ids=page['id']))
+            print(f"{n:>10,} {f'dashboard page ({PAGE_SIZE} + text)':<28} {(seconds + text_seconds) * 1000:>7.1f}ms "
+                  f"{(mib + text_mib) * 1024:>8.1f}KiB")
+            store.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Description Normalization Benchmark
+Per-item BeautifulSoup cleanup (the old scraper path) vs the batched regex
+normalizer, plus prompt tokens per article before/after normalization on the
+articles already scraped into data/scraped_articles.csv
+
+Run from the project root:
+    python benchmarks/bench_normalize.py --items 50000
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+import pandas as pd
+from bs4 import BeautifulSoup
+
+from categorize_real_articles import build_prompt
+from mock_feed_server import TOPICS
+from text_normalize import estimate_tokens, normalize_frame
+
+CSV_PATH = os.path.join(os.path.dirname(__file__), '..', 'data', 'scraped_articles.csv')
+
+def synthetic_frame(n):
+    """Descriptions shaped like the real feeds: Google News anchors and Guardian paragraphs"""
+    titles, descriptions = [], []
+    for i in range(n):
+        title = f"{TOPICS[i % len(TOPICS)]} ({i})"
+        if i % 2:
+            description = (f'<a href="https://news.google.com/rss/articles/CBMi{i:08d}?oc=5" '
+                           f'target="_blank">{title}</a>&nbsp;&nbsp;<font color="#6f6f6f">Mock Times</font>')
+        else:
+            description = (f'<p>{title} &mdash; analysts react to the latest <b>economic</b> data.</p>'
+                           f'<p>Continue reading at https://example.com/{i}?utm_source=rss</p>')
+        titles.append(title)
+        descriptions.append(description)
+    return pd.DataFrame({'title': titles, 'description': descriptions})
+
+def clean_with_beautifulsoup(df):
+    """The pre-normalizer path: one HTML parse per item, then [:300]"""
+    return [BeautifulSoup(d, 'html.parser').get_text()[:300] for d in df['description']]
+
+def prompt_tokens(df):
+    return sum(
+        estimate_tokens(build_prompt(title, description if pd.notna(description) else title))
+        for title, description in zip(df['title'], df['description'])
+    )
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--items', type=int, default=50_000)
+    args = parser.parse_args()
+
+    df = synthetic_frame(args.items)
+    start = time.perf_counter()
+    clean_with_beautifulsoup(df)
+    soup_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    normalize_frame(df)
+    batch_seconds = time.perf_counter() - start
+
+    print("=" * 70)
+    print("DESCRIPTION NORMALIZATION BENCHMARK")
+    print("=" * 70)
+    print(f"BeautifulSoup per item: {args.items / soup_seconds:10,.0f} items/s  ({soup_seconds:.2f}s)")
+    print(f"Batched normalizer:     {args.items / batch_seconds:10,.0f} items/s  ({batch_seconds:.2f}s)")
+    print(f"Speedup:                {soup_seconds / batch_seconds:10.1f}x")
+
+    if os.path.exists(CSV_PATH):
+        scraped = pd.read_csv(CSV_PATH)
+        before = prompt_tokens(scraped)
+        after = prompt_tokens(normalize_frame(scraped))
+        print(f"\nPrompt tokens on {len(scraped)} scraped articles (estimated):")
+        print(f"  Stored descriptions:  {before:6,} ({before / len(scraped):.0f}/article)")
+        print(f"  Normalized:           {after:6,} ({after / len(scraped):.0f}/article)")
+        print(f"  Saved:                {1 - after / before:6.0%}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Feed Parse Benchmark
+Buffered parse (response.content + ET.fromstring + findall) vs the streaming
+parser, on a large synthetic feed served locally. Each mode runs in a fresh
+process so peak RSS is measured independently.
+
+Run from the project root:
+    python benchmarks/bench_parse.py --items 100000
+"""
+
+import argparse
+import contextlib
+import io
+import multiprocessing
+import os
+import resource
+import sys
+import time
+import xml.etree.ElementTree as ET
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+from mock_feed_server import MockFeedServer
+
+def _max_rss_mb():
+    # ru_maxrss is KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def _run(mode, url, max_items, results):
+    import requests
+    from feed_sources import FeedSource
+    from scrape_real_news import stream_feed
+
+    source = FeedSource(name='Benchmark', url=url, max_items=max_items)
+    baseline = _max_rss_mb()
+    start = time.perf_counter()
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        if mode == 'buffered':
+            response = requests.get(url, timeout=60)
+            root = ET.fromstring(response.content)
+            items = root.findall('.//item')[:max_items]
+            count = len(items)
+        else:
+            count = sum(1 for _ in stream_feed(source, timeout=60))
+
+    results.put({
+        'mode': mode,
+        'seconds': time.perf_counter() - start,
+        'peak_rss_mb': _max_rss_mb() - baseline,
+        'items': count,
+    })
+
+def measure(mode, url, max_items):
+    ctx = multiprocessing.get_context('spawn')
+    results = ctx.Queue()
+    process = ctx.Process(target=_run, args=(mode, url, max_items, results))
+    process.start()
+    result = results.get()
+    process.join()
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--items', type=int, default=100_000, help="items in the synthetic feed")
+    parser.add_argument('--keep', type=int, default=20, help="item cap (max_items)")
+    args = parser.parse_args()
+
+    with MockFeedServer(items=args.items) as server:
+        url = server.url('/large')
+        feed_mb = len(server.feed_for(args.items)) / 1024 / 1024
+        results = [measure(mode, url, args.keep) for mode in ('buffered', 'streaming')]
+
+    print("=" * 70)
+    print("FEED PARSE BENCHMARK")
+    print("=" * 70)
+    print(f"Feed: {args.items} items ({feed_mb:.1f} MB), keeping the first {args.keep}")
+    for r in results:
+        print(f"{r['mode']:<10} {r['seconds'] * 1000:8.1f} ms   peak RSS +{r['peak_rss_mb']:7.1f} MB   ({r['items']} items)")
+    buffered, streaming = results
+    print(f"Latency reduction: {buffered['seconds'] / streaming['seconds']:.1f}x, "
+          f"peak RSS reduction: {buffered['peak_rss_mb'] - streaming['peak_rss_mb']:.1f} MB")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Scrape Benchmark
+Compares the old sequential scrape loop against concurrent scrape_all_sources,
+fully offline against local mock feeds (one server per source = one "host")
+
+Run from the project root:
+    python benchmarks/bench_scrape.py --latency 0.5
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+from dataclasses import replace
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+from mock_feed_server import MockFeedServer
+from feed_sources import SOURCES
+from scrape_real_news import scrape_all_sources, scrape_source
+
+def scrape_sequential(sources, delay=2.0):
+    """The pre-concurrency loop: one fresh connection per feed, fixed sleep between sources"""
+    all_articles = []
+    for source in sources:
+        all_articles.extend(scrape_source(source))
+        time.sleep(delay)
+    return all_articles
+
+def timed(fn):
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        articles = fn()
+    return time.perf_counter() - start, len(articles)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--latency', type=float, default=0.5, help="per-feed server latency (s)")
+    parser.add_argument('--items', type=int, default=20)
+    parser.add_argument('--delay', type=float, default=2.0, help="sleep between sources in the old loop (s)")
+    args = parser.parse_args()
+
+    servers = [MockFeedServer(items=args.items, latency=args.latency).start() for _ in SOURCES]
+    try:
+        sources = [replace(source, url=server.url('/rss')) for source, server in zip(SOURCES, servers)]
+
+        sequential, n_seq = timed(lambda: scrape_sequential(sources, delay=args.delay))
+        concurrent, n_con = timed(lambda: scrape_all_sources(sources, max_articles=None))
+    finally:
+        for server in servers:
+            server.stop()
+
+    print("=" * 70)
+    print("SCRAPE BENCHMARK")
+    print("=" * 70)
+    print(f"Feeds: {len(SOURCES)} x {args.items} items, {args.latency}s latency each")
+    print(f"Sequential (old loop): {sequential:6.2f}s  ({n_seq} articles)")
+    print(f"Concurrent:            {concurrent:6.2f}s  ({n_con} articles)")
+    print(f"Speedup:               {sequential / concurrent:6.1f}x")
+
+if __name__ == "__main__":
+    main()
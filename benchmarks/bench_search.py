@@ -0,0 +1,92 @@
+"""
+Article Search Benchmark
+Two case-insensitive str.contains scans over title and description (the
+old dashboard search) vs the store's FTS5 index, on a synthetic corpus with
+a Zipf-like vocabulary
+
+Run from the project root:
+    python benchmarks/bench_search.py --articles 1000000
+"""
+
+import argparse
+import itertools
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+from article_store import ArticleStore
+
+QUERIES = ['inflation', 'infl*', 'central bank', '"interest rates"', 'zanubo', 'tariffs exports']
+ECONOMIC_WORDS = ['inflation', 'central', 'bank', 'interest', 'rates', 'tariffs', 'exports', 'growth',
+                  'jobs', 'housing', 'oil', 'stocks', 'productivity', 'recession', 'wages']
+
+def build_store(path, n, seed=11, chunk=50_000):
+    """
+    n articles whose words follow a Zipf-like distribution over a 20k vocabulary;
+    the economic words sit at ranks 10-150 (in roughly 2-30% of articles)
+    """
+    rng = random.Random(seed)
+    syllables = ['ba', 'ko', 'ri', 'zan', 'u', 'bo', 'te', 'mi', 'ga', 'lo', 'shi', 'nu']
+    vocabulary = [''.join(rng.choice(syllables) for _ in range(3)) for _ in range(20_000)]
+    for rank, word in enumerate(ECONOMIC_WORDS):
+        vocabulary.insert(10 + rank * 10, word)
+    cum_weights = list(itertools.accumulate(1 / (rank + 1) for rank in range(len(vocabulary))))
+
+    store = ArticleStore(path)
+    for start in range(0, n, chunk):
+        articles = []
+        for i in range(start, min(n, start + chunk)):
+            words = rng.choices(vocabulary, cum_weights=cum_weights, k=40)
+            articles.append({
+                'id': f"S{i:07d}",
+                'title': ' '.join(words[:8]).capitalize(),
+                'description': ' '.join(words[8:]),
+                'source': 'Synthetic',
+                'scraped_date': '2026-01-01 00:00:00',
+            })
+        store.append_articles(articles)
+    return store
+
+def _median_ms(fn, repeat=7):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times) * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--articles', type=int, default=100_000)
+    parser.add_argument('--limit', type=int, default=200, help="results per search (the dashboard's cap)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        store = build_store(os.path.join(tmp, 'bench.sqlite'), args.articles)
+        build_seconds = time.perf_counter() - start
+        df = store.read(['id', 'title', 'description'])
+
+        print("=" * 70)
+        print(f"SEARCH BENCHMARK - {args.articles:,} articles (built + indexed in {build_seconds:.0f}s)")
+        print("=" * 70)
+        print(f"{'query':<20} {'matches':>9} {'str.contains':>14} {'FTS5':>10}")
+        for query in QUERIES:
+            term = query.strip('"*')
+
+            def scan():
+                return df[df['title'].str.contains(term, case=False, na=False) |
+                          df['description'].str.contains(term, case=False, na=False)]
+
+            matches = len(store.search(query, limit=None))
+            print(f"{query:<20} {matches:>9,} {_median_ms(scan, 3):>12.1f}ms "
+                  f"{_median_ms(lambda: store.search(query, limit=args.limit)):>8.2f}ms")
+        store.close()
+
+if __name__ == "__main__":
+    main()
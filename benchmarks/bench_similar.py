@@ -0,0 +1,109 @@
+"""
+Similar-Article Benchmark
+Builds the embedding index (SVD fit + embed + k-means) over a synthetic
+store, then times what the dashboard and the pipeline do with it:
+
+- a lookup for one article, and for a page of 25 (one call)
+- an incremental update after 1,000 new articles
+- recall@10 of the IVF lookup against an exact scan of every vector
+- topic precision: share of the neighbours that carry the same headline
+  topic as the query (the synthetic corpus has len(TOPICS) of them)
+
+Run from the project root:
+    python benchmarks/bench_similar.py --sizes 100000 1000000 --data-dir /tmp/bench
+"""
+
+import argparse
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+from article_store import ArticleStore
+from embeddings import ArticleVectors
+from mock_feed_server import TOPICS
+from run_suite import build_store, synthetic_articles
+
+K = 10
+QUERIES = 200
+PAGE_SIZE = 25
+NEW_ARTICLES = 1_000
+
+def _topic(rowid):
+    # build_store appends article i at rowid i + 1; its headline starts with TOPICS[i % len(TOPICS)]
+    return (rowid - 1) % len(TOPICS)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100_000, 1_000_000])
+    parser.add_argument('--nprobe', type=int, nargs='+', default=[4, 8, 16])
+    parser.add_argument('--data-dir', help="keep generated stores here and reuse them (default: a temp dir)")
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("SIMILAR-ARTICLE BENCHMARK")
+    print("=" * 70)
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = args.data_dir or tmp
+        for n in args.sizes:
+            path = os.path.join(workdir, f"dashboard_{n}.sqlite")
+            build_store(path, n, labeled=True).close()
+            store = ArticleStore(path)
+            directory = os.path.join(tmp, f"embeddings_{n}")
+
+            vectors = ArticleVectors(directory)
+            start = time.perf_counter()
+            vectors.update(store)
+            build_seconds = time.perf_counter() - start
+            print(f"\n{n:,} articles: index built in {build_seconds:.1f}s "
+                  f"({os.path.getsize(os.path.join(directory, 'vectors-1.f32')) / 2**20:.0f}MiB of vectors)")
+
+            rng = np.random.default_rng(1)
+            queries = rng.choice(np.arange(1, n + 1), size=QUERIES, replace=False).tolist()
+            matrix = np.fromfile(os.path.join(directory, 'vectors-1.f32'), dtype=np.float32).reshape(n, -1)
+            exact = []
+            for rowid in queries:
+                scores = matrix @ matrix[rowid - 1]
+                scores[rowid - 1] = -np.inf
+                exact.append(set((np.argpartition(-scores, K)[:K] + 1).tolist()))
+            del matrix
+
+            print(f"   {'nprobe':>6} {'lookup p50':>11} {'p95':>8} {'page of 25':>11} {'recall@10':>10} {'topic':>7}")
+            for nprobe in args.nprobe:
+                vectors.nprobe = nprobe
+                times, found = [], []
+                for rowid in queries:
+                    start = time.perf_counter()
+                    found.append(vectors.similar([rowid], k=K)[0])
+                    times.append(time.perf_counter() - start)
+                start = time.perf_counter()
+                vectors.similar(queries[:PAGE_SIZE], k=K)
+                page_seconds = time.perf_counter() - start
+
+                recall = statistics.mean(len({r for r, _ in hits} & truth) / K for hits, truth in zip(found, exact))
+                same_topic = [_topic(r) == _topic(rowid) for rowid, hits in zip(queries, found) for r, _ in hits]
+                p95 = sorted(times)[int(len(times) * 0.95)]
+                print(f"   {nprobe:>6} {statistics.median(times) * 1000:>9.2f}ms {p95 * 1000:>6.2f}ms "
+                      f"{page_seconds * 1000:>9.1f}ms {recall:>10.0%} {statistics.mean(same_topic):>7.0%}")
+            store.close()
+
+            # Incremental update on a copy, so a reused store keeps its size
+            copy_path = os.path.join(tmp, f"incremental_{n}.sqlite")
+            shutil.copy(path, copy_path)
+            store = ArticleStore(copy_path)
+            store.append_articles(synthetic_articles(n, n + NEW_ARTICLES))
+            start = time.perf_counter()
+            embedded = ArticleVectors(directory).update(store)
+            print(f"   incremental update: {embedded:,} new articles in {(time.perf_counter() - start) * 1000:.0f}ms")
+            store.close()
+            os.remove(copy_path)
+            shutil.rmtree(directory)
+
+if __name__ == "__main__":
+    main()
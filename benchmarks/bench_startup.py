@@ -0,0 +1,127 @@
+"""
+Dashboard Startup Benchmark
+Cold start of dashboard.py in a fresh interpreter, as a new session sees it:
+how long until the title, the metrics row, the first chart and the first
+article are emitted, when the whole page is done, and how long a warm rerun
+takes. Also times the cold import of each heavy module on its own.
+
+Each run is a new process (nothing cached, no module imported) running the
+app through streamlit's AppTest against a synthetic store; every time is
+measured from process launch. 'plotly_before_metrics' is 1 when plotly had
+already been imported by the time the metrics row rendered.
+
+Run from the project root:
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --sizes 1000 100000 --repeat 5
+    python benchmarks/bench_startup.py --script dashboard_old.py   # a copy of an older revision, for comparison
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+HEAVY_MODULES = ['streamlit', 'pandas', 'plotly.express']
+
+# Runs in the child process; marks are seconds since BENCH_STARTED (set just before launch)
+CHILD = r'''
+import json, os, sys, time
+started = float(os.environ['BENCH_STARTED'])
+marks = {'interpreter': time.time() - started}
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+marks['streamlit_import'] = time.time() - started
+
+def first_call(mark, function):
+    def wrapper(*args, **kwargs):
+        if mark not in marks:
+            marks[mark] = time.time() - started
+            if mark == 'metrics':
+                marks['plotly_before_metrics'] = int('plotly.express' in sys.modules)
+        return function(*args, **kwargs)
+    return wrapper
+
+st.title = first_call('title', st.title)
+st.metric = first_call('metrics', st.metric)
+st.plotly_chart = first_call('first_chart', st.plotly_chart)
+st.expander = first_call('first_article', st.expander)
+
+app = AppTest.from_file(sys.argv[1], default_timeout=120).run()
+marks['complete'] = time.time() - started
+if app.exception:
+    sys.exit(f"dashboard raised: {app.exception[0].message}")
+start = time.time()
+app.run()
+marks['rerun'] = time.time() - start
+print(json.dumps(marks))
+'''
+
+STAGES = ['interpreter', 'streamlit_import', 'title', 'metrics', 'first_chart', 'first_article', 'complete', 'rerun']
+
+def import_seconds(module):
+    """Cold import time of one module in a fresh interpreter"""
+    code = f"import time; start = time.perf_counter(); import {module}; print(time.perf_counter() - start)"
+    return float(subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True).stdout)
+
+def run_once(script, app_dir):
+    """One cold start of `script` with app_dir (holding data/articles.sqlite) as the working directory"""
+    env = dict(os.environ, BENCH_STARTED=repr(time.time()))
+    completed = subprocess.run([sys.executable, '-c', CHILD, script], cwd=app_dir, env=env,
+                               capture_output=True, text=True)
+    if completed.returncode:
+        raise RuntimeError(completed.stderr.strip().splitlines()[-1])
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+def measure_startup(store_path, script='dashboard.py', repeat=3):
+    """
+    Median milliseconds per startup stage (plus cold module imports) for the
+    dashboard over the store at store_path; the store is linked into a
+    scratch app directory as data/articles.sqlite
+    """
+    script = os.path.abspath(os.path.join(ROOT, script))
+    with tempfile.TemporaryDirectory() as app_dir:
+        os.makedirs(os.path.join(app_dir, 'data'))
+        os.symlink(os.path.abspath(store_path), os.path.join(app_dir, 'data', 'articles.sqlite'))
+        runs = [run_once(script, app_dir) for _ in range(repeat)]
+
+    metrics = {}
+    for module in HEAVY_MODULES:
+        seconds = statistics.median(import_seconds(module) for _ in range(repeat))
+        metrics[f"import_{module.replace('.', '_')}_ms"] = round(seconds * 1000, 1)
+    for stage in STAGES:
+        values = [run[stage] for run in runs if stage in run]
+        if values:
+            metrics[f"{stage}_ms"] = round(statistics.median(values) * 1000, 1)
+    metrics['plotly_before_metrics'] = max(run.get('plotly_before_metrics', 0) for run in runs)
+    return metrics
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100_000])
+    parser.add_argument('--repeat', type=int, default=3, help="cold starts per size (median)")
+    parser.add_argument('--script', default='dashboard.py', help="app to start, relative to the project root")
+    args = parser.parse_args()
+
+    from run_suite import build_store
+
+    print("=" * 70)
+    print(f"DASHBOARD STARTUP BENCHMARK ({args.script}, median of {args.repeat} cold starts)")
+    print("=" * 70)
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in args.sizes:
+            path = os.path.join(tmp, f"startup_{n}.sqlite")
+            build_store(path, n, labeled=True).close()
+            metrics = measure_startup(path, args.script, args.repeat)
+            print(f"\n{n:,} articles:")
+            for name, value in metrics.items():
+                if name.endswith('_ms'):
+                    print(f"   {name[:-3]:<24} {value:>9,.1f}ms")
+            print(f"   {'plotly before metrics':<24} {'yes' if metrics['plotly_before_metrics'] else 'no':>11}")
+
+if __name__ == "__main__":
+    main()
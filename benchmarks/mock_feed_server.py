@@ -0,0 +1,170 @@
+"""
+Local RSS Stand-in
+Serves synthetic RSS feeds over HTTP so the scraper can be benchmarked offline
+
+Query parameters on any path:
+    items   - number of <item> elements in the feed (default 20)
+    start   - number of the first item, so several feeds can serve distinct
+              articles (default 0)
+    latency - seconds to wait before responding (default: server latency)
+"""
+
+import argparse
+import hashlib
+import random
+import threading
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+from xml.sax.saxutils import escape
+
+TOPICS = [
+    'Inflation eases as CPI falls',
+    'Central bank holds interest rates',
+    'GDP growth beats forecasts',
+    'Unemployment rate ticks up',
+    'Trade deficit widens on imports',
+    'Home prices cool as mortgage rates rise',
+    'Oil prices jump after supply cut',
+    'Stocks rally on earnings',
+    'Productivity gains from AI investment',
+    'Why economists disagree about growth',
+]
+# Filler words for synthetic headlines - none of them is a categorization keyword
+WORDS = [
+    'amid', 'analysts', 'april', 'asia', 'berlin', 'board', 'brief', 'cautious', 'chicago', 'city',
+    'cities', 'clearer', 'coast', 'council', 'critics', 'data', 'debate', 'delayed', 'district', 'early',
+    'europe', 'experts', 'fall', 'firms', 'fresh', 'global', 'july', 'key', 'late', 'leaders',
+    'local', 'london', 'march', 'mixed', 'modest', 'morning', 'national', 'new', 'north', 'outlook',
+    'paris', 'plan', 'quarter', 'rare', 'regional', 'report', 'review', 'rural', 'sharp', 'signals',
+    'slow', 'south', 'spring', 'steady', 'summer', 'survey', 'sydney', 'talks', 'tokyo', 'update',
+    'urban', 'vote', 'warning', 'weekly', 'west', 'winter', 'year', 'youth', 'zone', 'ahead',
+]
+
+def synthetic_title(i):
+    """
+    Headline number i: a TOPICS phrase plus five filler words chosen by i, so
+    distinct items stay distinct for the dedup index's near-duplicate check
+    """
+    words = random.Random(i).sample(WORDS, 5)
+    return f"{TOPICS[i % len(TOPICS)]}: {' '.join(words)} ({i})"
+
+def generate_feed(n_items, source='Mock Source', start=0):
+    """
+    Build an RSS 2.0 document with n_items synthetic economic articles,
+    numbered from start
+    """
+    parts = [
+        '<?xml version="1.0" encoding="UTF-8"?>\n',
+        '<rss version="2.0"><channel><title>Mock Economics</title>\n',
+    ]
+    for i in range(start, start + n_items):
+        title = synthetic_title(i)
+        description = f'<p>{title} - analysts react to the latest <b>economic</b> data.</p>'
+        parts.append(
+            '<item>'
+            f'<title>{escape(title)} - {escape(source)}</title>'
+            f'<link>https://example.com/news/{i}?utm_source=rss</link>'
+            f'<description>{escape(description)}</description>'
+            f'<pubDate>{formatdate(time.time() - (i - start) * 60, usegmt=True)}</pubDate>'
+            f'<source url="https://example.com">{escape(source)}</source>'
+            '</item>\n'
+        )
+    parts.append('</channel></rss>\n')
+    return ''.join(parts).encode('utf-8')
+
+class FeedHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive, like real feed servers
+
+    def do_GET(self):
+        query = parse_qs(urlsplit(self.path).query)
+        items = int(query.get('items', [self.server.items])[0])
+        start = int(query.get('start', [0])[0])
+        latency = float(query.get('latency', [self.server.latency])[0])
+
+        if latency:
+            time.sleep(latency)
+
+        body = self.server.feed_for(items, start)
+        etag = '"' + hashlib.md5(body).hexdigest() + '"'
+
+        # Honour conditional GETs like a well-behaved feed server
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header('ETag', etag)
+        self.send_header('Last-Modified', self.server.last_modified)
+        self.send_header('Content-Type', 'application/rss+xml; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        try:
+            for start in range(0, len(body), 64 * 1024):
+                self.wfile.write(body[start:start + 64 * 1024])
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # client stopped reading early (streaming parser hit its item cap)
+
+    def log_message(self, format, *args):
+        pass
+
+class MockFeedServer(ThreadingHTTPServer):
+    """
+    Threaded RSS server running in the background
+
+    Usage:
+        with MockFeedServer(latency=0.5) as server:
+            scrape_source(replace(source, url=server.url('/rss')))
+    """
+    daemon_threads = True
+
+    def __init__(self, host='127.0.0.1', port=0, items=20, latency=0.0):
+        super().__init__((host, port), FeedHandler)
+        self.items = items
+        self.latency = latency
+        self.last_modified = formatdate(time.time(), usegmt=True)
+        self._feeds = {}
+        self._thread = None
+
+    def feed_for(self, items, start=0):
+        if (items, start) not in self._feeds:
+            self._feeds[items, start] = generate_feed(items, start=start)
+        return self._feeds[items, start]
+
+    def url(self, path='/feed', **params):
+        host, port = self.server_address[:2]
+        query = '&'.join(f"{key}={value}" for key, value in params.items())
+        return f"http://{host}:{port}{path}" + (f"?{query}" if query else '')
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve synthetic RSS feeds locally")
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--items', type=int, default=20)
+    parser.add_argument('--latency', type=float, default=0.0)
+    args = parser.parse_args()
+
+    server = MockFeedServer(port=args.port, items=args.items, latency=args.latency)
+    print(f"📡 Serving mock feeds at {server.url('/')}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
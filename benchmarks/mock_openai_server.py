@@ -0,0 +1,196 @@
+"""
+Mock OpenAI-Compatible Server
+Answers POST /v1/chat/completions locally with simulated latency and throttling,
+so the categorizer can be exercised and benchmarked without an API key
+
+Categories are picked by keyword from the article title, so results are
+deterministic and can be checked for ordering.
+
+Run standalone:
+    python benchmarks/mock_openai_server.py --port 8001 --latency 0.2 --rate-429 0.05
+and point the categorizer at base_url="http://127.0.0.1:8001/v1"
+"""
+
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+KEYWORDS = [
+    ('inflation', ('inflation', 'cpi', 'prices rise')),
+    ('monetary_policy', ('central bank', 'interest rate', 'fed ')),
+    ('gdp_growth', ('gdp', 'growth', 'recession')),
+    ('employment', ('unemployment', 'jobs', 'labor', 'wages')),
+    ('trade', ('trade', 'tariff', 'export', 'import')),
+    ('housing', ('home', 'housing', 'mortgage')),
+    ('commodities', ('oil', 'gold', 'commodit')),
+    ('financial_markets', ('stocks', 'market', 'currency', 'crypto')),
+    ('productivity', ('productivity', 'ai investment')),
+]
+
+def classify(text):
+    """Deterministic keyword stand-in for the model"""
+    text = text.lower()
+    for category, words in KEYWORDS:
+        if any(word in text for word in words):
+            return category
+    return 'general_economics'
+
+def _title(prompt):
+    match = re.search(r'^Title: (.*)$', prompt, re.MULTILINE)
+    return match.group(1) if match else prompt
+
+def _batch_items(prompt):
+    """Articles of a batch prompt, or None for a single-article prompt"""
+    match = re.search(r'^Articles \(JSON\):\n(.*)$', prompt, re.MULTILINE)
+    return json.loads(match.group(1)) if match else None
+
+class ChatHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+        server = self.server
+        server.record_request()
+
+        if server.should_throttle():
+            payload = json.dumps({'error': {'message': 'Rate limit reached', 'type': 'requests',
+                                            'code': 'rate_limit_exceeded'}}).encode()
+            self.send_response(429)
+            self.send_header('Retry-After', str(server.retry_after))
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+            return
+
+        if server.latency:
+            time.sleep(server.latency)
+
+        prompt = body['messages'][-1]['content']
+        content = server.respond(prompt)
+        prompt_tokens = sum(len(m['content']) // 4 + 1 for m in body['messages'])
+        completion_tokens = len(content) // 4 + 1
+        payload = json.dumps({
+            'id': f"chatcmpl-mock{server.requests}",
+            'object': 'chat.completion',
+            'created': int(time.time()),
+            'model': body.get('model', 'mock'),
+            'choices': [{
+                'index': 0,
+                'message': {'role': 'assistant', 'content': content},
+                'finish_reason': 'stop'
+            }],
+            'usage': {
+                'prompt_tokens': prompt_tokens,
+                'completion_tokens': completion_tokens,
+                'total_tokens': prompt_tokens + completion_tokens
+            }
+        }).encode()
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+class MockOpenAIServer(ThreadingHTTPServer):
+    """
+    Threaded mock of the chat completions endpoint
+
+    latency        - seconds added to every successful response
+    rate_429       - probability of answering 429 regardless of load
+    rpm_limit      - hard requests-per-minute limit (sliding window) -> 429
+    retry_after    - Retry-After header sent with every 429 (seconds)
+    bad_label_rate - probability of an invalid label per batch item
+                     (exercises the batch re-split path)
+    """
+    daemon_threads = True
+
+    def __init__(self, host='127.0.0.1', port=0, latency=0.0, rate_429=0.0, rpm_limit=None,
+                 retry_after=1, bad_label_rate=0.0, seed=0):
+        super().__init__((host, port), ChatHandler)
+        self.latency = latency
+        self.rate_429 = rate_429
+        self.rpm_limit = rpm_limit
+        self.retry_after = retry_after
+        self.bad_label_rate = bad_label_rate
+        self.requests = 0
+        self.throttled = 0
+        self._random = random.Random(seed)
+        self._window = deque()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def record_request(self):
+        with self._lock:
+            self.requests += 1
+
+    def should_throttle(self):
+        with self._lock:
+            now = time.monotonic()
+            while self._window and now - self._window[0] > 60:
+                self._window.popleft()
+            throttle = self._random.random() < self.rate_429
+            if self.rpm_limit is not None and len(self._window) >= self.rpm_limit:
+                throttle = True
+            if throttle:
+                self.throttled += 1
+            else:
+                self._window.append(now)
+            return throttle
+
+    def respond(self, prompt):
+        items = _batch_items(prompt)
+        if items is None:
+            return classify(_title(prompt))
+
+        answers = []
+        for item in items:
+            with self._lock:
+                bad = self._random.random() < self.bad_label_rate
+            answers.append({'id': item['id'], 'category': 'not_a_category' if bad else classify(item['title'])})
+        return json.dumps(answers)
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve a mock OpenAI chat completions API locally")
+    parser.add_argument('--port', type=int, default=8001)
+    parser.add_argument('--latency', type=float, default=0.2)
+    parser.add_argument('--rate-429', type=float, default=0.0)
+    parser.add_argument('--rpm-limit', type=int, default=None)
+    args = parser.parse_args()
+
+    server = MockOpenAIServer(port=args.port, latency=args.latency, rate_429=args.rate_429,
+                              rpm_limit=args.rpm_limit)
+    print(f"🤖 Mock OpenAI API at {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
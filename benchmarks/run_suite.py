@@ -0,0 +1,335 @@
+"""
+Offline Benchmark Suite
+Times the scrape, categorize and dashboard paths on synthetic data, fully
+offline (local mock RSS and OpenAI-compatible servers), and writes the
+results as JSON so runs can be compared across commits
+
+Scenarios (each run at every --sizes row count):
+    scrape      - scrape_all_sources over 10 mock feeds, then dedup + store
+    categorize  - categorize_scraped_articles against the mock OpenAI server
+                  (configurable latency and 429 rate)
+    dashboard   - the store calls dashboard.py makes: filtered counts, trend,
+                  pages (newest / by source / deep / date range), page text,
+                  search, version poll
+    startup     - cold starts of dashboard.py over the same store: import
+                  times, time to the title / metrics row / first chart /
+                  first article, full page and warm rerun (bench_startup)
+
+Data is generated from fixed seeds, so the same size always means the same
+corpus. Scrape and categorize are capped at 100k rows (a 1M scrape is ~400MB
+of XML) unless --no-limits is given.
+
+Run from the project root:
+    python benchmarks/run_suite.py
+    python benchmarks/run_suite.py --sizes 1000 100000 1000000 --scenarios dashboard --data-dir /tmp/bench
+    python benchmarks/run_suite.py --compare benchmarks/results/<earlier run>.json
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from email.utils import formatdate
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+from article_store import ArticleStore
+from bench_startup import measure_startup
+from categorize_real_articles import ECONOMIC_CATEGORIES, categorize_scraped_articles
+from dedup_index import DedupIndex
+from feed_sources import FeedSource
+from mock_feed_server import MockFeedServer, synthetic_title
+from mock_openai_server import MockOpenAIServer
+from scrape_real_news import scrape_all_sources
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), 'results')
+SCENARIO_LIMITS = {'scrape': 100_000, 'categorize': 100_000, 'dashboard': None, 'startup': None}
+FEEDS = 10
+N_SOURCES = 50
+PAGE_SIZE = 25
+# Fixed "now" for generated pubDates - reproducible corpora and date ranges
+REFERENCE_TIME = datetime(2026, 1, 1, tzinfo=timezone.utc).timestamp()
+DAYS = 90
+
+def synthetic_articles(start, stop, seed=3):
+    """Article dicts i in [start, stop): synthetic headlines over DAYS days from N_SOURCES publishers"""
+    rng = random.Random(seed * 1_000_003 + start)
+    return [{
+        'id': f"S{i:07d}",
+        'title': synthetic_title(i),
+        'description': f"Analysts react to story {i}: {synthetic_title(i + 1)}",
+        'source': f"Source {rng.randrange(N_SOURCES)}",
+        'date': formatdate(REFERENCE_TIME - rng.uniform(0, DAYS * 86400), usegmt=True),
+        'link': f"https://example.com/news/{i}",
+        'scraped_date': '2026-01-01 00:00:00',
+    } for i in range(start, stop)]
+
+def build_store(path, n, labeled, chunk=50_000):
+    """Store with n synthetic articles (labeled at random or not at all); reused when already built"""
+    if os.path.exists(path):
+        store = ArticleStore(path)
+        if len(store) == n:
+            return store
+        store.close()
+        os.remove(path)
+    rng = random.Random(n)
+    store = ArticleStore(path)
+    for start in range(0, n, chunk):
+        articles = synthetic_articles(start, min(n, start + chunk))
+        store.append_articles(articles)
+        if labeled:
+            store.append_labels({article['id']: rng.choice(ECONOMIC_CATEGORIES) for article in articles})
+    store.close()
+    return ArticleStore(path)
+
+def _median_ms(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return round(statistics.median(times) * 1000, 3)
+
+@contextlib.contextmanager
+def _quiet():
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        yield
+
+def scenario_scrape(n, workdir, args):
+    per_feed = -(-n // FEEDS)
+    with MockFeedServer(latency=args.feed_latency) as server:
+        sources = [
+            FeedSource(name=f"Mock Feed {k}", url=server.url('/rss', items=per_feed, start=k * per_feed),
+                       max_items=per_feed)
+            for k in range(FEEDS)
+        ]
+        for k in range(FEEDS):  # generated outside the timed run (the server caches documents)
+            server.feed_for(per_feed, k * per_feed)
+
+        start = time.perf_counter()
+        with _quiet():
+            articles = scrape_all_sources(sources, max_articles=None, deadline=3600, min_host_interval=0)
+        scrape_seconds = time.perf_counter() - start
+
+    path = os.path.join(workdir, f"scrape_{n}")
+    for suffix in ('.sqlite', '_index.sqlite'):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+    store, index = ArticleStore(path + '.sqlite'), DedupIndex(path + '_index.sqlite')
+    start = time.perf_counter()
+    new_articles = index.filter_new(articles)
+    store.append_articles(new_articles)
+    index.register(new_articles)
+    store_seconds = time.perf_counter() - start
+    store.close()
+    index.close()
+    return {
+        'articles': len(articles),
+        'new_articles': len(new_articles),
+        'scrape_s': round(scrape_seconds, 3),
+        'scrape_articles_per_s': round(len(articles) / scrape_seconds, 1),
+        'dedup_store_s': round(store_seconds, 3),
+        'dedup_store_articles_per_s': round(len(articles) / store_seconds, 1),
+    }
+
+def scenario_categorize(n, workdir, args):
+    path = os.path.join(workdir, f"categorize_{n}.sqlite")
+    if os.path.exists(path):
+        os.remove(path)  # labels from an earlier run would leave nothing to do
+    build_store(path, n, labeled=False).close()
+
+    with MockOpenAIServer(latency=args.api_latency, rate_429=args.rate_429, retry_after=1) as server:
+        start = time.perf_counter()
+        with _quiet():
+            categorize_scraped_articles('mock', store_path=path, base_url=server.base_url,
+                                        concurrency=args.concurrency, rpm=1_000_000, tpm=100_000_000,
+                                        batch_size=args.batch_size, use_cache=False)
+        seconds = time.perf_counter() - start
+        requests, throttled = server.requests, server.throttled
+
+    store = ArticleStore(path)
+    labeled = int(store.aggregate('llm_category')['n'].sum())
+    store.close()
+    return {
+        'articles': n,
+        'labeled': labeled,
+        'llm_requests': requests,
+        'throttled_requests': throttled,
+        'categorize_s': round(seconds, 3),
+        'categorize_articles_per_s': round(n / seconds, 1),
+    }
+
+def scenario_dashboard(n, workdir, args):
+    path = os.path.join(workdir, f"dashboard_{n}.sqlite")
+    start = time.perf_counter()
+    build_store(path, n, labeled=True).close()
+    build_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    store = ArticleStore(path)
+    open_seconds = time.perf_counter() - start
+
+    categories = ECONOMIC_CATEGORIES[:len(ECONOMIC_CATEGORIES) // 2]
+    sources = [f"Source {i}" for i in range(0, N_SOURCES, 2)]
+    last_day = datetime.fromtimestamp(REFERENCE_TIME, timezone.utc).date()
+    week = dict(published_since=str(last_day.fromordinal(last_day.toordinal() - 6)), published_until=str(last_day))
+    page = store.read(['id'], labeled=True, order_by='newest', limit=PAGE_SIZE)['id'].tolist()
+    repeat = args.repeat
+
+    def counts():
+        store.aggregate('llm_category', categories=categories, sources=sources)
+        store.aggregate('source', categories=categories, sources=sources)
+
+    def search_filtered():
+        hits = store.search('inflation', limit=200)
+        store.read(['id'], labeled=True, ids=hits['id'], categories=categories, sources=sources)
+
+    columns = ['id', 'title', 'source', 'published', 'llm_category']
+    metrics = {
+        'articles': n,
+        'build_seconds': round(build_seconds, 3),  # informational - near zero when a store is reused
+        'open_ms': round(open_seconds * 1000, 3),
+        'version_poll_ms': _median_ms(store.version, repeat),
+        'filtered_counts_ms': _median_ms(counts, repeat),
+        'trend_ms': _median_ms(lambda: store.aggregate(['day', 'llm_category']), repeat),
+        'page_newest_ms': _median_ms(
+            lambda: store.read(columns, labeled=True, order_by='newest', limit=PAGE_SIZE), repeat),
+        'page_by_source_ms': _median_ms(
+            lambda: store.read(columns, labeled=True, categories=categories, sources=sources,
+                               order_by='source', limit=PAGE_SIZE), repeat),
+        'page_deep_ms': _median_ms(
+            lambda: store.read(columns, labeled=True, order_by='newest', limit=PAGE_SIZE, offset=n // 2), repeat),
+        'page_date_range_ms': _median_ms(
+            lambda: store.read(columns, labeled=True, order_by='newest', limit=PAGE_SIZE, **week), repeat),
+        'page_text_ms': _median_ms(lambda: store.read(['id', 'description', 'link'], ids=page), repeat),
+        'search_term_ms': _median_ms(lambda: store.search('inflation', limit=200), repeat),
+        'search_phrase_ms': _median_ms(lambda: store.search('"central bank"', limit=200), repeat),
+        'search_prefix_ms': _median_ms(lambda: store.search('lond*', limit=200), repeat),
+        'search_filtered_ms': _median_ms(search_filtered, repeat),
+    }
+    store.close()
+    return metrics
+
+def scenario_startup(n, workdir, args):
+    path = os.path.join(workdir, f"dashboard_{n}.sqlite")
+    build_store(path, n, labeled=True).close()
+    return {'articles': n, **measure_startup(path, repeat=args.repeat)}
+
+SCENARIOS = {'scrape': scenario_scrape, 'categorize': scenario_categorize, 'dashboard': scenario_dashboard,
+             'startup': scenario_startup}
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def _direction(metric):
+    """+1 when higher is better, -1 when lower is better, 0 for plain counts"""
+    if metric.endswith('_per_s'):
+        return 1
+    if metric.endswith(('_ms', '_s')):
+        return -1
+    return 0
+
+def compare(baseline, current, threshold, noise_ms):
+    """
+    Print metric changes against an earlier run; returns the number of
+    regressions beyond threshold (timings that moved less than noise_ms don't count)
+    """
+    previous = {(r['scenario'], r['size']): r.get('metrics', {}) for r in baseline['results']}
+    regressions = 0
+    print(f"\nCompared with {baseline.get('git_commit') or '?'} ({baseline['created']}):")
+    print(f"{'scenario':<11} {'size':>9} {'metric':<28} {'before':>11} {'after':>11} {'change':>8}")
+    for result in current['results']:
+        before = previous.get((result['scenario'], result['size']))
+        if not before or 'metrics' not in result:
+            continue
+        for metric, value in result['metrics'].items():
+            direction = _direction(metric)
+            if not direction or not before.get(metric):
+                continue
+            change = value / before[metric] - 1
+            delta_ms = abs(value - before[metric]) * (1 if metric.endswith('_ms') else 1000)
+            worse = -direction * change > threshold and (direction > 0 or delta_ms >= noise_ms)
+            regressions += worse
+            print(f"{result['scenario']:<11} {result['size']:>9,} {metric:<28} {before[metric]:>11,.3f} "
+                  f"{value:>11,.3f} {change:>+7.0%}{'  ⚠️' if worse else ''}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1_000, 100_000])
+    parser.add_argument('--scenarios', nargs='+', choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument('--no-limits', action='store_true', help="run scrape/categorize above 100k rows too")
+    parser.add_argument('--data-dir', help="keep generated stores here and reuse them (default: a temp dir)")
+    parser.add_argument('--output', help="results file (default: benchmarks/results/<time>-<commit>.json)")
+    parser.add_argument('--compare', help="earlier results file to compare against")
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help="relative slowdown reported as a regression (exit status 1)")
+    parser.add_argument('--noise-ms', type=float, default=2.0,
+                        help="timing changes smaller than this are never regressions")
+    parser.add_argument('--repeat', type=int, default=7, help="repetitions per dashboard timing / cold start (median)")
+    parser.add_argument('--feed-latency', type=float, default=0.05, help="mock feed latency (s)")
+    parser.add_argument('--api-latency', type=float, default=0.05, help="mock OpenAI latency (s)")
+    parser.add_argument('--rate-429', type=float, default=0.02, help="fraction of API calls answered 429")
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--batch-size', type=int, default=10)
+    args = parser.parse_args()
+
+    run = {
+        'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'git_commit': git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'settings': {key: value for key, value in vars(args).items()
+                     if key not in ('output', 'compare', 'data_dir')},
+        'results': [],
+    }
+
+    print("=" * 70)
+    print("OFFLINE BENCHMARK SUITE")
+    print("=" * 70)
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = args.data_dir or tmp
+        os.makedirs(workdir, exist_ok=True)
+        for scenario in args.scenarios:
+            for size in args.sizes:
+                limit = SCENARIO_LIMITS[scenario]
+                result = {'scenario': scenario, 'size': size}
+                if limit is not None and size > limit and not args.no_limits:
+                    result['skipped'] = f"above the {limit:,}-row limit (use --no-limits)"
+                    print(f"⏭️  {scenario} @ {size:,}: skipped ({result['skipped']})")
+                else:
+                    print(f"⏱️  {scenario} @ {size:,}...", flush=True)
+                    result['metrics'] = SCENARIOS[scenario](size, workdir, args)
+                    print("   " + ', '.join(f"{key}={value}" for key, value in result['metrics'].items()))
+                run['results'].append(result)
+
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"{datetime.now():%Y%m%d-%H%M%S}-{run['git_commit'] or 'nogit'}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(run, f, indent=2)
+    print(f"\n✓ Results saved to: {output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(json.load(f), run, args.threshold, args.noise_ms)
+        if regressions:
+            print(f"\n⚠️  {regressions} metric(s) regressed by more than {args.threshold:.0%}")
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
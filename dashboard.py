@@ -3,11 +3,16 @@ Economic News Analysis Dashboard
 Interactive visualization of LLM-categorized real news articles
 """
 
+import os
+import sys
 import streamlit as st
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-from datetime import datetime
+from datetime import date, datetime
+
+# Heavy modules load on first use so the title and the metrics row paint first:
+# article_store (and pandas with it) in get_store(), plotly.express in the chart sections
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scripts'))
+
+STORE_PATH = 'data/articles.sqlite'
 
 # Page config
 st.set_page_config(
@@ -21,17 +26,85 @@ st.title("📊 Economic News Analysis Dashboard")
 st.markdown("### Real-time Economic News Categorization using LLM")
 st.markdown("---")
 
-# Load data
-@st.cache_data
-def load_data():
-    try:
-        df = pd.read_csv('data/categorized_real_articles.csv')
-        return df
-    except FileNotFoundError:
-        st.error("❌ Data file not found! Please run the scraping and categorization scripts first.")
-        st.stop()
+SEARCH_LIMIT = 200
+REFRESH_SECONDS = 30
+TREND_BUCKETS = {'Day': 'D', 'Week': 'W', 'Month': 'M'}
+CACHE_ENTRIES = 64
+PAGE_SIZES = [10, 25, 50, 100]
+SORT_OPTIONS = {'Newest first': 'newest', 'Source': 'source', 'Category': 'llm_category'}
+# Compact page rows (categorical source/category, parsed UTC dates); the raw 'content'
+# HTML is never read, description/link only for the articles on screen
+PAGE_COLUMNS = ['rowid', 'id', 'title', 'source', 'published', 'llm_category']
+TEXT_COLUMNS = ['id', 'description', 'link']
+SIMILAR_ARTICLES = 5
+SIMILAR_COLUMNS = ['rowid', 'title', 'source', 'llm_category', 'link']
 
-df = load_data()
+# Load data
+@st.cache_resource
+def get_store():
+    """One store connection shared by every session (it also serves the search index)"""
+    from article_store import open_store
+    return open_store(STORE_PATH, data_dir='data')
+
+@st.cache_resource
+def get_vectors():
+    """Similar-article vectors written by the pipeline/categorizer (memory-mapped, shared by every session)"""
+    from embeddings import ArticleVectors, EMBEDDINGS_DIR
+    return ArticleVectors(os.path.join('data', EMBEDDINGS_DIR))
+
+# Cached queries take the store version, so new pipeline output gets its own cache entries
+@st.cache_data(max_entries=CACHE_ENTRIES)
+def load_counts(version, by, categories=None, sources=None, since=None, until=None):
+    """Chart counts from the store's aggregate table, cached per store version and filter selection"""
+    return get_store().aggregate(by, categories=categories, sources=sources, since=since, until=until)
+
+@st.cache_data(max_entries=CACHE_ENTRIES)
+def load_page(version, categories, sources, since, until, order_by, limit, offset):
+    """One page of the article list - only these rows are read and rendered"""
+    return get_store().read(PAGE_COLUMNS, labeled=True, categories=categories, sources=sources,
+                            published_since=since, published_until=until,
+                            order_by=order_by, limit=limit, offset=offset)
+
+@st.cache_data(max_entries=CACHE_ENTRIES)
+def load_text(ids):
+    """Description and link of the articles on screen (article text never changes once stored)"""
+    return get_store().read(TEXT_COLUMNS, ids=ids).set_index('id')
+
+@st.cache_data(max_entries=CACHE_ENTRIES)
+def load_similar(version, rowids):
+    """
+    Nearest categorized articles to each article on screen: {rowid: records},
+    cached per (store, vector index) version
+    """
+    neighbours = get_vectors().similar(rowids, k=SIMILAR_ARTICLES * 2)   # some may not be labeled yet
+    candidates = sorted({rowid for found in neighbours for rowid, _ in found})
+    rows = get_store().read(SIMILAR_COLUMNS, labeled=True, rowids=candidates).set_index('rowid')
+    return {
+        rowid: [dict(rows.loc[r]) for r, _ in found if r in rows.index][:SIMILAR_ARTICLES]
+        for rowid, found in zip(rowids, neighbours)
+    }
+
+@st.fragment(run_every=REFRESH_SECONDS)
+def watch_store(version):
+    """Rerun the page once the pipeline has written new articles or labels"""
+    if get_store().version() != version:
+        st.rerun()
+
+store_version = get_store().version()
+if st.session_state.get('store_version') != store_version:
+    previous_version = st.session_state.get('store_version')
+    st.session_state['newly_labeled'] = get_store().labeled_since(previous_version) if previous_version else 0
+    st.session_state['store_version'] = store_version
+    st.session_state['refreshed_at'] = datetime.now()
+watch_store(store_version)
+
+all_categories = load_counts(store_version, 'llm_category')
+all_sources = load_counts(store_version, 'source')
+published_days = sorted(day for day in load_counts(store_version, 'day')['day'] if day) or [date.today().isoformat()]
+
+if all_categories.empty:
+    st.error("❌ No categorized articles found! Please run the scraping and categorization scripts first.")
+    st.stop()
 
 # Sidebar
 st.sidebar.header("📌 Project Information")
@@ -47,149 +120,251 @@ This dashboard displays real economic news articles that were:
 **Sources:** {sources}
 **Categories:** {categories}
 """.format(
-    total=len(df),
-    sources=df['source'].nunique(),
-    categories=df['llm_category'].nunique()
+    total=int(all_categories['n'].sum()),
+    sources=len(all_sources),
+    categories=len(all_categories)
 ))
 
+refreshed = f"🕒 Data refreshed at {st.session_state['refreshed_at']:%H:%M:%S}"
+if st.session_state['newly_labeled']:
+    refreshed += f" - {st.session_state['newly_labeled']} newly categorized"
+st.sidebar.caption(f"{refreshed} (checked every {REFRESH_SECONDS}s)")
+
 st.sidebar.markdown("---")
 st.sidebar.markdown("**Filter Options:**")
 
 # Filters in sidebar
 selected_categories = st.sidebar.multiselect(
     "Select Categories",
-    options=sorted(df['llm_category'].unique()),
-    default=sorted(df['llm_category'].unique())
+    options=sorted(all_categories['llm_category']),
+    default=sorted(all_categories['llm_category'])
 )
 
 selected_sources = st.sidebar.multiselect(
     "Select Sources",
-    options=sorted(df['source'].unique()),
-    default=sorted(df['source'].unique())
+    options=sorted(all_sources['source']),
+    default=sorted(all_sources['source'])
 )
 
-# Filter dataframe
-filtered_df = df[
-    (df['llm_category'].isin(selected_categories)) &
-    (df['source'].isin(selected_sources))
-]
+first_day, last_day = date.fromisoformat(published_days[0]), date.fromisoformat(published_days[-1])
+selected_days = st.sidebar.date_input(
+    "Published between",
+    value=(first_day, last_day),
+    min_value=first_day,
+    max_value=last_day
+)
+# Only the start is set while a new range is being picked
+since, until = (tuple(selected_days) + (last_day,))[:2]
+
+# Chart counts for this selection (sorted tuples - one cache entry per distinct filter);
+# the full range stays unbounded so undated articles are still counted
+filter_key = dict(categories=tuple(sorted(selected_categories)), sources=tuple(sorted(selected_sources)))
+if (since, until) == (first_day, last_day):
+    filter_key.update(since=None, until=None)
+else:
+    filter_key.update(since=since.isoformat(), until=until.isoformat())
+category_counts = load_counts(store_version, 'llm_category', **filter_key).set_index('llm_category')['n']
+source_counts = load_counts(store_version, 'source', **filter_key).set_index('source')['n']
+total_articles = int(category_counts.sum())
 
-# Main dashboard
+# Metrics row - straight from the aggregate counts, painted before any chart is built
 col1, col2, col3, col4 = st.columns(4)
 
 with col1:
-    st.metric("📰 Total Articles", len(filtered_df))
+    st.metric("📰 Total Articles", total_articles)
 
 with col2:
-    st.metric("📁 Categories", filtered_df['llm_category'].nunique())
+    st.metric("📁 Categories", len(category_counts))
 
 with col3:
-    st.metric("🌐 Sources", filtered_df['source'].nunique())
+    st.metric("🌐 Sources", len(source_counts))
 
 with col4:
     st.metric("🤖 LLM Model", "GPT-3.5")
 
 st.markdown("---")
 
-# Charts row
-col1, col2 = st.columns(2)
-
-with col1:
-    st.subheader("📊 Category Distribution")
-    
-    category_counts = filtered_df['llm_category'].value_counts()
-    
-    fig = px.pie(
-        values=category_counts.values,
-        names=category_counts.index,
-        title="Articles by Category",
-        hole=0.4,
-        color_discrete_sequence=px.colors.qualitative.Set3
+def show_charts(category_counts, source_counts, total_articles):
+    """Category and source distribution charts plus the category breakdown"""
+    import plotly.express as px
+
+    # Charts row
+    col1, col2 = st.columns(2)
+
+    with col1:
+        st.subheader("📊 Category Distribution")
+
+        fig = px.pie(
+            values=category_counts.values,
+            names=category_counts.index,
+            title="Articles by Category",
+            hole=0.4,
+            color_discrete_sequence=px.colors.qualitative.Set3
+        )
+        fig.update_traces(textposition='inside', textinfo='percent+label')
+        st.plotly_chart(fig, width='stretch')
+
+    with col2:
+        st.subheader("🌐 Source Distribution")
+
+        top_sources = source_counts.head(10)
+
+        fig = px.bar(
+            x=top_sources.values,
+            y=top_sources.index,
+            orientation='h',
+            title="Top 10 News Sources",
+            labels={'x': 'Number of Articles', 'y': 'Source'},
+            color=top_sources.values,
+            color_continuous_scale='Blues'
+        )
+        fig.update_layout(showlegend=False, yaxis={'categoryorder': 'total ascending'})
+        st.plotly_chart(fig, width='stretch')
+
+    st.markdown("---")
+
+    # Category breakdown
+    st.subheader("📈 Category Breakdown")
+
+    category_col1, category_col2 = st.columns(2)
+
+    with category_col1:
+        category_counts_df = category_counts.reset_index()
+        category_counts_df.columns = ['Category', 'Count']
+        category_counts_df['Percentage'] = (category_counts_df['Count'] / total_articles * 100).round(1)
+
+        st.dataframe(
+            category_counts_df,
+            width='stretch',
+            hide_index=True
+        )
+
+    with category_col2:
+        fig = px.bar(
+            category_counts_df,
+            x='Category',
+            y='Count',
+            title='Articles per Category',
+            color='Count',
+            color_continuous_scale='Viridis'
+        )
+        fig.update_layout(showlegend=False, xaxis_tickangle=-45)
+        st.plotly_chart(fig, width='stretch')
+
+@st.fragment
+def show_trends(version, filter_key):
+    """Category trends, bucketed from the per-day aggregates (regrouping reruns this section only)"""
+    import pandas as pd
+    import plotly.express as px
+
+    st.subheader("📉 Category Trends")
+
+    bucket = st.radio("Group by", list(TREND_BUCKETS), index=1, horizontal=True)
+    trend = load_counts(version, ('day', 'llm_category'), **filter_key)
+    trend = trend[trend['day'] != ''].assign(
+        published=lambda t: pd.to_datetime(t['day']).dt.to_period(TREND_BUCKETS[bucket]).dt.start_time
     )
-    fig.update_traces(textposition='inside', textinfo='percent+label')
-    st.plotly_chart(fig, use_container_width=True)
-
-with col2:
-    st.subheader("🌐 Source Distribution")
-    
-    source_counts = filtered_df['source'].value_counts().head(10)
-    
-    fig = px.bar(
-        x=source_counts.values,
-        y=source_counts.index,
-        orientation='h',
-        title="Top 10 News Sources",
-        labels={'x': 'Number of Articles', 'y': 'Source'},
-        color=source_counts.values,
-        color_continuous_scale='Blues'
+    trend = trend.groupby(['published', 'llm_category'], observed=True)['n'].sum().reset_index()
+
+    fig = px.area(
+        trend,
+        x='published',
+        y='n',
+        color='llm_category',
+        title=f"Articles per Category by {bucket}",
+        labels={'published': 'Published', 'n': 'Articles', 'llm_category': 'Category'}
     )
-    fig.update_layout(showlegend=False, yaxis={'categoryorder': 'total ascending'})
-    st.plotly_chart(fig, use_container_width=True)
-
-st.markdown("---")
+    st.plotly_chart(fig, width='stretch')
 
-# Category breakdown
-st.subheader("📈 Category Breakdown")
+@st.fragment
+def show_articles(version, filter_key, total_articles):
+    """Searchable, paged article list (searching and paging rerun this section only)"""
+    import pandas as pd
 
-category_col1, category_col2 = st.columns(2)
-
-with category_col1:
-    category_counts_df = filtered_df['llm_category'].value_counts().reset_index()
-    category_counts_df.columns = ['Category', 'Count']
-    category_counts_df['Percentage'] = (category_counts_df['Count'] / len(filtered_df) * 100).round(1)
-    
-    st.dataframe(
-        category_counts_df,
-        use_container_width=True,
-        hide_index=True
-    )
+    st.subheader("📋 Article Details")
 
-with category_col2:
-    fig = px.bar(
-        category_counts_df,
-        x='Category',
-        y='Count',
-        title='Articles per Category',
-        color='Count',
-        color_continuous_scale='Viridis'
+    # Search box
+    search_term = st.text_input(
+        "🔍 Search articles by title or description:", "",
+        help='"quoted words" match as a phrase, word* as a prefix; title matches are listed first'
     )
-    fig.update_layout(showlegend=False, xaxis_tickangle=-45)
-    st.plotly_chart(fig, use_container_width=True)
 
+    if search_term:
+        # Full-text index lookup, best match first; keep the hits that pass the sidebar filters
+        hits = get_store().search(search_term, limit=SEARCH_LIMIT)
+        if len(hits) == SEARCH_LIMIT:
+            st.caption(f"Searching the {SEARCH_LIMIT} best matches - refine the search to narrow them down")
+        passing = set(get_store().read(
+            ['id'], labeled=True, ids=hits['id'], categories=filter_key['categories'], sources=filter_key['sources'],
+            published_since=filter_key['since'], published_until=filter_key['until']
+        )['id'])
+        hit_ids = [article_id for article_id in hits['id'] if article_id in passing]
+        total_matching = len(hit_ids)
+    else:
+        # The aggregates already know the total - no row is counted here
+        total_matching = total_articles
+
+    sort_col, size_col, page_col = st.columns([2, 1, 1])
+    with sort_col:
+        sort_label = st.selectbox("Sort by", list(SORT_OPTIONS), disabled=bool(search_term),
+                                  help="Search results are listed best match first")
+    with size_col:
+        page_size = st.selectbox("Articles per page", PAGE_SIZES, index=1)
+    with page_col:
+        page_count = max(1, -(-total_matching // page_size))
+        page = st.number_input(f"Page (of {page_count})", min_value=1, max_value=page_count, value=1, step=1)
+
+    offset = (page - 1) * page_size
+    if search_term:
+        page_ids = hit_ids[offset:offset + page_size]
+        display_df = get_store().read(PAGE_COLUMNS, ids=page_ids).set_index('id').loc[page_ids].reset_index()
+    else:
+        display_df = load_page(version, filter_key['categories'], filter_key['sources'], filter_key['since'],
+                               filter_key['until'], SORT_OPTIONS[sort_label], page_size, offset)
+
+    # Display articles
+    if total_matching:
+        st.markdown(f"**Showing {offset + 1}-{offset + len(display_df)} of {total_matching} articles:**")
+    else:
+        st.markdown("**No matching articles.**")
+
+    page_text = load_text(tuple(display_df['id']))
+    vectors_version = get_vectors().version()
+    page_similar = (load_similar((version, vectors_version), tuple(int(r) for r in display_df['rowid']))
+                    if vectors_version else {})
+
+    for idx, row in display_df.iterrows():
+        text = page_text.loc[row['id']]
+        with st.expander(f"🔹 {row['title'][:100]}..."):
+            col1, col2 = st.columns([3, 1])
+
+            with col1:
+                st.markdown(f"**Title:** {row['title']}")
+                st.markdown(f"**Description:** {text['description']}")
+                if pd.notna(text['link']) and text['link']:
+                    st.markdown(f"**Link:** [{text['link']}]({text['link']})")
+
+            with col2:
+                st.markdown(f"**Category:** `{row['llm_category']}`")
+                st.markdown(f"**Source:** {row['source']}")
+                if pd.notna(row['published']):
+                    st.markdown(f"**Date:** {row['published']:%a, %d %b %Y %H:%M} UTC")
+
+            similar = page_similar.get(row['rowid'])
+            if similar:
+                st.markdown("**Similar articles:**\n" + "\n".join(
+                    f"- [{article['title']}]({article['link']}) - {article['source']} `{article['llm_category']}`"
+                    if pd.notna(article['link']) and article['link'] else
+                    f"- {article['title']} - {article['source']} `{article['llm_category']}`"
+                    for article in similar
+                ))
+
+# Heavy sections after the metrics row: charts first, then the fragments
+show_charts(category_counts, source_counts, total_articles)
 st.markdown("---")
-
-# Articles table
-st.subheader("📋 Article Details")
-
-# Search box
-search_term = st.text_input("🔍 Search articles by title or description:", "")
-
-if search_term:
-    display_df = filtered_df[
-        filtered_df['title'].str.contains(search_term, case=False, na=False) |
-        filtered_df['description'].str.contains(search_term, case=False, na=False)
-    ]
-else:
-    display_df = filtered_df
-
-# Display articles
-st.markdown(f"**Showing {len(display_df)} articles:**")
-
-for idx, row in display_df.iterrows():
-    with st.expander(f"🔹 {row['title'][:100]}..."):
-        col1, col2 = st.columns([3, 1])
-        
-        with col1:
-            st.markdown(f"**Title:** {row['title']}")
-            st.markdown(f"**Description:** {row['description']}")
-            if pd.notna(row['link']) and row['link']:
-                st.markdown(f"**Link:** [{row['link']}]({row['link']})")
-        
-        with col2:
-            st.markdown(f"**Category:** `{row['llm_category']}`")
-            st.markdown(f"**Source:** {row['source']}")
-            if pd.notna(row['date']):
-                st.markdown(f"**Date:** {row['date']}")
+show_trends(store_version, filter_key)
+st.markdown("---")
+show_articles(store_version, filter_key, total_articles)
 
 st.markdown("---")
 
@@ -0,0 +1,625 @@
+"""
+Append-Only Article Store
+SQLite-backed storage shared by the scraper, the categorizer and the dashboard
+
+Replaces whole-file CSV rewrites:
+- articles are appended (never rewritten), partitioned by scrape day
+- source and category are dictionary-encoded and read back as pandas
+  categoricals
+- the heavy description/content text lives in its own table, so readers
+  that only need metadata never touch it
+- LLM labels are an append-only ledger; the latest label per article wins,
+  and each one is committed as soon as it arrives, so an interrupted
+  categorization run resumes where it stopped
+- articles that keep failing to categorize end up in a dead-letter list
+- pubDates are parsed once at ingest into an indexed published_at
+  timestamp, so date-range reads and newest-first pages use the index
+- label counts per (publication day, source, category) are kept up to date
+  in a small aggregate table as labels are recorded, so charts never scan
+  the articles
+- titles and descriptions are indexed in an FTS5 full-text index as they
+  are appended (prefix and phrase queries, title matches ranked first)
+
+One-shot migration of the old CSVs:
+    python article_store.py --migrate
+"""
+
+import argparse
+import json
+import os
+import re
+import sqlite3
+from email.utils import parsedate_to_datetime
+
+import pandas as pd
+
+from metrics import METRICS
+from text_normalize import clean_series
+
+DEFAULT_STORE_PATH = '../data/articles.sqlite'
+
+ARTICLE_COLUMNS = ['id', 'title', 'description', 'content', 'source', 'date', 'link', 'scraped_date']
+
+# Column name -> SQL expression (a = articles, t = article_text, s = sources, c = latest label)
+_COLUMN_SQL = {
+    'rowid': 'a.rowid',
+    'id': 'a.id',
+    'title': 'a.title',
+    'description': 't.description',
+    'content': 't.content',
+    'source': 's.name',
+    'date': 'a.date',
+    'link': 'a.link',
+    'scraped_date': 'a.scraped_date',
+    'scrape_day': 'a.scrape_day',
+    'llm_category': 'c.name',
+    'published': 'a.published_at',
+}
+_CATEGORICAL = ('source', 'llm_category')
+_DATETIME = ('published',)
+_RFC822 = '%a, %d %b %Y %H:%M:%S %z'
+_ZONE_NAME = re.compile(r' (?:GMT|UTC|UT|Z)$')
+_EPOCH = pd.Timestamp(0, tz='UTC')
+# UTC publication day of an article (its aggregate bucket)
+_DAY_SQL = "COALESCE(date(a.published_at, 'unixepoch'), a.scrape_day, '')"
+_ORDER_SQL = {
+    'newest': 'a.published_at DESC, a.rowid DESC',
+    'source': 's.name, a.rowid DESC',
+    'llm_category': 'c.name, a.rowid DESC',
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sources (
+    source_id INTEGER PRIMARY KEY,
+    name TEXT UNIQUE NOT NULL
+);
+CREATE TABLE IF NOT EXISTS categories (
+    category_id INTEGER PRIMARY KEY,
+    name TEXT UNIQUE NOT NULL
+);
+CREATE TABLE IF NOT EXISTS articles (
+    id TEXT PRIMARY KEY,
+    title TEXT,
+    source_id INTEGER REFERENCES sources(source_id),
+    date TEXT,
+    link TEXT,
+    scraped_date TEXT,
+    scrape_day TEXT,
+    category_id INTEGER REFERENCES categories(category_id),  -- latest label, kept by append_labels
+    published_at INTEGER  -- pubDate in unix seconds (UTC), the scrape time when missing
+);
+CREATE INDEX IF NOT EXISTS articles_scrape_day ON articles(scrape_day);
+CREATE INDEX IF NOT EXISTS articles_by_source ON articles(source_id);
+CREATE INDEX IF NOT EXISTS articles_by_category ON articles(category_id);
+CREATE INDEX IF NOT EXISTS articles_published ON articles(published_at);
+CREATE TABLE IF NOT EXISTS article_text (
+    id TEXT PRIMARY KEY,
+    description TEXT,
+    content TEXT
+);
+CREATE TABLE IF NOT EXISTS labels (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    id TEXT NOT NULL,
+    category_id INTEGER REFERENCES categories(category_id),
+    labeled_at TEXT DEFAULT CURRENT_TIMESTAMP,
+    labeler TEXT
+);
+CREATE INDEX IF NOT EXISTS labels_by_article ON labels(id, seq);
+CREATE TABLE IF NOT EXISTS failures (
+    id TEXT PRIMARY KEY,
+    attempts INTEGER NOT NULL,
+    last_error TEXT,
+    updated_at TEXT DEFAULT CURRENT_TIMESTAMP
+);
+CREATE TABLE IF NOT EXISTS agg_counts (
+    day TEXT NOT NULL,
+    source_id INTEGER NOT NULL,
+    category_id INTEGER NOT NULL,
+    n INTEGER NOT NULL,
+    PRIMARY KEY (day, source_id, category_id)
+) WITHOUT ROWID;
+CREATE VIRTUAL TABLE IF NOT EXISTS article_fts USING fts5(
+    title, description,
+    content='', prefix='2 3', tokenize='unicode61 remove_diacritics 2'
+);
+"""
+
+# Aggregate dimension name -> (agg_counts key, SQL expression for the name, join resolving it)
+_AGG_SQL = {
+    'day': ('day', 'g.day', None),
+    'source': ('source_id', 's.name', "JOIN sources s ON s.source_id = g.source_id"),
+    'llm_category': ('category_id', 'c.name', "JOIN categories c ON c.category_id = g.category_id"),
+}
+
+_QUERY_TERM = re.compile(r'"[^"]*"?|\S+')
+
+def fts_query(text):
+    """
+    Turn search-box text into an FTS5 query (terms are ANDed):
+        "rate cut"  -> phrase
+        infl*       -> prefix
+    Returns None when nothing searchable is left.
+    """
+    terms = []
+    matches = _QUERY_TERM.findall(text or '')
+    for term in matches:
+        words = re.findall(r'\w+', term)
+        if not words:
+            continue
+        if term.startswith('"'):
+            terms.append('"' + ' '.join(words) + '"')
+            continue
+        terms.extend(f'"{word}"' for word in words)
+        if term.endswith('*'):
+            terms[-1] += '*'
+    return ' '.join(terms) or None
+
+def _clean(value):
+    return None if value is None or (isinstance(value, float) and pd.isna(value)) else value
+
+def _parse_date(date):
+    try:
+        return parsedate_to_datetime(date)
+    except (TypeError, ValueError):
+        return None
+
+def parse_dates(dates):
+    """
+    RSS pubDates -> datetime64[ns, UTC] Series (NaT when unparseable)
+    One vectorized parse for the usual 'Tue, 23 Dec 2025 10:03:56 GMT' form,
+    email.utils for the stragglers
+    """
+    dates = pd.Series(dates, dtype=object)
+    parsed = pd.to_datetime(dates.str.replace(_ZONE_NAME, ' +0000', regex=True),
+                            format=_RFC822, utc=True, errors='coerce')
+    missed = parsed.isna() & dates.notna()
+    if missed.any():
+        parsed[missed] = pd.to_datetime([_parse_date(d) for d in dates[missed]], utc=True)
+    return parsed
+
+def published_timestamps(dates, scraped_dates):
+    """
+    published_at values: pubDates in unix seconds (UTC), parsed once at ingest;
+    the scrape time stands in for a missing or unparseable pubDate
+    """
+    scraped = pd.to_datetime(pd.Series(scraped_dates, dtype=object), format='%Y-%m-%d %H:%M:%S',
+                             utc=True, errors='coerce')
+    seconds = (parse_dates(dates).fillna(scraped) - _EPOCH) // pd.Timedelta(seconds=1)
+    return [None if pd.isna(value) else int(value) for value in seconds]
+
+def _day_bounds(since=None, until=None):
+    """Inclusive 'YYYY-MM-DD' days -> [start, end) unix seconds (None = open)"""
+    start = int(pd.Timestamp(since, tz='UTC').timestamp()) if since else None
+    end = int(pd.Timestamp(until, tz='UTC').timestamp()) + 86400 if until else None
+    return start, end
+
+class ArticleStore:
+    """
+    Usage:
+        store = ArticleStore()
+        store.append_articles(articles)            # list of article dicts
+        store.append_labels({'R001': 'inflation'})
+        df = store.read(['id', 'title', 'llm_category'])
+    """
+
+    def __init__(self, path=DEFAULT_STORE_PATH):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(_SCHEMA)
+        self._refresh_statistics()
+
+    def _refresh_statistics(self):
+        """
+        ANALYZE once the corpus has doubled since the last run (or an index
+        is new) - without row counts the planner sorts whole tables for a
+        paged read instead of walking an index in order
+        """
+        try:
+            analyzed = dict(self.conn.execute("SELECT idx, stat FROM sqlite_stat1 WHERE tbl = 'articles'"))
+        except sqlite3.OperationalError:  # never analyzed
+            analyzed = {}
+        analyzed_rows = int(next(iter(analyzed.values())).split()[0]) if analyzed else 0
+        indexes = {row[1] for row in self.conn.execute("PRAGMA index_list(articles)")}
+        if len(self) > 2 * analyzed_rows or (len(self) and indexes - set(analyzed)):
+            for table in ('articles', 'sources', 'categories'):
+                self.conn.execute(f"ANALYZE {table}")
+
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM articles").fetchone()[0]
+
+    def version(self):
+        """
+        Token that changes whenever articles or labels are written:
+        (last article rowid, last label seq) - two index lookups, cheap to poll
+        """
+        return tuple(self.conn.execute(
+            "SELECT (SELECT MAX(rowid) FROM articles), (SELECT MAX(seq) FROM labels)"
+        ).fetchone())
+
+    def labeled_since(self, version):
+        """Number of articles (re)labeled after the given version() token"""
+        last_seq = version[1] if version else None
+        return self.conn.execute(
+            "SELECT COUNT(DISTINCT id) FROM labels WHERE seq > ?", (last_seq or 0,)
+        ).fetchone()[0]
+
+    def _lookup_id(self, table, key, name):
+        self.conn.execute(f"INSERT OR IGNORE INTO {table} (name) VALUES (?)", (name,))
+        return self.conn.execute(f"SELECT {key} FROM {table} WHERE name = ?", (name,)).fetchone()[0]
+
+    def append_articles(self, articles):
+        """
+        Append article dicts (ARTICLE_COLUMNS); ids already stored are skipped
+        Returns the number of new rows
+        """
+        articles = list(articles)
+        # Indexed text is always clean, even for raw HTML descriptions (legacy CSVs)
+        search_text = clean_series([article.get('description') for article in articles])
+        published = published_timestamps([article.get('date') for article in articles],
+                                         [article.get('scraped_date') for article in articles])
+        inserted = 0
+        with METRICS.timer('store_write_seconds', "Store write transactions", table='articles'), self.conn:
+            for article, description_text, published_at in zip(articles, search_text, published):
+                article = {k: _clean(article.get(k)) for k in ARTICLE_COLUMNS}
+                source_id = self._lookup_id('sources', 'source_id', article['source'] or 'Unknown')
+                cursor = self.conn.execute(
+                    """INSERT OR IGNORE INTO articles
+                       (id, title, source_id, date, link, scraped_date, scrape_day, published_at)
+                       VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+                    (article['id'], article['title'], source_id, article['date'], article['link'],
+                     article['scraped_date'], (article['scraped_date'] or '')[:10], published_at)
+                )
+                if cursor.rowcount:
+                    self.conn.execute(
+                        "INSERT INTO article_text VALUES (?, ?, ?)",
+                        (article['id'], article['description'], article['content'])
+                    )
+                    self.conn.execute(
+                        "INSERT INTO article_fts (rowid, title, description) VALUES (?, ?, ?)",
+                        (cursor.lastrowid, article['title'] or '', description_text)
+                    )
+                    inserted += 1
+        METRICS.counter('articles_stored_total', "New articles appended to the store").inc(inserted)
+        return inserted
+
+    def append_labels(self, labels, labeler=None):
+        """
+        Record categories: {article_id: category} or iterable of (article_id, category)
+        labeler names what produced them (model name, 'local-rules', ...)
+        """
+        items = labels.items() if isinstance(labels, dict) else labels
+        error_id = self._lookup_id('categories', 'category_id', 'error')
+        count = 0
+        with METRICS.timer('store_write_seconds', "Store write transactions", table='labels'), self.conn:
+            for article_id, category in items:
+                count += 1
+                category_id = self._lookup_id('categories', 'category_id', category)
+                previous = self.conn.execute(
+                    "SELECT category_id FROM articles WHERE id = ?", (article_id,)
+                ).fetchone()
+                self.conn.execute(
+                    "INSERT INTO labels (id, category_id, labeler) VALUES (?, ?, ?)",
+                    (article_id, category_id, labeler)
+                )
+                self.conn.execute("UPDATE articles SET category_id = ? WHERE id = ?", (category_id, article_id))
+                self.conn.execute("DELETE FROM failures WHERE id = ?", (article_id,))
+
+                # Move the article's count from its old category to the new one
+                previous_id = previous[0] if previous else None
+                if previous_id != category_id:
+                    if previous_id is not None and previous_id != error_id:
+                        self._bump_aggregate(article_id, previous_id, -1)
+                    if category_id != error_id:
+                        self._bump_aggregate(article_id, category_id, 1)
+        METRICS.counter('articles_labeled_total', "Labels recorded, by labeler",
+                        labeler=labeler or 'unknown').inc(count)
+
+    def _bump_aggregate(self, article_id, category_id, delta):
+        self.conn.execute(
+            f"""INSERT INTO agg_counts SELECT {_DAY_SQL}, a.source_id, ?, ? FROM articles a WHERE a.id = ?
+                ON CONFLICT(day, source_id, category_id) DO UPDATE SET n = n + excluded.n""",
+            (category_id, delta, article_id)
+        )
+
+    def _fill_aggregates(self):
+        self.conn.execute("DELETE FROM agg_counts")
+        self.conn.execute(
+            f"""INSERT INTO agg_counts
+                SELECT {_DAY_SQL} AS day, a.source_id, a.category_id, COUNT(*)
+                FROM articles a JOIN categories c ON c.category_id = a.category_id
+                WHERE c.name != 'error'
+                GROUP BY day, a.source_id, a.category_id"""
+        )
+
+    def relabel(self, labels, labeler=None):
+        """
+        Bulk append_labels for re-categorizing a large part of the archive:
+        everything lands in one transaction (all or nothing), and agg_counts
+        is recomputed once instead of adjusted article by article.
+        Labels of unknown ids are skipped. Returns the number recorded
+        """
+        items = list(labels.items() if isinstance(labels, dict) else labels)
+        with METRICS.timer('store_write_seconds', "Store write transactions", table='labels'), self.conn:
+            for category in {category for _, category in items}:
+                self._lookup_id('categories', 'category_id', category)
+            self.conn.execute("CREATE TEMP TABLE relabel (id TEXT PRIMARY KEY, category_id INTEGER)")
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO temp.relabel SELECT ?, category_id FROM categories WHERE name = ?", items
+            )
+            count = self.conn.execute(
+                """INSERT INTO labels (id, category_id, labeler)
+                   SELECT r.id, r.category_id, ? FROM temp.relabel r JOIN articles a ON a.id = r.id""",
+                (labeler,)
+            ).rowcount
+            self.conn.execute(
+                """UPDATE articles SET category_id = (SELECT category_id FROM temp.relabel r WHERE r.id = articles.id)
+                   WHERE id IN (SELECT id FROM temp.relabel)"""
+            )
+            self.conn.execute("DELETE FROM failures WHERE id IN (SELECT id FROM temp.relabel)")
+            self._fill_aggregates()
+            self.conn.execute("DROP TABLE temp.relabel")
+        METRICS.counter('articles_labeled_total', "Labels recorded, by labeler",
+                        labeler=labeler or 'unknown').inc(count)
+        return count
+
+    def shard_ranges(self, shards):
+        """
+        Split the articles into up to `shards` contiguous, equally sized
+        rowid ranges: [(first, last), ...] inclusive, for read(rowid_range=...)
+        """
+        total = len(self)
+        if not total:
+            return []
+        shards = max(1, min(shards, total))
+        starts = [
+            self.conn.execute("SELECT rowid FROM articles ORDER BY rowid LIMIT 1 OFFSET ?",
+                              (total * k // shards,)).fetchone()[0]
+            for k in range(shards)
+        ]
+        ends = [start - 1 for start in starts[1:]] + [self.conn.execute("SELECT MAX(rowid) FROM articles").fetchone()[0]]
+        return list(zip(starts, ends))
+
+    def search(self, text, limit=200):
+        """
+        Full-text search over titles and descriptions (see fts_query for the
+        syntax); returns a DataFrame of 'id' and 'score', best match first
+
+        Ranking: articles matching in the title (score 2) before the rest
+        (score 1), newest first within each group. Both groups are streamed
+        off the index in rowid order and stop at `limit`, so a common term
+        costs about the same at 1M articles as at 1k - unlike bm25, which
+        reads every match of every term to weigh them.
+        """
+        query = fts_query(text)
+        if query is None:
+            return pd.DataFrame({'id': pd.Series(dtype='object'), 'score': pd.Series(dtype='int')})
+
+        def newest(match):
+            return self.conn.execute(
+                "SELECT rowid FROM article_fts WHERE article_fts MATCH ? ORDER BY rowid DESC", (match,)
+            )
+
+        title_hits = newest(f"title : ({query})")
+        title_hits = title_hits.fetchall() if limit is None else title_hits.fetchmany(limit)
+        scores = {rowid: 2 for (rowid,) in title_hits}
+        if limit is None or len(scores) < limit:
+            for (rowid,) in newest(query):
+                scores.setdefault(rowid, 1)
+                if limit is not None and len(scores) >= limit:
+                    break
+
+        rowids = list(scores)
+        ids = dict(self.conn.execute(
+            "SELECT rowid, id FROM articles WHERE rowid IN (SELECT value FROM json_each(?))", (json.dumps(rowids),)
+        ))
+        return pd.DataFrame({'id': [ids[r] for r in rowids], 'score': [scores[r] for r in rowids]})
+
+    def aggregate(self, by, categories=None, sources=None, since=None, until=None):
+        """
+        Label counts from the aggregate table, never the articles
+
+        by         - one or more of 'day', 'source', 'llm_category'
+        categories - only these category names (None = all)
+        sources    - only these source names (None = all)
+        since/until - inclusive 'YYYY-MM-DD' publication-day bounds
+
+        Returns a DataFrame with the `by` columns and 'n', largest n first
+        """
+        by = [by] if isinstance(by, str) else list(by)
+        unknown = set(by) - set(_AGG_SQL)
+        if unknown:
+            raise ValueError(f"Unknown dimension(s): {sorted(unknown)}")
+
+        # Filter and group on the integer keys; names are joined onto the few result rows
+        where, params = ["n != 0"], []
+        for key, table, values in (('category_id', 'categories', categories), ('source_id', 'sources', sources)):
+            if values is not None:
+                values = list(values)
+                where.append(f"{key} IN (SELECT {key} FROM {table} WHERE name IN ({', '.join('?' * len(values))}))")
+                params.extend(values)
+        if since:
+            where.append("day >= ?")
+            params.append(since)
+        if until:
+            where.append("day <= ?")
+            params.append(until)
+
+        keys = ', '.join(_AGG_SQL[c][0] for c in by)
+        joins = ' '.join(_AGG_SQL[c][2] for c in by if _AGG_SQL[c][2])
+        sql = (
+            f"SELECT {', '.join(_AGG_SQL[c][1] + ' AS ' + c for c in by)}, g.n FROM "
+            f"(SELECT {keys}, SUM(n) AS n FROM agg_counts WHERE {' AND '.join(where)} GROUP BY {keys}) g "
+            f"{joins} WHERE g.n > 0 ORDER BY g.n DESC, {', '.join(by)}"
+        )
+        return pd.read_sql_query(sql, self.conn, params=params)
+
+    def record_failure(self, article_id, error):
+        """Count one more failed categorization attempt for an article"""
+        with self.conn:
+            self.conn.execute(
+                """INSERT INTO failures (id, attempts, last_error) VALUES (?, 1, ?)
+                   ON CONFLICT(id) DO UPDATE SET attempts = attempts + 1,
+                       last_error = excluded.last_error, updated_at = CURRENT_TIMESTAMP""",
+                (article_id, str(error)[:500])
+            )
+        METRICS.counter('articles_failed_total', "Failed categorization attempts").inc()
+
+    def dead_letters(self, max_attempts=3):
+        """Articles that failed categorization at least max_attempts times"""
+        return pd.read_sql_query(
+            """SELECT f.id, a.title, f.attempts, f.last_error, f.updated_at
+               FROM failures f LEFT JOIN articles a ON a.id = f.id
+               WHERE f.attempts >= ? ORDER BY f.updated_at""",
+            self.conn, params=(max_attempts,)
+        )
+
+    def read(self, columns=None, labeled=None, since=None, max_attempts=None,
+             categories=None, sources=None, ids=None, published_since=None, published_until=None,
+             order_by=None, limit=None, offset=0, rowid_range=None, rowids=None, labelers=None):
+        """
+        Load articles as a DataFrame, reading only the requested columns
+
+        columns      - subset of ARTICLE_COLUMNS + ['llm_category', 'scrape_day', 'published', 'rowid']
+                       (default: all); 'published' is published_at as UTC datetime64
+        labeled      - True: only categorized articles, False: only articles
+                       still to categorize (no label yet, or an 'error' label)
+        since        - only partitions scraped on/after this 'YYYY-MM-DD' day
+        max_attempts - leave out dead letters (articles that already failed
+                       categorization this many times)
+        categories   - only articles whose latest label is one of these
+        sources      - only articles from these sources
+        ids          - only these article ids
+        published_since/published_until
+                     - inclusive 'YYYY-MM-DD' UTC publication-day bounds
+        order_by     - 'newest' (by publication time), 'source' or
+                       'llm_category' (ties by arrival, latest first);
+                       default: order of arrival
+        limit/offset - one page of the result
+        rowid_range  - only articles stored at rowids first..last (inclusive),
+                       see shard_ranges
+        rowids       - only the articles stored at these rowids
+        labelers     - only articles whose latest label came from one of
+                       these labelers (None matches labels recorded without
+                       one, e.g. migrated from the legacy CSVs)
+        """
+        columns = columns or ARTICLE_COLUMNS + ['llm_category']
+        unknown = set(columns) - set(_COLUMN_SQL)
+        if unknown:
+            raise ValueError(f"Unknown column(s): {sorted(unknown)}")
+        if order_by is not None and order_by not in _ORDER_SQL:
+            raise ValueError(f"Unknown order: {order_by}")
+
+        joins = []
+        if 'source' in columns or sources is not None or order_by == 'source':
+            joins.append("JOIN sources s ON s.source_id = a.source_id")
+        if {'description', 'content'} & set(columns):
+            joins.append("LEFT JOIN article_text t ON t.id = a.id")
+        if ('llm_category' in columns or labeled is not None or categories is not None
+                or order_by == 'llm_category'):
+            join = "JOIN" if labeled is True or categories is not None else "LEFT JOIN"
+            joins.append(f"{join} categories c ON c.category_id = a.category_id")
+        if max_attempts is not None:
+            joins.append("LEFT JOIN failures f ON f.id = a.id")
+
+        where, params = [], []
+        if labeled is True:
+            where.append("c.name != 'error'")
+        elif labeled is False:
+            where.append("(a.category_id IS NULL OR c.name = 'error')")
+        if max_attempts is not None:
+            where.append("(f.attempts IS NULL OR f.attempts < ?)")
+            params.append(max_attempts)
+        if since:
+            where.append("a.scrape_day >= ?")
+            params.append(since)
+        for column, values in (('c.name', categories), ('s.name', sources), ('a.id', ids), ('a.rowid', rowids)):
+            if values is not None:
+                where.append(f"{column} IN (SELECT value FROM json_each(?))")
+                params.append(json.dumps(list(values)))
+        if labelers is not None:
+            where.append("COALESCE((SELECT l.labeler FROM labels l WHERE l.id = a.id ORDER BY l.seq DESC LIMIT 1), '')"
+                         " IN (SELECT value FROM json_each(?))")
+            params.append(json.dumps([labeler or '' for labeler in labelers]))
+        if rowid_range is not None:
+            where.append("a.rowid BETWEEN ? AND ?")
+            params.extend(rowid_range)
+        start, end = _day_bounds(published_since, published_until)
+        if start is not None:
+            where.append("a.published_at >= ?")
+            params.append(start)
+        if end is not None:
+            where.append("a.published_at < ?")
+            params.append(end)
+
+        sql = (
+            f"SELECT {', '.join(_COLUMN_SQL[c] + ' AS ' + c for c in columns)} FROM articles a "
+            + ' '.join(joins)
+            + (f" WHERE {' AND '.join(where)}" if where else '')
+            + f" ORDER BY {_ORDER_SQL.get(order_by, 'a.rowid')}"
+        )
+        if limit is not None:
+            sql += " LIMIT ? OFFSET ?"
+            params.extend([limit, offset])
+        df = pd.read_sql_query(sql, self.conn, params=params)
+        for column in _CATEGORICAL:
+            if column in df:
+                df[column] = df[column].astype('category')
+        for column in _DATETIME:
+            if column in df:
+                df[column] = pd.to_datetime(df[column], unit='s', utc=True)
+        return df
+
+    def migrate_csvs(self, data_dir='../data'):
+        """
+        One-shot import of the legacy scraped/categorized CSV files
+        Returns (articles imported, labels imported)
+        """
+        frames = []
+        for name in ('scraped_articles.csv', 'categorized_real_articles.csv'):
+            path = os.path.join(data_dir, name)
+            if os.path.exists(path):
+                frames.append(pd.read_csv(path))
+        if not frames:
+            return 0, 0
+
+        df = pd.concat(frames, ignore_index=True).drop_duplicates('id', keep='last')
+        articles = self.append_articles(df.to_dict('records'))
+
+        labels = {}
+        if 'llm_category' in df:
+            labeled = df[df['llm_category'].notna()]
+            labels = dict(zip(labeled['id'], labeled['llm_category']))
+            self.append_labels(labels)
+        return articles, len(labels)
+
+    def close(self):
+        self.conn.close()
+
+def open_store(path=DEFAULT_STORE_PATH, data_dir=None):
+    """
+    Open the store, migrating the legacy CSVs in data_dir the first time
+    """
+    store = ArticleStore(path)
+    if len(store) == 0:
+        articles, labels = store.migrate_csvs(data_dir or os.path.dirname(path) or '.')
+        if articles:
+            print(f"📦 Migrated {articles} articles and {labels} labels from CSV into {path}")
+    return store
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Article store maintenance")
+    parser.add_argument('--store', default=DEFAULT_STORE_PATH)
+    parser.add_argument('--migrate', action='store_true', help="import the legacy CSV files")
+    parser.add_argument('--data-dir', default='../data')
+    args = parser.parse_args()
+
+    store = ArticleStore(args.store)
+    if args.migrate:
+        articles, labels = store.migrate_csvs(args.data_dir)
+        print(f"✓ Migrated {articles} articles and {labels} labels into {args.store}")
+    print(f"📦 {args.store}: {len(store)} articles")
+    store.close()
@@ -0,0 +1,305 @@
+"""
+Async LLM Categorization Engine
+Categorizes many articles concurrently with AsyncOpenAI while staying inside
+the account's requests-per-minute and tokens-per-minute limits
+
+- a fixed pool of workers bounds the number of in-flight requests
+- RPM and TPM token buckets pace requests before they are sent
+- 429 responses pause every worker for the server's Retry-After and halve
+  the request rate; successes recover it gradually (AIMD)
+- several articles can share one request (batch_size), with per-item
+  validation and re-splitting of items that fail to parse
+- results come back in input order
+- every call is recorded in metrics.METRICS: latency histogram, outcome
+  (ok / throttled / retryable / error), retries, tokens from response.usage
+  and LLM cache hits
+"""
+
+import asyncio
+import random
+import time
+
+import openai
+from openai import AsyncOpenAI
+
+from categorize_real_articles import (
+    MODEL,
+    build_batch_messages,
+    build_messages,
+    parse_batch_response,
+    parse_category,
+)
+from metrics import METRICS
+from text_normalize import estimate_tokens
+
+MAX_COMPLETION_TOKENS = 20
+# Reply budget per article in a batch: {"id": "12", "category": "financial_markets"},
+BATCH_TOKENS_PER_ITEM = 20
+
+class CategorizationError(Exception):
+    """A request that failed for good (non-retryable, or out of retries)"""
+
+class TokenBucket:
+    """
+    Async token bucket refilled continuously at `per_minute` tokens per minute
+
+    A bucket can outlive one event loop (a limiter shared by successive
+    categorize_articles calls), so its lock is made for the loop it runs in
+    """
+
+    def __init__(self, per_minute, capacity=None):
+        self.per_minute = per_minute
+        self.capacity = capacity or per_minute
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = None
+        self._lock_loop = None
+
+    def _loop_lock(self):
+        loop = asyncio.get_running_loop()
+        if self._lock_loop is not loop:
+            self._lock, self._lock_loop = asyncio.Lock(), loop
+        return self._lock
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.per_minute / 60)
+        self.updated = now
+
+    async def acquire(self, amount=1):
+        amount = min(amount, self.capacity)
+        async with self._loop_lock():
+            while True:
+                self._refill()
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                await asyncio.sleep((amount - self.tokens) * 60 / self.per_minute)
+
+class AdaptiveRateLimiter:
+    """
+    RPM + TPM buckets with 429-driven backoff
+
+    On a 429 every worker pauses until the Retry-After deadline and the
+    request rate is halved (never below min_rpm); each success adds the rate
+    back in small steps up to the configured maximum.
+
+    Create one per stage or process and pass it to every
+    categorize_articles call, so the budget and the backoff carry over
+    between calls instead of starting from full buckets each time.
+    """
+
+    def __init__(self, rpm=500, tpm=60_000, min_rpm=10):
+        self.max_rpm = rpm
+        self.min_rpm = min(min_rpm, rpm)
+        self.requests = TokenBucket(rpm, capacity=max(1, rpm // 10))
+        self.tokens = TokenBucket(tpm)
+        self.paused_until = 0.0
+        self.throttled = 0
+
+    async def acquire(self, tokens):
+        delay = self.paused_until - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        await self.requests.acquire(1)
+        await self.tokens.acquire(tokens)
+
+    def on_success(self):
+        bucket = self.requests
+        if bucket.per_minute < self.max_rpm:
+            bucket.per_minute = min(self.max_rpm, bucket.per_minute + self.max_rpm / 50)
+
+    def on_throttled(self, retry_after):
+        self.throttled += 1
+        self.paused_until = max(self.paused_until, time.monotonic() + retry_after)
+        self.requests.per_minute = max(self.min_rpm, self.requests.per_minute / 2)
+
+def _retry_after(error, attempt):
+    """Seconds to wait after a 429: the server's Retry-After, else exponential backoff"""
+    headers = getattr(getattr(error, 'response', None), 'headers', None) or {}
+    for header, scale in (('retry-after-ms', 0.001), ('retry-after', 1)):
+        value = headers.get(header)
+        if value:
+            try:
+                return float(value) * scale
+            except ValueError:
+                pass
+    return min(60, 2 ** attempt) * (0.5 + random.random() / 2)
+
+async def categorize_articles_async(articles, api_key=None, base_url=None, client=None,
+                                    concurrency=8, rpm=500, tpm=60_000, max_retries=5,
+                                    batch_size=1, cache=None, on_result=None, on_error=None, limiter=None):
+    """
+    Categorize (title, description) pairs concurrently
+
+    With batch_size > 1, up to batch_size articles share one request (the
+    category guide is sent once per batch). Items whose label fails to parse
+    or isn't in ECONOMIC_CATEGORIES are re-split into smaller batches, down
+    to single-article prompts.
+
+    Returns a list of categories in the same order as `articles`; requests
+    that still fail after max_retries are labeled 'error'.
+    on_result(index, category) is called as each article completes, and
+    on_error(index, message) first for articles that failed.
+
+    limiter is a shared AdaptiveRateLimiter (rpm/tpm are ignored then);
+    without one the call gets its own, starting with full buckets.
+    """
+    own_client = client is None
+    if own_client:
+        # Retries are handled here (rate-aware), not inside the SDK
+        client = AsyncOpenAI(api_key=api_key, base_url=base_url, max_retries=0)
+    if limiter is None:
+        limiter = AdaptiveRateLimiter(rpm=rpm, tpm=tpm)
+    throttled_before = limiter.throttled
+    # single_*: the requests that carried one article, for a like-for-like baseline
+    usage = {'prompt_tokens': 0, 'completion_tokens': 0, 'requests': 0, 'answered': 0,
+             'single_prompt_tokens': 0, 'single_requests': 0}
+    results = [None] * len(articles)
+
+    def finish(index, category, error=None):
+        results[index] = category
+        if error is None:
+            usage['answered'] += 1
+        if cache is not None:
+            cache.put(MODEL, *articles[index], category)
+        if error is not None and on_error is not None:
+            on_error(index, error)
+        if on_result is not None:
+            on_result(index, category)
+
+    pending = []
+    for index, (title, description) in enumerate(articles):
+        cached = cache.get(MODEL, title, description) if cache is not None else None
+        if cache is not None:
+            METRICS.counter('llm_cache_total', "LLM response cache lookups by result",
+                            result='miss' if cached is None else 'hit').inc()
+        if cached is not None:
+            results[index] = cached
+            if on_result is not None:
+                on_result(index, cached)
+        else:
+            pending.append((index, title, description))
+
+    queue = asyncio.Queue()
+    batch_size = max(1, batch_size)
+    for start in range(0, len(pending), batch_size):
+        queue.put_nowait(pending[start:start + batch_size])
+
+    async def request(messages, max_tokens, single=False):
+        """One chat completion with rate limiting and retries"""
+        tokens = sum(estimate_tokens(m['content']) for m in messages) + max_tokens
+        last_error = None
+
+        for attempt in range(max_retries + 1):
+            if attempt:
+                METRICS.counter('llm_retries_total', "Chat completion calls that were retries").inc()
+            await limiter.acquire(tokens)
+            start = time.perf_counter()
+            outcome, backoff = 'error', 0
+            try:
+                response = await client.chat.completions.create(
+                    model=MODEL,
+                    messages=messages,
+                    temperature=0,
+                    max_tokens=max_tokens
+                )
+                outcome = 'ok'
+                limiter.on_success()
+                usage['requests'] += 1
+                if response.usage is not None:
+                    usage['prompt_tokens'] += response.usage.prompt_tokens
+                    usage['completion_tokens'] += response.usage.completion_tokens
+                    if single:
+                        usage['single_prompt_tokens'] += response.usage.prompt_tokens
+                        usage['single_requests'] += 1
+                    METRICS.counter('llm_tokens_total', "Tokens billed (response.usage)",
+                                    kind='prompt').inc(response.usage.prompt_tokens)
+                    METRICS.counter('llm_tokens_total', "Tokens billed (response.usage)",
+                                    kind='completion').inc(response.usage.completion_tokens)
+                return response.choices[0].message.content
+            except openai.RateLimitError as e:
+                outcome = 'throttled'
+                limiter.on_throttled(_retry_after(e, attempt))
+                last_error = e
+            except (openai.APIConnectionError, openai.InternalServerError) as e:
+                outcome, backoff = 'retryable', min(30, 2 ** attempt)
+                last_error = e
+            except Exception as e:
+                print(f"❌ Error: {e}")
+                raise CategorizationError(str(e)) from e
+            finally:
+                METRICS.histogram('llm_request_seconds', "Chat completion latency by outcome",
+                                  outcome=outcome).observe(time.perf_counter() - start)
+                METRICS.counter('llm_requests_total', "Chat completion calls by outcome", outcome=outcome).inc()
+            await asyncio.sleep(backoff)
+        print(f"❌ Error: gave up after {max_retries + 1} attempts")
+        raise CategorizationError(f"gave up after {max_retries + 1} attempts: {last_error}")
+
+    async def categorize_batch(batch):
+        if len(batch) == 1:
+            index, title, description = batch[0]
+            try:
+                content = await request(build_messages(title, description), MAX_COMPLETION_TOKENS, single=True)
+            except CategorizationError as e:
+                finish(index, 'error', str(e))
+                return
+            finish(index, parse_category(content))
+            return
+
+        numbered = [(str(n + 1), title, description) for n, (_, title, description) in enumerate(batch)]
+        try:
+            content = await request(build_batch_messages(numbered), BATCH_TOKENS_PER_ITEM * len(batch) + 10)
+        except CategorizationError as e:
+            for index, _, _ in batch:
+                finish(index, 'error', str(e))
+            return
+
+        parsed = parse_batch_response(content, [batch_id for batch_id, _, _ in numbered])
+        failed = []
+        for (batch_id, _, _), item in zip(numbered, batch):
+            if batch_id in parsed:
+                finish(item[0], parsed[batch_id])
+            else:
+                failed.append(item)
+
+        # Only the items that didn't parse go round again, in smaller batches
+        if failed:
+            half = max(1, len(failed) // 2)
+            for start in range(0, len(failed), half):
+                await categorize_batch(failed[start:start + half])
+
+    async def worker():
+        while True:
+            try:
+                batch = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            await categorize_batch(batch)
+            if cache is not None:
+                cache.flush()
+
+    try:
+        await asyncio.gather(*(worker() for _ in range(max(1, min(concurrency, queue.qsize())))))
+    finally:
+        # Close the connection pool inside this event loop (asyncio.run closes it next)
+        if own_client:
+            await client.close()
+
+    if limiter.throttled > throttled_before:
+        print(f"⏳ Rate limited {limiter.throttled - throttled_before} times (adaptive backoff applied)")
+    if cache is not None:
+        print(f"💾 {cache.summary()}")
+    if usage['answered'] and usage['requests']:
+        # Every billed prompt (re-splits and retries included) over the articles that got a label
+        per_article = usage['prompt_tokens'] / usage['answered']
+        print(f"🧮 Prompt tokens: {usage['prompt_tokens']} in {usage['requests']} requests = "
+              f"{per_article:.0f}/labeled article (batch size {batch_size})")
+        if batch_size > 1 and usage['single_requests']:
+            print(f"   single-article requests in this run: "
+                  f"{usage['single_prompt_tokens'] / usage['single_requests']:.0f} prompt tokens each")
+    return results
+
+def categorize_articles(articles, **kwargs):
+    """Blocking wrapper around categorize_articles_async"""
+    return asyncio.run(categorize_articles_async(articles, **kwargs))
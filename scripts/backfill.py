@@ -0,0 +1,301 @@
+"""
+Archive Backfill
+Re-categorizes every stored article after the prompt or ECONOMIC_CATEGORIES
+change, spread over a pool of worker processes
+
+- the archive is split into contiguous id (rowid) ranges, one shard each
+- every worker process has its own API client and an equal slice of the
+  global --rpm/--tpm budget (one rate limiter per process, shared by all
+  the shards it runs), so the pool as a whole stays inside the limits
+- each shard streams its labels to <work dir>/shard-NNN.jsonl.part, renamed
+  to shard-NNN.jsonl once the shard is complete; an interrupted backfill
+  resumes where it stopped (finished shards are skipped, partial ones
+  continue after their last written article)
+- the live labels are untouched until every shard is done: all shard
+  outputs are then merged into the store in a single transaction
+- progress and ETA are printed while the shards run, and a per-shard
+  report (articles, labeled, failed, first errors) at the end; articles
+  that failed keep their previous label
+
+The LLM response cache is bypassed (a changed prompt must not be answered
+from it) and the local rule classifier is not used. Try it against the mock:
+    python benchmarks/mock_openai_server.py --port 8001 &
+    python scripts/backfill.py --data-dir data --workers 4 --base-url http://127.0.0.1:8001/v1
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import queue
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+from article_store import ArticleStore, open_store
+from async_categorizer import AdaptiveRateLimiter, categorize_articles
+from categorize_real_articles import MODEL, DEFAULT_CONFIG_PATH, load_api_key
+from pipeline import DEFAULT_DATA_DIR, data_paths
+from text_normalize import normalize_frame
+
+WORK_DIR = 'backfill'
+PLAN_FILE = 'plan.json'
+# Seconds between progress messages from a worker (and lines printed by the parent)
+PROGRESS_INTERVAL = 5.0
+
+# This worker process's rate limiter - its budget and backoff carry over from shard to shard
+_limiter = None
+
+def _process_limiter(options):
+    global _limiter
+    if _limiter is None:
+        _limiter = AdaptiveRateLimiter(rpm=options['rpm'], tpm=options['tpm'])
+    return _limiter
+
+def shard_path(work_dir, shard):
+    return os.path.join(work_dir, f"shard-{shard:03d}.jsonl")
+
+def read_shard(path):
+    """Labels and failures written so far: ({id: category}, {id: error})"""
+    labels, failures = {}, {}
+    if not os.path.exists(path):
+        return labels, failures
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                break  # torn last line of an interrupted run - that article is simply redone
+            if 'category' in record:
+                labels[record['id']] = record['category']
+                failures.pop(record['id'], None)
+            else:
+                failures[record['id']] = record['error']
+    return labels, failures
+
+def load_plan(store, work_dir, shards):
+    """
+    Reuse the shard ranges of an interrupted backfill, or plan new ones
+    (articles stored after the plan was made are left to the normal pipeline)
+    """
+    path = os.path.join(work_dir, PLAN_FILE)
+    if os.path.exists(path):
+        with open(path, encoding='utf-8') as f:
+            plan = json.load(f)
+        print(f"↩️  Resuming the backfill planned at {plan['created']} ({len(plan['shards'])} shards)")
+        return plan
+
+    ranges = store.shard_ranges(shards)
+    plan = {
+        'created': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'model': MODEL,
+        'shards': [
+            {'shard': k, 'first': first, 'last': last,
+             'articles': store.conn.execute("SELECT COUNT(*) FROM articles WHERE rowid BETWEEN ? AND ?",
+                                            (first, last)).fetchone()[0]}
+            for k, (first, last) in enumerate(ranges)
+        ],
+    }
+    os.makedirs(work_dir, exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(plan, f, indent=2)
+    os.replace(tmp_path, path)
+    return plan
+
+def run_shard(shard, store_path, work_dir, options, progress):
+    """
+    Worker process: label one rowid range into its shard file
+
+    Counts go to the `progress` queue as (kind, articles, failed) every
+    PROGRESS_INTERVAL seconds - kind 'resumed' for articles already labeled
+    by an interrupted run. Returns the shard report (articles, labeled,
+    failed, first errors, seconds)
+    """
+    start = time.perf_counter()
+    store = ArticleStore(store_path)
+    df = normalize_frame(store.read(['id', 'title', 'description'], rowid_range=(shard['first'], shard['last'])))
+    store.close()
+
+    final_path = shard_path(work_dir, shard['shard'])
+    part_path = final_path + '.part'
+    labels, failures = read_shard(part_path)
+    todo = df[~df['id'].isin(labels.keys())].reset_index(drop=True)
+    resumed = len(df) - len(todo)
+    progress.put(('resumed', resumed, 0))
+
+    counts = {'done': 0, 'failed': 0, 'reported': time.monotonic()}
+    with open(part_path, 'a', encoding='utf-8') as out:
+        def report(force=False):
+            if force or time.monotonic() - counts['reported'] >= PROGRESS_INTERVAL:
+                progress.put(('labeled', counts['done'], counts['failed']))
+                counts.update(done=0, failed=0, reported=time.monotonic())
+
+        def on_error(index, error):
+            failures[todo['id'].iat[index]] = error
+            out.write(json.dumps({'id': todo['id'].iat[index], 'error': str(error)[:500]}) + '\n')
+            counts['failed'] += 1
+
+        def on_result(index, category):
+            if category != 'error':
+                labels[todo['id'].iat[index]] = category
+                out.write(json.dumps({'id': todo['id'].iat[index], 'category': category}) + '\n')
+            counts['done'] += 1
+            report()
+
+        if len(todo):
+            categorize_articles(
+                [(title, description or title) for title, description in zip(todo['title'], todo['description'])],
+                api_key=options['api_key'], base_url=options['base_url'], concurrency=options['concurrency'],
+                batch_size=options['batch_size'], limiter=_process_limiter(options),
+                cache=None, on_result=on_result, on_error=on_error
+            )
+        report(force=True)
+    os.replace(part_path, final_path)
+
+    failed = {article_id: error for article_id, error in failures.items() if article_id not in labels}
+    return {
+        'shard': shard['shard'], 'first': shard['first'], 'last': shard['last'],
+        'articles': len(df), 'labeled': len(labels), 'failed': len(failed), 'resumed': resumed,
+        'errors': sorted(set(failed.values()))[:3], 'seconds': time.perf_counter() - start,
+    }
+
+def _duration(seconds):
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}h{minutes:02d}m" if hours else f"{minutes}m{seconds:02d}s"
+
+def run_backfill(api_key, data_dir=DEFAULT_DATA_DIR, base_url=None, workers=None, shards=None,
+                 concurrency=8, rpm=500, tpm=60_000, batch_size=10, restart=False):
+    """
+    Re-categorize the whole archive with `workers` processes and merge the
+    result into the store in one transaction
+
+    rpm/tpm are the account-wide budget, split evenly between the workers.
+    shards defaults to 4 per worker (small shards balance the load and
+    keep the redo after a crash short). Returns the per-shard reports, or
+    None when a shard failed and nothing was merged.
+    """
+    print("=" * 70)
+    print("ARCHIVE BACKFILL")
+    print("=" * 70)
+
+    workers = workers or os.cpu_count() or 1
+    paths = data_paths(data_dir)
+    work_dir = os.path.join(data_dir, WORK_DIR)
+    if restart and os.path.exists(work_dir):
+        shutil.rmtree(work_dir)
+        print("🗑️  Discarded the previous backfill's shards")
+
+    store = open_store(paths['store'], data_dir=data_dir)
+    plan = load_plan(store, work_dir, shards or workers * 4)
+    store.close()
+    total = sum(shard['articles'] for shard in plan['shards'])
+    pending = [shard for shard in plan['shards'] if not os.path.exists(shard_path(work_dir, shard['shard']))]
+    print(f"📦 {total} articles in {len(plan['shards'])} shards, {len(pending)} still to run on {workers} workers "
+          f"({rpm // workers} rpm / {tpm // workers} tpm each)")
+
+    options = dict(api_key=api_key, base_url=base_url, concurrency=concurrency, batch_size=batch_size,
+                   rpm=max(1, rpm // workers), tpm=max(1, tpm // workers))
+    reports = {}
+    done, failed, crashed = total - sum(shard['articles'] for shard in pending), 0, []
+    started, resumed, printed = time.monotonic(), done, time.monotonic()
+
+    with multiprocessing.Manager() as manager, ProcessPoolExecutor(max_workers=workers) as pool:
+        progress = manager.Queue()
+        futures = {pool.submit(run_shard, shard, paths['store'], work_dir, options, progress): shard
+                   for shard in pending}
+        running = set(futures)
+        while running:
+            finished, running = wait(running, timeout=1.0, return_when=FIRST_COMPLETED)
+            for future in finished:
+                shard = futures[future]
+                try:
+                    reports[shard['shard']] = future.result()
+                except Exception as e:
+                    crashed.append((shard, e))
+                    print(f"✗ Shard {shard['shard']} (rowids {shard['first']}-{shard['last']}) crashed: {e}")
+            while True:
+                try:
+                    kind, n_done, n_failed = progress.get_nowait()
+                except queue.Empty:
+                    break
+                done += n_done
+                failed += n_failed
+                if kind == 'resumed':
+                    resumed += n_done  # not part of this run's rate
+            if time.monotonic() - printed >= PROGRESS_INTERVAL or not running:
+                printed = time.monotonic()
+                rate = (done - resumed) / max(1e-9, printed - started)
+                eta = _duration((total - done) / rate) if rate else '?'
+                print(f"⏳ {done}/{total} ({done / total if total else 1:.0%}) - {rate:.1f} articles/s - "
+                      f"ETA {eta} - {failed} failed")
+
+    if crashed:
+        print(f"\n❌ {len(crashed)} shard(s) crashed - nothing was merged, rerun to resume")
+        return None
+
+    # Every shard is complete: swap the new labels in, all at once
+    labels, failures = {}, {}
+    for shard in plan['shards']:
+        shard_labels, shard_failures = read_shard(shard_path(work_dir, shard['shard']))
+        shard_failures = {k: v for k, v in shard_failures.items() if k not in shard_labels}
+        labels.update(shard_labels)
+        failures.update(shard_failures)
+        # Shards finished by an earlier, interrupted run
+        reports.setdefault(shard['shard'], {
+            'shard': shard['shard'], 'first': shard['first'], 'last': shard['last'],
+            'articles': shard['articles'], 'labeled': len(shard_labels), 'failed': len(shard_failures),
+            'resumed': shard['articles'], 'errors': sorted(set(shard_failures.values()))[:3], 'seconds': 0.0,
+        })
+    store = ArticleStore(paths['store'])
+    merge_start = time.perf_counter()
+    merged = store.relabel(labels, labeler=MODEL)
+    store.close()
+    shutil.rmtree(work_dir)
+
+    elapsed = time.monotonic() - started
+    print("\n" + "=" * 70)
+    print("✅ BACKFILL COMPLETE!")
+    print("=" * 70)
+    print(f"🏷️  Relabeled {merged} of {total} articles in {_duration(elapsed)} "
+          f"(merged in one transaction, {time.perf_counter() - merge_start:.1f}s)")
+    print(f"\n{'shard':>5} {'rowids':>17} {'articles':>9} {'labeled':>9} {'failed':>7} {'time':>8}")
+    for report in sorted(reports.values(), key=lambda r: r['shard']):
+        print(f"{report['shard']:>5} {report['first']:>8}-{report['last']:<8} {report['articles']:>9} "
+              f"{report['labeled']:>9} {report['failed']:>7} {_duration(report['seconds']):>8}")
+        for error in report['errors']:
+            print(f"      ⚠️  {error}")
+    if failures:
+        print(f"\n⚠️  {len(failures)} articles failed and keep their previous label")
+    print(f"✓ Saved to: {paths['store']}")
+    return [reports[k] for k in sorted(reports)]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Re-categorize the whole archive with a pool of worker processes")
+    parser.add_argument('--data-dir', default=DEFAULT_DATA_DIR,
+                        help="directory holding the store (default: the project's data/)")
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument('--shards', type=int, default=None, help="id ranges to split into (default: 4 per worker)")
+    parser.add_argument('--batch-size', type=int, default=10, help="articles per prompt (1 = one prompt each)")
+    parser.add_argument('--concurrency', type=int, default=8, help="in-flight requests per worker")
+    parser.add_argument('--rpm', type=int, default=500, help="requests per minute for the whole pool")
+    parser.add_argument('--tpm', type=int, default=60_000, help="tokens per minute for the whole pool")
+    parser.add_argument('--base-url', default=None, help="OpenAI-compatible endpoint (e.g. a local mock)")
+    parser.add_argument('--restart', action='store_true', help="discard an interrupted backfill and start over")
+    parser.add_argument('--config', default=DEFAULT_CONFIG_PATH,
+                        help="JSON file with openai_api_key (used when OPENAI_API_KEY is unset)")
+    args = parser.parse_args()
+
+    api_key = load_api_key(args.config)
+    if not api_key and args.base_url is None:
+        print(f"\n❌ No API key: set OPENAI_API_KEY or add openai_api_key to {args.config}")
+        exit(1)
+
+    reports = run_backfill(
+        api_key or 'unused', data_dir=args.data_dir, base_url=args.base_url, workers=args.workers,
+        shards=args.shards, concurrency=args.concurrency, rpm=args.rpm, tpm=args.tpm,
+        batch_size=args.batch_size, restart=args.restart
+    )
+    if reports is None:
+        exit(1)
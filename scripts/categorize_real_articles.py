@@ -3,9 +3,17 @@ LLM Categorization for Real Scraped Articles
 Uses OpenAI API to categorize real economic news
 """
 
-import pandas as pd
+import argparse
+import json
+import os
 import time
+import pandas as pd
 from openai import OpenAI
+from article_store import open_store, DEFAULT_STORE_PATH
+from embeddings import ArticleVectors, EMBEDDINGS_DIR
+from local_classifier import route, DEFAULT_THRESHOLD, LOCAL_LABELER
+from metrics import METRICS, enable_profiling, profile_stage
+from text_normalize import normalize_frame
 
 # Economic categories
 ECONOMIC_CATEGORIES = [
@@ -21,18 +29,29 @@ ECONOMIC_CATEGORIES = [
     'general_economics'  # For articles that don't fit other categories
 ]
 
+DEFAULT_CONFIG_PATH = os.path.join(os.path.expanduser('~'), '.economic_news.json')
+
 def setup_openai_client(api_key):
     """Initialize OpenAI client"""
     return OpenAI(api_key=api_key)
 
-def categorize_article(client, title, description):
+def load_api_key(config_path=DEFAULT_CONFIG_PATH):
     """
-    Use LLM to categorize a single article
+    OpenAI API key from the OPENAI_API_KEY environment variable, else from
+    a JSON config file ({"openai_api_key": "sk-..."}); None if neither is set
     """
-    
-    prompt = f"""You are an economic analyst. Categorize this economic news article into ONE of these categories:
+    api_key = os.environ.get('OPENAI_API_KEY')
+    if api_key:
+        return api_key.strip()
+    if config_path and os.path.exists(config_path):
+        with open(config_path, encoding='utf-8') as f:
+            return (json.load(f).get('openai_api_key') or '').strip() or None
+    return None
+
+MODEL = "gpt-3.5-turbo"
+SYSTEM_PROMPT = "You are an expert economic analyst."
 
-Categories:
+CATEGORY_GUIDE = """Categories:
 - inflation: CPI, price changes, inflation rates
 - monetary_policy: Central bank decisions, interest rates, policy changes
 - gdp_growth: Economic growth, GDP reports, recession/expansion
@@ -42,7 +61,15 @@ Categories:
 - commodities: Oil, gold, agricultural products, raw materials
 - financial_markets: Stock markets, currencies, crypto, market volatility
 - productivity: Economic efficiency, tech investment, output per worker
-- general_economics: Economic theory, general economic discussion, economic education
+- general_economics: Economic theory, general economic discussion, economic education"""
+
+def build_prompt(title, description):
+    """
+    Single-article categorization prompt
+    """
+    return f"""You are an economic analyst. Categorize this economic news article into ONE of these categories:
+
+{CATEGORY_GUIDE}
 
 Article:
 Title: {title}
@@ -50,103 +77,268 @@ Description: {description}
 
 Respond with ONLY the category name, nothing else."""
 
+def build_messages(title, description):
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": build_prompt(title, description)}
+    ]
+
+def build_batch_prompt(articles):
+    """
+    Multi-article prompt: the category guide is sent once for the whole batch
+    articles: list of (batch_id, title, description)
+    """
+    items = json.dumps(
+        [{"id": batch_id, "title": title, "description": description} for batch_id, title, description in articles],
+        ensure_ascii=False
+    )
+    return f"""You are an economic analyst. Categorize EACH economic news article below into ONE of these categories:
+
+{CATEGORY_GUIDE}
+
+Articles (JSON):
+{items}
+
+Respond with ONLY a JSON array containing one object per article, like:
+[{{"id": "1", "category": "inflation"}}]"""
+
+def build_batch_messages(articles):
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": build_batch_prompt(articles)}
+    ]
+
+def parse_batch_response(text, batch_ids):
+    """
+    Parse the JSON array reply of a batch prompt
+    Returns {batch_id: category} for items with a valid ECONOMIC_CATEGORIES
+    label; ids missing from the result failed and need a retry.
+    """
+    text = text or ''
+    start, end = text.find('['), text.rfind(']')
+    if start == -1 or end <= start:
+        return {}
+    try:
+        items = json.loads(text[start:end + 1])
+    except ValueError:
+        return {}
+
+    wanted = set(batch_ids)
+    parsed = {}
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        batch_id = str(item.get('id'))
+        category = str(item.get('category', '')).strip().lower()
+        if batch_id in wanted and category in ECONOMIC_CATEGORIES:
+            parsed[batch_id] = category
+    return parsed
+
+def parse_category(text):
+    """Map the model's reply onto ECONOMIC_CATEGORIES"""
+    category = (text or '').strip().lower()
+    return category if category in ECONOMIC_CATEGORIES else 'general_economics'
+
+def categorize_article(client, title, description):
+    """
+    Use LLM to categorize a single article
+    """
     try:
         response = client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": "You are an expert economic analyst."},
-                {"role": "user", "content": prompt}
-            ],
+            model=MODEL,
+            messages=build_messages(title, description),
             temperature=0,
             max_tokens=20
         )
         
-        category = response.choices[0].message.content.strip().lower()
-        
-        if category in ECONOMIC_CATEGORIES:
-            return category
-        else:
-            return 'general_economics'
+        return parse_category(response.choices[0].message.content)
             
     except Exception as e:
         print(f"❌ Error: {e}")
         return 'error'
 
-def categorize_scraped_articles(api_key):
+@profile_stage('categorize')
+def categorize_scraped_articles(api_key, store_path=DEFAULT_STORE_PATH, base_url=None,
+                                concurrency=8, rpm=500, tpm=60_000, batch_size=10,
+                                use_cache=True, clear_cache=False, max_attempts=3,
+                                local_threshold=DEFAULT_THRESHOLD):
     """
-    Categorize all scraped articles
+    Categorize all scraped articles that don't have a category yet
+    
+    Requests run concurrently (see async_categorizer) within the rpm/tpm
+    limits, batch_size articles per prompt (1 = one prompt per article);
+    base_url points the client at another OpenAI-compatible server.
+    
+    Answers are cached on disk (see llm_cache); use_cache=False bypasses the
+    cache and clear_cache=True empties it before the run.
+    
+    Every result is committed to the store as soon as it arrives, so a
+    crashed or killed run loses nothing: rerunning skips articles already
+    labeled and re-queues failed ones. Articles that failed max_attempts
+    times are parked in the store's dead-letter list instead.
+    
+    Obvious headlines are labeled first by the local rule classifier (see
+    local_classifier) when its confidence reaches local_threshold; only the
+    ambiguous rest goes to the LLM. local_threshold=None disables it.
+    
+    The run is timed (and profiled, see metrics.enable_profiling) as the
+    'categorize' stage; LLM latency, tokens, retries and cache hits are
+    collected in metrics.METRICS.
+    
+    Finally the articles stored since the last run are embedded for the
+    dashboard's similar-article lookup (see embeddings).
     """
+    # Imported here: async_categorizer and llm_cache build on this module's prompt helpers
+    from async_categorizer import categorize_articles
+    from llm_cache import LLMCache, DEFAULT_CACHE_PATH
     
     print("=" * 70)
     print("LLM CATEGORIZATION - REAL ARTICLES")
     print("=" * 70)
     
-    # Connect to OpenAI
-    print("\n🔑 Connecting to OpenAI...")
-    client = setup_openai_client(api_key)
-    print("✓ Connected!")
-    
-    # Load scraped articles
-    print("\n📂 Loading real articles...")
-    df = pd.read_csv('../data/scraped_articles.csv')
+    # Load scraped articles still to do (only the columns the prompt needs)
+    print("\n📂 Loading uncategorized articles...")
+    store = open_store(store_path)
+    df = store.read(['id', 'title', 'description'], labeled=False, max_attempts=max_attempts)
+    # Idempotent - also cleans rows scraped before descriptions were normalized
+    df = normalize_frame(df)
     print(f"✓ Loaded {len(df)} real articles!")
     
+    # Local tier: label obvious articles in bulk, for free
+    run_start = time.perf_counter()
+    local_count = 0
+    if local_threshold is not None and len(df):
+        start = time.perf_counter()
+        with METRICS.timer('local_classify_seconds', "Local rule classifier, one batch"):
+            confident, local_categories = route(df['title'], df['description'], local_threshold)
+        store.append_labels(dict(zip(df['id'][confident], local_categories[confident])), labeler=LOCAL_LABELER)
+        local_count = int(confident.sum())
+        local_df = df[confident].assign(llm_category=local_categories[confident])
+        df = df[~confident].reset_index(drop=True)
+        print(f"\n⚡ Labeled {local_count} obvious articles locally "
+              f"({local_count / (local_count + len(df)):.0%}) in {time.perf_counter() - start:.3f}s")
+    
     # Categorize
     print("\n🤖 Starting LLM categorization...\n")
     
-    categories = []
+    articles = [
+        (title, description if pd.notna(description) else title)
+        for title, description in zip(df['title'], df['description'])
+    ]
+    done = []
     
-    for idx, row in df.iterrows():
-        article_id = row['id']
-        title = row['title']
-        description = row['description'] if pd.notna(row['description']) else title
-        
-        category = categorize_article(client, title, description)
-        categories.append(category)
-        
-        print(f"[{idx+1}/{len(df)}] {article_id}: {title[:50]}... → {category}")
-        
-        time.sleep(0.5)  # Rate limit
+    def checkpoint_failure(idx, error):
+        store.record_failure(df['id'].iat[idx], error)
     
-    # Add categories
-    df['llm_category'] = categories
+    def checkpoint(idx, category):
+        # Commit each label right away - a restart picks up from here
+        if category != 'error':
+            store.append_labels({df['id'].iat[idx]: category}, labeler=MODEL)
+        done.append(idx)
+        print(f"[{len(done)}/{len(df)}] {df['id'].iat[idx]}: {df['title'].iat[idx][:50]}... → {category}")
+    
+    cache = LLMCache(DEFAULT_CACHE_PATH) if use_cache else None
+    if cache is not None and clear_cache:
+        cache.clear()
+        print("🗑️  LLM cache cleared")
     
-    # Save
-    output_path = '../data/categorized_real_articles.csv'
-    df.to_csv(output_path, index=False)
+    categories = categorize_articles(
+        articles, api_key=api_key, base_url=base_url,
+        concurrency=concurrency, rpm=rpm, tpm=tpm, batch_size=batch_size,
+        cache=cache, on_result=checkpoint, on_error=checkpoint_failure
+    )
+    if cache is not None:
+        cache.close()
+    
+    # Add categories (already saved one by one)
+    df['llm_category'] = categories
+    if local_count:
+        df = pd.concat([local_df, df], ignore_index=True)
+    elapsed = time.perf_counter() - run_start
+    dead_letters = store.dead_letters(max_attempts)
+    # New articles join the similar-article vectors next to the store
+    embedded = ArticleVectors(os.path.join(os.path.dirname(store_path), EMBEDDINGS_DIR)).update(store)
+    store.close()
     
     print("\n" + "=" * 70)
     print("✅ CATEGORIZATION COMPLETE!")
     print("=" * 70)
-    print(f"\n✓ Saved to: {output_path}")
+    print(f"\n✓ Saved to: {store_path}")
+    if len(df):
+        print(f"⏱️  {len(df)} articles in {elapsed:.1f}s ({len(df) / elapsed:.1f} articles/s), "
+              f"{local_count} labeled locally")
+    
+    if embedded:
+        print(f"🧭 {embedded} new articles embedded for similar-article lookup")
+    
+    failed = int((df['llm_category'] == 'error').sum())
+    if failed:
+        print(f"\n⚠️  {failed} articles failed - they will be retried on the next run")
+    if len(dead_letters):
+        print(f"\n☠️  {len(dead_letters)} articles failed {max_attempts}+ times and are parked as dead letters:")
+        print(dead_letters[['id', 'attempts', 'last_error']].to_string(index=False))
     
     # Summary
     print("\n📊 CATEGORY DISTRIBUTION:")
     print(df['llm_category'].value_counts())
+    print("\n📈 Stage metrics:")
+    print(METRICS.summary())
     
     print("\n" + "=" * 70)
     
     return df
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Categorize scraped articles with the OpenAI API")
+    parser.add_argument('--batch-size', type=int, default=10, help="articles per prompt (1 = one prompt each)")
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--base-url', default=None, help="OpenAI-compatible endpoint (e.g. a local mock)")
+    parser.add_argument('--no-cache', action='store_true', help="bypass the LLM response cache")
+    parser.add_argument('--clear-cache', action='store_true',
+                        help="invalidate the LLM response cache before running")
+    parser.add_argument('--max-attempts', type=int, default=3,
+                        help="failures before an article is parked as a dead letter")
+    parser.add_argument('--local-threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help="confidence needed to label an article locally without the LLM")
+    parser.add_argument('--no-local', action='store_true', help="send every article to the LLM")
+    parser.add_argument('--config', default=DEFAULT_CONFIG_PATH,
+                        help="JSON file with openai_api_key (used when OPENAI_API_KEY is unset)")
+    parser.add_argument('--metrics', default=None,
+                        help="write run metrics here (*.prom: Prometheus text, else JSON lines)")
+    parser.add_argument('--profile', default=None, metavar='DIR', help="profile the run into DIR")
+    parser.add_argument('--profiler', choices=['cprofile', 'pyinstrument'], default='cprofile')
+    args = parser.parse_args()
+    if args.profile:
+        enable_profiling(args.profile, engine=args.profiler)
+    
     print("\n🚀 Real Article LLM Categorization")
     print("=" * 70)
     
-    # Get API key
-    print("\n🔑 Enter your OpenAI API key:")
-    api_key = input("API Key: ").strip()
+    # Get API key: environment, then config file, then prompt
+    api_key = load_api_key(args.config)
+    if not api_key:
+        print("\n🔑 Enter your OpenAI API key:")
+        api_key = input("API Key: ").strip()
     
-    if not api_key.startswith('sk-'):
+    if not api_key.startswith('sk-') and args.base_url is None:
         print("\n❌ Invalid API key!")
         exit(1)
     
     # Run
     try:
-        df = categorize_scraped_articles(api_key)
+        df = categorize_scraped_articles(
+            api_key, base_url=args.base_url, concurrency=args.concurrency,
+            batch_size=args.batch_size, use_cache=not args.no_cache, clear_cache=args.clear_cache,
+            max_attempts=args.max_attempts,
+            local_threshold=None if args.no_local else args.local_threshold
+        )
+        if args.metrics:
+            METRICS.save(args.metrics)
+            print(f"✓ Metrics written to: {args.metrics}")
         
         print("\n✅ All done!")
         print("\nNext steps:")
-        print("1. Check: data/categorized_real_articles.csv")
+        print("1. Check: data/articles.sqlite")
         print("2. Build dashboard to visualize these real results!")
         
     except Exception as e:
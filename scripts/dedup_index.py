@@ -0,0 +1,308 @@
+"""
+Cross-Run Article Deduplication Index
+Remembers every article ever scraped (SQLite) so reruns only emit new stories
+
+An article is a duplicate when any of these match a stored article:
+- canonical link (lower-cased host, no tracking params / fragment)
+- normalized title fingerprint (publisher suffix, case and punctuation
+  removed), published within DUP_WINDOW of it
+- MinHash signature of the title + description character shingles
+  (near-duplicates, e.g. the same wire story syndicated with slightly
+  different wording), published within DUP_WINDOW and looked up through
+  LSH bands so the check stays O(1) per article; articles without a
+  description only near-match the same host, at a stricter threshold
+
+The window keeps recurring headlines ("Stock market today: ...") from
+matching last week's story. New articles are only remembered once
+register() confirms they were stored.
+"""
+
+import hashlib
+import json
+import os
+import random
+import re
+import sqlite3
+import struct
+import time
+from datetime import datetime
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import numpy as np
+import pandas as pd
+
+from article_store import published_timestamps
+from metrics import METRICS
+
+DEFAULT_INDEX_PATH = '../data/dedup_index.sqlite'
+
+# MinHash / LSH parameters: 16 bands x 8 rows catches 95% of pairs at 0.8 Jaccard
+# and few below 0.5; candidates are then confirmed against NEAR_DUP_THRESHOLD
+# (title + description) or TITLE_ONLY_THRESHOLD (either side has no
+# description; same host only). Headlines that differ by one word ("Fed" /
+# "ECB holds rates steady ...") are still ~0.88 Jaccard, so a title-only
+# match has to be all but identical
+NUM_PERM = 128
+BANDS = 16
+ROWS_PER_BAND = NUM_PERM // BANDS
+SHINGLE_SIZE = 5
+NEAR_DUP_THRESHOLD = 0.8
+TITLE_ONLY_THRESHOLD = 0.97
+
+# Title and near-duplicate matches only count between articles published
+# this many seconds apart
+DUP_WINDOW = 24 * 3600
+
+# Leading description characters that go into the signature (shingling cost is per character)
+DESCRIPTION_CHARS = 300
+
+_SEEN_COLUMNS = 'id, url_key, title_key, signature, first_seen, published_at, host, described'
+
+# (a * h + b) mod a 31-bit prime, so every permutation of every shingle hash
+# is computed at once in uint64 without overflow
+_PRIME = (1 << 31) - 1
+_rng = random.Random(1729)  # fixed seed - signatures must be comparable across runs
+_PERM_A = np.array([[_rng.randrange(1, _PRIME)] for _ in range(NUM_PERM)], dtype=np.uint64)
+_PERM_B = np.array([[_rng.randrange(0, _PRIME)] for _ in range(NUM_PERM)], dtype=np.uint64)
+
+TRACKING_PARAMS = {'oc', 'ocid', 'fbclid', 'gclid', 'ref', 'cmp', 'cmpid', 'mc_cid', 'mc_eid', 'smid', 'taid'}
+
+def canonical_url(url):
+    """Normalize a link so the same story always maps to the same key"""
+    if not url:
+        return ''
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith('utm_') and key.lower() not in TRACKING_PARAMS
+    )
+    path = parts.path.rstrip('/') or '/'
+    return urlunsplit((parts.scheme.lower() or 'https', host, path, urlencode(query), ''))
+
+def normalize_title(title, source=None):
+    """Lower-case, drop the ' - Publisher' suffix and punctuation"""
+    title = (title or '').strip()
+    if source and title.endswith(' - ' + source):
+        title = title[:-len(source) - 3]
+    title = re.sub(r'[^\w\s]', ' ', title.lower())
+    return ' '.join(title.split())
+
+def title_fingerprint(normalized_title):
+    return hashlib.sha1(normalized_title.encode('utf-8')).hexdigest()
+
+def minhash_signature(text):
+    """MinHash signature over character shingles of text"""
+    if len(text) <= SHINGLE_SIZE:
+        shingles = {text}
+    else:
+        shingles = {text[i:i + SHINGLE_SIZE] for i in range(len(text) - SHINGLE_SIZE + 1)}
+    hashes = np.array([
+        int.from_bytes(hashlib.blake2b(s.encode('utf-8'), digest_size=8).digest(), 'little') % _PRIME
+        for s in shingles
+    ], dtype=np.uint64)
+    return tuple(((_PERM_A * hashes + _PERM_B) % _PRIME).min(axis=1).tolist())
+
+def _band_keys(signature):
+    for band in range(BANDS):
+        rows = signature[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND]
+        digest = hashlib.blake2b(struct.pack(f'{ROWS_PER_BAND}Q', *rows), digest_size=8).digest()
+        yield band, int.from_bytes(digest, 'little', signed=True)
+
+def _similarity(sig_a, sig_b):
+    return sum(a == b for a, b in zip(sig_a, sig_b)) / NUM_PERM
+
+def _near_duplicate(keys, signature, host, described):
+    """Whether keys' article near-duplicates a stored one (signature, host, described)"""
+    if keys['described'] and described:
+        return _similarity(keys['signature'], signature) >= NEAR_DUP_THRESHOLD
+    return host == keys['host'] and _similarity(keys['signature'], signature) >= TITLE_ONLY_THRESHOLD
+
+class DedupIndex:
+    """
+    Persistent index of seen articles that also hands out stable ids
+
+    Usage:
+        index = DedupIndex()
+        new_articles = index.filter_new(articles)  # each gets a stable 'id'
+        store.append_articles(new_articles)
+        index.register(new_articles)               # only now are they 'seen'
+    """
+
+    def __init__(self, path=DEFAULT_INDEX_PATH, id_prefix='R'):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.id_prefix = id_prefix
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS seen (
+                id TEXT PRIMARY KEY,
+                url_key TEXT,
+                title_key TEXT,
+                signature BLOB,
+                first_seen TEXT,
+                published_at INTEGER,  -- pubDate in unix seconds, the scrape time when missing
+                host TEXT,
+                described INTEGER      -- 1 when the signature covers a description too
+            );
+            CREATE INDEX IF NOT EXISTS seen_url ON seen(url_key);
+            CREATE INDEX IF NOT EXISTS seen_title_published ON seen(title_key, published_at);
+            CREATE TABLE IF NOT EXISTS bands (
+                band INTEGER,
+                bucket INTEGER,
+                id TEXT
+            );
+            CREATE INDEX IF NOT EXISTS bands_lookup ON bands(band, bucket);
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+        """)
+        # Articles passed by filter_new but not yet registered - per connection, never persisted
+        self.conn.executescript(f"""
+            CREATE TEMP TABLE pending_seen AS SELECT {_SEEN_COLUMNS} FROM seen WHERE 0;
+            CREATE TEMP TABLE pending_bands AS SELECT * FROM bands WHERE 0;
+            CREATE UNIQUE INDEX temp.pending_id ON pending_seen(id);
+            CREATE INDEX temp.pending_url ON pending_seen(url_key);
+            CREATE INDEX temp.pending_title ON pending_seen(title_key, published_at);
+            CREATE INDEX temp.pending_bands_lookup ON pending_bands(band, bucket);
+            CREATE TEMP VIEW all_seen AS
+                SELECT {_SEEN_COLUMNS} FROM main.seen UNION ALL SELECT {_SEEN_COLUMNS} FROM pending_seen;
+            CREATE TEMP VIEW all_bands AS SELECT * FROM main.bands UNION ALL SELECT * FROM pending_bands;
+        """)
+
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM seen").fetchone()[0]
+
+    def _next_id(self):
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'next_id'").fetchone()
+        number = int(row[0]) if row else 1
+        self.conn.execute("INSERT OR REPLACE INTO meta VALUES ('next_id', ?)", (str(number + 1),))
+        return self.id_prefix + str(number).zfill(3)
+
+    def _keys(self, articles):
+        """Dedup keys of each article dict"""
+        published = published_timestamps([article.get('date') for article in articles],
+                                         [article.get('scraped_date') for article in articles])
+        keys = []
+        for article, published_at in zip(articles, published):
+            source = article.get('source')
+            title = normalize_title(article.get('title'), source)
+            description = normalize_title(article.get('description'), source)
+            if description.startswith(title):
+                description = description[len(title):].lstrip()  # headline echoed in the description
+            if title.startswith(description) or description == normalize_title(source):
+                # Only the headline or the publisher name left (Google News: "<title> - <publisher>")
+                description = ''
+            description = description[:DESCRIPTION_CHARS]
+            url_key = canonical_url(article.get('link'))
+            keys.append({
+                'url_key': url_key,
+                'title_key': title_fingerprint(title),
+                'signature': minhash_signature(f"{title} {description}".strip()),
+                'published_at': published_at if published_at is not None else int(time.time()),
+                'host': urlsplit(url_key).netloc,
+                'described': int(bool(description)),
+            })
+        return keys
+
+    def _find(self, keys):
+        if keys['url_key']:
+            row = self.conn.execute("SELECT id FROM all_seen WHERE url_key = ?", (keys['url_key'],)).fetchone()
+            if row:
+                return row[0]
+
+        low, high = keys['published_at'] - DUP_WINDOW, keys['published_at'] + DUP_WINDOW
+        row = self.conn.execute(
+            "SELECT id FROM all_seen WHERE title_key = ? AND published_at BETWEEN ? AND ?",
+            (keys['title_key'], low, high)
+        ).fetchone()
+        if row:
+            return row[0]
+
+        candidates = set()
+        for band, bucket in _band_keys(keys['signature']):
+            candidates.update(
+                r[0] for r in self.conn.execute(
+                    "SELECT id FROM all_bands WHERE band = ? AND bucket = ?", (band, bucket)
+                )
+            )
+        for candidate in candidates:
+            stored = self.conn.execute(
+                "SELECT signature, host, described FROM all_seen WHERE id = ? AND published_at BETWEEN ? AND ?",
+                (candidate, low, high)
+            ).fetchone()
+            if stored and _near_duplicate(keys, struct.unpack(f'{NUM_PERM}Q', stored[0]), *stored[1:]):
+                return candidate
+        return None
+
+    def _add(self, article_id, keys, table='seen', bands='bands'):
+        self.conn.execute(
+            f"INSERT OR REPLACE INTO {table} ({_SEEN_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (article_id, keys['url_key'], keys['title_key'], struct.pack(f'{NUM_PERM}Q', *keys['signature']),
+             datetime.now().strftime('%Y-%m-%d %H:%M:%S'), keys['published_at'], keys['host'], keys['described'])
+        )
+        self.conn.executemany(
+            f"INSERT INTO {bands} VALUES (?, ?, ?)",
+            [(band, bucket, article_id) for band, bucket in _band_keys(keys['signature'])]
+        )
+
+    def filter_new(self, articles):
+        """
+        Drop articles already seen (in earlier runs or earlier in this batch)
+        and give the rest a stable id; call register() with the ones that
+        were stored. An earlier batch that was never registered is forgotten.
+        """
+        articles = list(articles)
+        new_articles = []
+        with METRICS.timer('dedup_seconds', "Dedup of one batch (normalize, MinHash, index lookups)"), self.conn:
+            self.conn.execute("DELETE FROM pending_seen")
+            self.conn.execute("DELETE FROM pending_bands")
+            for article, keys in zip(articles, self._keys(articles)):
+                if self._find(keys) is not None:
+                    continue
+                article = dict(article, id=self._next_id())
+                self._add(article['id'], keys, table='pending_seen', bands='pending_bands')
+                new_articles.append(article)
+        METRICS.counter('articles_dedup_total', "Articles checked for duplicates", result='new').inc(len(new_articles))
+        METRICS.counter('articles_dedup_total', "Articles checked for duplicates",
+                        result='duplicate').inc(len(articles) - len(new_articles))
+        return new_articles
+
+    def register(self, articles):
+        """Remember articles returned by filter_new once they are safely stored"""
+        ids = json.dumps([article['id'] for article in articles])
+        with self.conn:
+            self.conn.execute(
+                f"""INSERT OR REPLACE INTO seen ({_SEEN_COLUMNS}) SELECT {_SEEN_COLUMNS} FROM pending_seen
+                    WHERE id IN (SELECT value FROM json_each(?))""", (ids,)
+            )
+            self.conn.execute(
+                "INSERT INTO bands SELECT * FROM pending_bands WHERE id IN (SELECT value FROM json_each(?))", (ids,)
+            )
+            self.conn.execute("DELETE FROM pending_seen WHERE id IN (SELECT value FROM json_each(?))", (ids,))
+            self.conn.execute("DELETE FROM pending_bands WHERE id IN (SELECT value FROM json_each(?))", (ids,))
+
+    def seed_from_csv(self, path):
+        """
+        Register articles from an existing CSV (with 'id' column) so the
+        index starts from the current corpus and new ids continue after it
+        """
+        if not os.path.exists(path):
+            return 0
+        df = pd.read_csv(path)
+        numbers = []
+        with self.conn:
+            records = [{k: (v if pd.notna(v) else '') for k, v in article.items()} for article in df.to_dict('records')]
+            for article, keys in zip(records, self._keys(records)):
+                self._add(article['id'], keys)
+                digits = re.sub(r'\D', '', str(article['id']))
+                if digits:
+                    numbers.append(int(digits))
+            if numbers:
+                self.conn.execute("INSERT OR REPLACE INTO meta VALUES ('next_id', ?)", (str(max(numbers) + 1),))
+        return len(df)
+
+    def close(self):
+        self.conn.close()
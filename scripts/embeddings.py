@@ -0,0 +1,413 @@
+"""
+Article Embeddings
+Local vectors for "similar articles" - CPU only, no model download, no network
+
+- text: hashed TF-IDF over the words of the title (counted twice) and the
+  cleaned description
+- vectors: LSA - a truncated SVD (randomized, numpy only) fitted on a
+  sample of the store projects the hashed space to DIM dimensions
+- storage: one float32 matrix on disk, row = article rowid - 1, which
+  readers memory-map; every stored article is embedded, labeled or not
+  (its text never changes)
+- index: IVF - spherical k-means centroids, every vector filed in the list
+  of its nearest centroid; a lookup scores the centroids and scans only the
+  nprobe closest lists (~nprobe / sqrt(N) of the matrix)
+- update(store) embeds the articles stored since the last call and files
+  them under the existing centroids; the pipeline, the daemon and the
+  categorizer call it after each labeled batch. Once the store has grown
+  REFIT_GROWTH x since the last fit, the SVD is refitted, every article
+  re-embedded and the centroids retrained.
+
+Files live in <data dir>/embeddings/: model.npz (idf weights + projection),
+index.npz (centroids, inverted lists, row count) and vectors-<generation>.f32.
+index.npz is replaced atomically and names its generation, so a reader never
+pairs a new matrix with an old index.
+
+    python embeddings.py --data-dir ../data                  # embed new articles
+    python embeddings.py --data-dir ../data --rebuild        # refit and re-embed everything
+    python embeddings.py --data-dir ../data --similar <article id>
+"""
+
+import argparse
+import contextlib
+import glob
+import os
+import re
+import time
+import zlib
+
+import numpy as np
+import pandas as pd
+
+from metrics import METRICS
+from text_normalize import clean_series
+
+try:
+    import fcntl
+except ImportError:  # Windows - writers aren't serialized there
+    fcntl = None
+
+EMBEDDINGS_DIR = 'embeddings'
+MODEL_FILE = 'model.npz'
+INDEX_FILE = 'index.npz'
+
+DIM = 64
+HASH_BUCKETS = 2 ** 17
+FIT_SAMPLE = 100_000          # articles the SVD and idf weights are fitted on
+OVERSAMPLE = 10               # extra random directions for the randomized SVD
+POWER_ITERATIONS = 2
+REFIT_GROWTH = 2
+MAX_LISTS = 4096
+POINTS_PER_LIST = 50          # k-means training sample per centroid
+KMEANS_ITERATIONS = 10
+NPROBE = 16
+CHUNK = 10_000                # articles embedded / assigned per block
+SEED = 0
+
+_WORD = re.compile(r"[a-z][a-z0-9]+")
+STOPWORDS = frozenset("""
+    about above after again against all also an and any are as at be because been before being below
+    between both but by can could did do does doing down during each few for from further had has have
+    having he her here hers him his how if in into is it its just may me might more most much must my
+    new no nor not now of off on once only or other our out over own said same says she should since so
+    some still such than that the their them then there these they this those through to too under
+    until up very via was we were what when where which while who whom why will with would year years
+    you your
+""".split())
+
+_MARKUP = re.compile(r'[<&]|https?://')
+
+class _Vocabulary(dict):
+    """word -> hash bucket, filled on first sight; stopwords map to -1"""
+
+    def __missing__(self, word):
+        bucket = self[word] = -1 if word in STOPWORDS else zlib.crc32(word.encode()) % HASH_BUCKETS
+        return bucket
+
+_VOCABULARY = _Vocabulary()
+
+def term_counts(titles, descriptions):
+    """
+    Hashed bag of words of every article as CSR arrays (indptr, buckets,
+    counts); title words count twice
+    """
+    descriptions = pd.Series(descriptions, dtype='object').fillna('').astype(str).reset_index(drop=True)
+    raw = descriptions.str.contains(_MARKUP)
+    if raw.any():   # only raw HTML / links need the (slower) cleanup
+        descriptions[raw] = clean_series(descriptions[raw]).to_numpy()
+    lookup = _VOCABULARY.__getitem__
+    lengths, words = [], []
+    for title, description in zip(titles, descriptions):
+        title = title if isinstance(title, str) else ''
+        found = _WORD.findall(f"{title} {title} {description}".lower())
+        lengths.append(len(found))
+        words.extend(map(lookup, found))
+
+    # One (article, bucket) key per word, counted in numpy
+    buckets = np.array(words, dtype=np.int64)
+    rows = np.repeat(np.arange(len(lengths), dtype=np.int64), lengths)
+    keep = buckets >= 0
+    keys, counts = np.unique(rows[keep] * HASH_BUCKETS + buckets[keep], return_counts=True)
+    indptr = np.concatenate([[0], np.cumsum(np.bincount(keys // HASH_BUCKETS, minlength=len(lengths)))])
+    return indptr, keys % HASH_BUCKETS, counts.astype(np.float32)
+
+def _tfidf(indptr, buckets, counts, idf):
+    """Sublinear tf x idf, every row scaled to unit length"""
+    data = (1 + np.log(counts)) * idf[buckets]
+    rows = np.repeat(np.arange(len(indptr) - 1), np.diff(indptr))
+    norms = np.sqrt(np.bincount(rows, weights=data ** 2, minlength=len(indptr) - 1))
+    return (data / np.maximum(norms, 1e-12)[rows]).astype(np.float32)
+
+def _sparse_dot(indptr, indices, data, dense):
+    """CSR matrix @ dense, one block of rows at a time"""
+    n = len(indptr) - 1
+    out = np.zeros((n, dense.shape[1]), dtype=np.float32)
+    for start in range(0, n, CHUNK):
+        stop = min(n, start + CHUNK)
+        low, high = indptr[start], indptr[stop]
+        if low == high:
+            continue
+        starts = indptr[start:stop]
+        nonempty = starts < indptr[start + 1:stop + 1]
+        block = dense[indices[low:high]] * data[low:high, None]
+        out[start:stop][nonempty] = np.add.reduceat(block, starts[nonempty] - low, axis=0)
+    return out
+
+def _sparse_t_dot(indptr, indices, data, dense, n_features):
+    """CSR matrix transposed @ dense, walking the entries in column order"""
+    rows = np.repeat(np.arange(len(indptr) - 1), np.diff(indptr))
+    by_column = np.argsort(indices, kind='stable')
+    out = np.zeros((n_features, dense.shape[1]), dtype=np.float32)
+    step = CHUNK * 20
+    for start in range(0, len(by_column), step):
+        entries = by_column[start:start + step]
+        columns = indices[entries]
+        starts = np.flatnonzero(np.r_[True, columns[1:] != columns[:-1]])
+        # Sorted within a block, so every column appears in one segment; blocks add up
+        out[columns[starts]] += np.add.reduceat(dense[rows[entries]] * data[entries, None], starts, axis=0)
+    return out
+
+def _orthonormalize(y):
+    """Orthonormal basis of y's columns (Cholesky QR - a few matrix products instead of Householder QR)"""
+    gram = y.T.astype(np.float64) @ y
+    lower = np.linalg.cholesky(gram + np.eye(len(gram)) * 1e-9 * max(1.0, np.trace(gram)))
+    return np.linalg.solve(lower, y.T.astype(np.float64)).T.astype(np.float32)
+
+def _normalize(vectors):
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return np.divide(vectors, norms, out=np.zeros_like(vectors), where=norms > 0)
+
+def fit_model(titles, descriptions, dim=DIM, seed=SEED):
+    """
+    idf weights and the LSA projection (HASH_BUCKETS x dim) of a sample of
+    articles: randomized truncated SVD of its TF-IDF matrix (Halko et al.)
+    """
+    indptr, buckets, counts = term_counts(titles, descriptions)
+    n = len(indptr) - 1
+    document_frequency = np.bincount(buckets, minlength=HASH_BUCKETS)
+    idf = (np.log((1 + n) / (1 + document_frequency)) + 1).astype(np.float32)
+    data = _tfidf(indptr, buckets, counts, idf)
+
+    # Only the buckets the sample uses carry weight - the SVD works in that (smaller) column space
+    used, columns = np.unique(buckets, return_inverse=True)
+    rng = np.random.default_rng(seed)
+    rank = max(1, min(dim + OVERSAMPLE, n, len(used)))
+    y = _sparse_dot(indptr, columns, data, rng.standard_normal((len(used), rank), dtype=np.float32))
+    for _ in range(POWER_ITERATIONS):
+        z = _orthonormalize(_sparse_t_dot(indptr, columns, data, _orthonormalize(y), len(used)))
+        y = _sparse_dot(indptr, columns, data, z)
+    q = _orthonormalize(y)
+    _, _, vt = np.linalg.svd(_sparse_t_dot(indptr, columns, data, q, len(used)).T, full_matrices=False)
+    projection = np.zeros((HASH_BUCKETS, dim), dtype=np.float32)
+    projection[used, :min(dim, len(vt))] = vt[:dim].T
+    return idf, projection
+
+def embed(titles, descriptions, idf, projection):
+    """Unit vectors (len(titles) x DIM, float32); all zeros for an article without words"""
+    indptr, buckets, counts = term_counts(titles, descriptions)
+    return _normalize(_sparse_dot(indptr, buckets, _tfidf(indptr, buckets, counts, idf), projection))
+
+def nearest_lists(vectors, centroids):
+    """Index of the nearest centroid of every vector"""
+    nearest = np.empty(len(vectors), dtype=np.int32)
+    for start in range(0, len(vectors), CHUNK):
+        block = np.asarray(vectors[start:start + CHUNK])
+        nearest[start:start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+    return nearest
+
+def train_centroids(vectors, n_lists, rng):
+    """Spherical k-means on a sample of the (unit) vectors"""
+    size = min(len(vectors), n_lists * POINTS_PER_LIST)
+    sample = np.asarray(vectors[np.sort(rng.choice(len(vectors), size=size, replace=False))])
+    sample = sample[sample.any(axis=1)]
+    if not len(sample):
+        return np.zeros((1, vectors.shape[1]), dtype=np.float32)
+    n_lists = min(n_lists, len(sample))
+    centroids = sample[rng.choice(len(sample), size=n_lists, replace=False)]
+    for _ in range(KMEANS_ITERATIONS):
+        nearest = nearest_lists(sample, centroids)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, nearest, sample)
+        empty = np.flatnonzero(np.bincount(nearest, minlength=n_lists) == 0)
+        sums[empty] = sample[rng.choice(len(sample), size=len(empty))]   # re-seed lists that lost every point
+        centroids = _normalize(sums)
+    return centroids
+
+def _inverted_lists(centroids, assignments, generation, count):
+    order = np.argsort(assignments, kind='stable').astype(np.int32)
+    offsets = np.concatenate([[0], np.cumsum(np.bincount(assignments, minlength=len(centroids)))])
+    return {'centroids': centroids, 'assignments': assignments, 'order': order, 'offsets': offsets,
+            'generation': generation, 'count': count}
+
+class ArticleVectors:
+    """
+    Usage:
+        vectors = ArticleVectors('data/embeddings')
+        vectors.update(store)                 # embed the articles stored since the last call
+        vectors.similar([rowid], k=5)         # [[(rowid, score), ...]], best first
+    """
+
+    def __init__(self, directory, nprobe=NPROBE):
+        self.directory = directory
+        self.nprobe = nprobe
+        self._loaded = None      # stat of the index file behind _state
+        self._state = None       # (index, vectors), swapped in one assignment
+        self._model = None       # writer side: idf + projection of the current generation
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    def _vectors_path(self, generation):
+        return self._path(f"vectors-{generation}.f32")
+
+    def _read(self, name):
+        try:
+            with np.load(self._path(name)) as f:
+                return {key: f[key][()] if f[key].ndim == 0 else f[key] for key in f.files}
+        except FileNotFoundError:
+            return None
+
+    def _write(self, name, **arrays):
+        tmp_path = self._path(name + '.tmp')
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, **arrays)
+        os.replace(tmp_path, self._path(name))
+
+    def _open_vectors(self, generation, count):
+        if not count:
+            return np.zeros((0, DIM), dtype=np.float32)
+        return np.memmap(self._vectors_path(generation), dtype=np.float32, mode='r', shape=(count, DIM))
+
+    def version(self):
+        """
+        (generation, embedded rows) of the index on disk, None before the
+        first update; picks up a newer index written by another process
+        """
+        try:
+            stat = os.stat(self._path(INDEX_FILE))
+        except FileNotFoundError:
+            return None
+        loaded = (stat.st_ino, stat.st_mtime_ns)
+        if loaded != self._loaded:
+            index = self._read(INDEX_FILE)
+            self._state = (index, self._open_vectors(int(index['generation']), int(index['count'])))
+            self._loaded = loaded
+        index = self._state[0]
+        return int(index['generation']), int(index['count'])
+
+    def similar(self, rowids, k=5):
+        """
+        The k articles closest to each of the given ones (cosine similarity,
+        best first): one list of (rowid, score) per rowid, empty for an
+        article that isn't embedded yet or has no words
+        """
+        if self.version() is None:
+            return [[] for _ in rowids]
+        index, vectors = self._state
+        centroids, order, offsets = index['centroids'], index['order'], index['offsets']
+        results = []
+        with METRICS.timer('similar_seconds', "Similar-article lookups, one batch"):
+            for rowid in rowids:
+                row = int(rowid) - 1
+                query = np.asarray(vectors[row]) if 0 <= row < len(vectors) else None
+                if query is None or not query.any():
+                    results.append([])
+                    continue
+                probe = np.argsort(centroids @ query)[-self.nprobe:]
+                candidates = np.sort(np.concatenate([order[offsets[l]:offsets[l + 1]] for l in probe]))
+                candidates = candidates[candidates != row]
+                scores = vectors[candidates] @ query
+                best = np.argsort(-scores)[:k] if len(scores) <= k else np.argpartition(-scores, k)[:k]
+                best = best[np.argsort(-scores[best])]
+                results.append([(int(candidates[i]) + 1, float(scores[i])) for i in best if scores[i] > 0])
+        return results
+
+    @contextlib.contextmanager
+    def _writer_lock(self):
+        """One writer at a time (the daemon and a manual run may overlap)"""
+        with open(self._path('.lock'), 'w') as f:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            yield
+
+    def _embed_rows(self, store, model, generation, first, last):
+        """Append the vectors of rowids first..last to the matrix (zeros for rowids without an article)"""
+        path = self._vectors_path(generation)
+        with open(path, 'ab') as f:
+            f.truncate((first - 1) * DIM * 4)   # drop rows a crashed update wrote past the index
+            for start in range(first, last + 1, CHUNK):
+                stop = min(last, start + CHUNK - 1)
+                articles = store.read(['rowid', 'title', 'description'], rowid_range=(start, stop))
+                block = np.zeros((stop - start + 1, DIM), dtype=np.float32)
+                block[articles['rowid'].to_numpy() - start] = embed(
+                    articles['title'], articles['description'], model['idf'], model['projection']
+                )
+                f.write(block.tobytes())
+        return np.memmap(path, dtype=np.float32, mode='r', shape=(last, DIM))
+
+    def _build_index(self, vectors, generation):
+        count = len(vectors)
+        n_lists = max(1, min(MAX_LISTS, int(np.sqrt(count))))
+        centroids = train_centroids(vectors, n_lists, np.random.default_rng(SEED))
+        return _inverted_lists(centroids, nearest_lists(vectors, centroids), generation, count)
+
+    def _rebuild(self, store, last, generation):
+        """Refit the SVD on a sample of the store, then embed and index every article"""
+        start = time.perf_counter()
+        sample = np.unique(np.linspace(1, last, min(FIT_SAMPLE, last)).astype(np.int64))
+        articles = store.read(['title', 'description'], rowids=sample.tolist())
+        idf, projection = fit_model(articles['title'], articles['description'])
+        model = self._model = {'idf': idf, 'projection': projection, 'generation': generation, 'fitted_on': last}
+        self._write(MODEL_FILE, **model)
+
+        vectors = self._embed_rows(store, model, generation, 1, last)
+        self._write(INDEX_FILE, **self._build_index(vectors, generation))
+        for path in glob.glob(self._path('vectors-*.f32')):
+            if path != self._vectors_path(generation):
+                with contextlib.suppress(OSError):   # still mapped by a reader on Windows
+                    os.remove(path)
+        print(f"🧭 Embedded {last} articles (SVD fitted on {len(articles)}) in {time.perf_counter() - start:.1f}s")
+
+    def update(self, store, rebuild=False):
+        """
+        Embed the articles stored since the last update and add them to the
+        index (refitting everything as the store grows, see the module
+        docstring); returns the number of rows embedded
+        """
+        last = store.version()[0] or 0
+        if not last:
+            return 0
+        os.makedirs(self.directory, exist_ok=True)
+        with self._writer_lock(), METRICS.timer('embed_seconds', "Embedding updates (embed + index)"):
+            index, model = self._read(INDEX_FILE), self._model
+            if model is None or index is None or model['generation'] != index['generation']:
+                model = self._model = self._read(MODEL_FILE)
+            # A store smaller than the index was replaced (e.g. restored from a backup)
+            if (rebuild or model is None or index is None or model['generation'] != index['generation']
+                    or last < index['count'] or last >= REFIT_GROWTH * model['fitted_on']):
+                generation = int(index['generation']) + 1 if index is not None else 1
+                self._rebuild(store, last, generation)
+                embedded = last
+            else:
+                generation, count = int(index['generation']), int(index['count'])
+                if last <= count:
+                    return 0
+                vectors = self._embed_rows(store, model, generation, count + 1, last)
+                assignments = np.concatenate([index['assignments'],
+                                              nearest_lists(vectors[count:], index['centroids'])])
+                index = _inverted_lists(index['centroids'], assignments, generation, last)
+                self._write(INDEX_FILE, **index)
+                embedded = last - count
+        METRICS.counter('articles_embedded_total', "Article rows embedded into the vector index").inc(embedded)
+        return embedded
+
+if __name__ == "__main__":
+    from article_store import open_store, DEFAULT_STORE_PATH
+    from pipeline import DEFAULT_DATA_DIR
+
+    parser = argparse.ArgumentParser(description="Embed stored articles for similar-article lookup")
+    parser.add_argument('--data-dir', default=DEFAULT_DATA_DIR,
+                        help="directory holding the store (default: the project's data/)")
+    parser.add_argument('--rebuild', action='store_true', help="refit the SVD and re-embed every article")
+    parser.add_argument('--similar', metavar='ID', help="print the articles most similar to this one")
+    parser.add_argument('-k', type=int, default=10)
+    args = parser.parse_args()
+
+    store = open_store(os.path.join(args.data_dir, os.path.basename(DEFAULT_STORE_PATH)))
+    vectors = ArticleVectors(os.path.join(args.data_dir, EMBEDDINGS_DIR))
+    start = time.perf_counter()
+    embedded = vectors.update(store, rebuild=args.rebuild)
+    print(f"✓ {embedded} new rows embedded in {time.perf_counter() - start:.1f}s "
+          f"({vectors.version()[1] if vectors.version() else 0} in the index)")
+
+    if args.similar:
+        query = store.read(['rowid', 'title'], ids=[args.similar])
+        if query.empty:
+            print(f"❌ No article {args.similar}")
+            exit(1)
+        print(f"\n🔎 {query['title'].iat[0]}")
+        found = vectors.similar([int(query['rowid'].iat[0])], k=args.k)[0]
+        titles = store.read(['rowid', 'title', 'llm_category'], rowids=[r for r, _ in found]).set_index('rowid')
+        for rowid, score in found:
+            print(f"   {score:.2f}  {titles.at[rowid, 'title'][:80]}  [{titles.at[rowid, 'llm_category']}]")
+    store.close()
@@ -0,0 +1,95 @@
+"""
+Conditional GET Feed Cache
+Remembers ETag / Last-Modified validators and parsed items per feed URL,
+so unchanged feeds come back as a cheap 304 and are never reparsed
+"""
+
+import json
+import os
+import threading
+from datetime import datetime
+
+DEFAULT_CACHE_PATH = '../data/feed_cache.json'
+
+class FeedCache:
+    """
+    Persistent on-disk cache of feed validators and parsed articles
+
+    Entries are keyed by feed URL:
+        {url: {'etag': ..., 'last_modified': ..., 'items': [...], 'fetched_at': ...}}
+    Safe to share between the concurrent scraper threads.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH):
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries = {}
+
+        if os.path.exists(path):
+            try:
+                with open(path, encoding='utf-8') as f:
+                    self._entries = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"⚠️  Ignoring unreadable feed cache {path}: {e}")
+
+    def conditional_headers(self, url):
+        """Validator headers to send with the next request for url"""
+        with self._lock:
+            entry = self._entries.get(url)
+        if not entry:
+            return {}
+
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def lookup(self, url, response):
+        """
+        Return the cached items if the server answered 304 Not Modified,
+        otherwise None (the caller has to parse the body)
+        """
+        with self._lock:
+            entry = self._entries.get(url)
+            if response.status_code == 304 and entry is not None:
+                self.hits += 1
+                return list(entry['items'])
+            self.misses += 1
+            return None
+
+    def store(self, url, response, items):
+        """Remember the validators and parsed items of a fresh 200 response"""
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if not etag and not last_modified:
+            return  # nothing to revalidate with next time
+
+        with self._lock:
+            self._entries[url] = {
+                'etag': etag,
+                'last_modified': last_modified,
+                'items': items,
+                'fetched_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            }
+
+    def save(self):
+        """Write the cache to disk atomically"""
+        with self._lock:
+            data = json.dumps(self._entries, ensure_ascii=False)
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(data)
+        os.replace(tmp_path, self.path)
+
+    def summary(self):
+        total = self.hits + self.misses
+        rate = (self.hits / total * 100) if total else 0.0
+        return f"Feed cache: {self.hits} hits / {self.misses} misses ({rate:.0f}% unchanged)"
@@ -0,0 +1,340 @@
+"""
+Continuous Ingestion Daemon
+Polls every feed on its own schedule and categorizes new articles in the
+background, so the store trails the news by minutes instead of waiting for
+someone to run the scraper and the categorizer by hand
+
+- each source is polled every FeedSource.poll_interval seconds, +/- jitter
+  so polls don't line up
+- a poll that brings nothing new doubles that source's interval (up to
+  max_backoff x); the next new article resets it
+- a background worker labels pending articles as soon as they are stored,
+  and retries earlier failures until they become dead letters; each labeled
+  batch is then added to the similar-article vectors (see embeddings)
+- SIGINT/SIGTERM stop the polling, let in-flight work finish and flush
+  everything to disk
+- freshness lag (pubDate -> categorized) is published to
+  <data dir>/freshness_metrics.json
+- stage metrics (feed fetch/parse times, LLM latency, tokens, retries, 429s,
+  cache hits, articles stored/labeled) are rewritten to <data dir>/metrics.prom
+  in Prometheus text format, ready for node_exporter's textfile collector
+
+The API key comes from OPENAI_API_KEY or the config file (never a prompt):
+    python scripts/ingest_daemon.py --data-dir data
+"""
+
+import argparse
+import heapq
+import itertools
+import json
+import os
+import random
+import signal
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+from article_store import ArticleStore, open_store
+from async_categorizer import AdaptiveRateLimiter
+from categorize_real_articles import DEFAULT_CONFIG_PATH, load_api_key
+from dedup_index import DedupIndex
+from embeddings import ArticleVectors
+from feed_cache import FeedCache
+from feed_sources import SOURCES, load_sources
+from llm_cache import LLMCache
+from local_classifier import DEFAULT_THRESHOLD
+from metrics import METRICS, enable_profiling, profile_stage
+from pipeline import DEFAULT_DATA_DIR, data_paths, label_articles
+from scrape_real_news import HostThrottle, create_session, stream_feed
+from text_normalize import normalize_articles, normalize_frame
+
+METRICS_FILE = 'freshness_metrics.json'
+STAGE_METRICS_FILE = 'metrics.prom'
+
+class SourceSchedule:
+    """Polling state of one source: adaptive interval with jitter"""
+
+    def __init__(self, source, jitter=0.1, max_backoff=8):
+        self.source = source
+        self.jitter = jitter
+        self.max_backoff = max_backoff
+        self.empty_polls = 0
+        self.new_articles = 0
+        self.last_poll = None
+        self.next_delay = 0.0
+
+    def record_poll(self, new_count, rng=random):
+        """Update the backoff after a poll; returns seconds until the next one"""
+        self.last_poll = datetime.now(timezone.utc)
+        self.new_articles += new_count
+        self.empty_polls = 0 if new_count else self.empty_polls + 1
+        backoff = min(2 ** self.empty_polls, self.max_backoff)
+        self.next_delay = self.source.poll_interval * backoff * (1 + rng.uniform(-self.jitter, self.jitter))
+        return self.next_delay
+
+def _percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+class FreshnessMetrics:
+    """
+    Lag from publication (pubDate) to categorization over the most recent
+    `window` articles, plus per-source polling state; saved as JSON
+    """
+
+    def __init__(self, path, window=1000):
+        self.path = path
+        self._lock = threading.Lock()
+        self.lags = deque(maxlen=window)
+        self.categorized = 0
+        self.unparseable_dates = 0
+        self.sources = {}
+
+    def record_labeled(self, article, category=None):
+        try:
+            published = parsedate_to_datetime(article.get('date'))
+        except (TypeError, ValueError):
+            published = None
+        with self._lock:
+            self.categorized += 1
+            if published is None:
+                self.unparseable_dates += 1
+                return
+            if published.tzinfo is None:
+                published = published.replace(tzinfo=timezone.utc)
+            self.lags.append((datetime.now(timezone.utc) - published).total_seconds())
+
+    def record_poll(self, schedule):
+        with self._lock:
+            self.sources[schedule.source.name] = {
+                'last_poll': schedule.last_poll.isoformat(timespec='seconds'),
+                'new_articles': schedule.new_articles,
+                'empty_polls_in_a_row': schedule.empty_polls,
+                'next_poll_in_seconds': round(schedule.next_delay),
+            }
+
+    def snapshot(self):
+        with self._lock:
+            lags = list(self.lags)
+            return {
+                'updated_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+                'categorized': self.categorized,
+                'unparseable_dates': self.unparseable_dates,
+                'lag_seconds': {
+                    'window': len(lags),
+                    'p50': round(_percentile(lags, 0.5)) if lags else None,
+                    'p95': round(_percentile(lags, 0.95)) if lags else None,
+                    'max': round(max(lags)) if lags else None,
+                },
+                'sources': dict(self.sources),
+            }
+
+    def save(self):
+        """Atomic write (readers never see a half-written file)"""
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.snapshot(), f, indent=2)
+        os.replace(tmp_path, self.path)
+
+class IngestDaemon:
+    """
+    Usage:
+        daemon = IngestDaemon(api_key, data_dir='data')
+        daemon.run()          # until daemon.stop() / SIGTERM
+    """
+
+    def __init__(self, api_key, data_dir=DEFAULT_DATA_DIR, sources=None, base_url=None,
+                 min_host_interval=2.0, jitter=0.1, max_backoff=8, retry_interval=60,
+                 max_attempts=3, use_cache=True, metrics_path=None, **label_options):
+        self.api_key = api_key
+        self.base_url = base_url
+        self.paths = data_paths(data_dir)
+        self.data_dir = data_dir
+        self.sources = sources or SOURCES
+        self.min_host_interval = min_host_interval
+        self.schedules = [SourceSchedule(source, jitter, max_backoff) for source in self.sources]
+        self.retry_interval = retry_interval
+        self.max_attempts = max_attempts
+        self.use_cache = use_cache
+        self.label_options = label_options
+        self.metrics = FreshnessMetrics(os.path.join(data_dir, METRICS_FILE))
+        self.metrics_path = metrics_path or os.path.join(data_dir, STAGE_METRICS_FILE)
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+
+    def stop(self):
+        """Ask the daemon to shut down (safe to call from a signal handler)"""
+        self._stop.set()
+        self._wake.set()
+
+    def run(self, run_for=None):
+        """Poll and categorize until stop() is called (or run_for seconds pass)"""
+        print("=" * 70)
+        print("INGESTION DAEMON")
+        print("=" * 70)
+        open_store(self.paths['store'], data_dir=self.data_dir).close()
+
+        worker = threading.Thread(target=self._categorize_worker, name='categorize')
+        worker.start()
+        try:
+            self._poll_loop(None if run_for is None else time.monotonic() + run_for)
+        finally:
+            self.stop()
+            worker.join()
+            self.save_metrics()
+            print("\n👋 Daemon stopped")
+
+    def save_metrics(self):
+        """Publish the freshness snapshot and the stage metrics"""
+        self.metrics.save()
+        METRICS.save(self.metrics_path)
+
+    def _fetch(self, source, session, throttle, cache):
+        try:
+            return list(stream_feed(source, session=session, throttle=throttle, timeout=10, cache=cache))
+        except Exception as e:
+            print(f"✗ {source.name} failed: {e}")
+            return []
+
+    @profile_stage('poll')
+    def _poll_loop(self, deadline):
+        session = create_session(pool_size=len(self.sources))
+        throttle = HostThrottle(self.min_host_interval)
+        cache = FeedCache(self.paths['feed_cache'])
+        index = DedupIndex(self.paths['index'])
+        store = ArticleStore(self.paths['store'])
+        if len(index) == 0:
+            index.seed_from_csv(self.paths['seed_csv'])
+
+        order = itertools.count()
+        # Everything is due at start-up; the heap orders later polls by due time
+        due = [(time.monotonic(), next(order), schedule) for schedule in self.schedules]
+        heapq.heapify(due)
+        inflight = {}
+        pool = ThreadPoolExecutor(max_workers=len(self.sources))
+        try:
+            while not self._stop.is_set() and (deadline is None or time.monotonic() < deadline):
+                while due and due[0][0] <= time.monotonic():
+                    _, _, schedule = heapq.heappop(due)
+                    future = pool.submit(self._fetch, schedule.source, session, throttle, cache)
+                    inflight[future] = schedule
+
+                timeout = min(1.0, max(0.0, due[0][0] - time.monotonic())) if due else 1.0
+                if not inflight:
+                    self._stop.wait(timeout)
+                    continue
+                done, _ = wait(inflight, timeout=timeout, return_when=FIRST_COMPLETED)
+                for future in done:
+                    schedule = inflight.pop(future)
+                    delay = self._ingest(schedule, future.result(), index, store)
+                    heapq.heappush(due, (time.monotonic() + delay, next(order), schedule))
+                if done:
+                    cache.save()
+                    METRICS.save(self.metrics_path)
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+            cache.save()
+            index.close()
+            store.close()
+            session.close()
+
+    def _ingest(self, schedule, items, index, store):
+        """Store the new articles of one poll and reschedule the source"""
+        new_articles = index.filter_new(normalize_articles(items))
+        store.append_articles(new_articles)
+        index.register(new_articles)
+        delay = schedule.record_poll(len(new_articles))
+        self.metrics.record_poll(schedule)
+        print(f"📰 {schedule.source.name}: {len(new_articles)} new / {len(items)} items - "
+              f"next poll in {delay:.0f}s")
+        if new_articles:
+            self._wake.set()
+        return delay
+
+    @profile_stage('categorize')
+    def _categorize_worker(self):
+        """Label pending articles whenever new ones arrive (or every retry_interval)"""
+        store = ArticleStore(self.paths['store'])
+        cache = LLMCache(self.paths['llm_cache']) if self.use_cache else None
+        vectors = ArticleVectors(self.paths['embeddings'])
+        micro_batch = self.label_options.get('concurrency', 8) * max(1, self.label_options.get('batch_size', 10))
+        # One rate budget for the daemon's lifetime, not a fresh one per micro-batch
+        limiter = AdaptiveRateLimiter(rpm=self.label_options.get('rpm', 500),
+                                      tpm=self.label_options.get('tpm', 60_000))
+        try:
+            while not self._stop.is_set():
+                self._wake.wait(self.retry_interval)
+                self._wake.clear()
+                pending = store.read(['id', 'title', 'description', 'date'], labeled=False,
+                                     max_attempts=self.max_attempts)
+                articles = normalize_frame(pending).to_dict('records')
+                for start in range(0, len(articles), micro_batch):
+                    if self._stop.is_set():
+                        break
+                    local_count, llm_count, failed = label_articles(
+                        articles[start:start + micro_batch], store, cache, self.api_key,
+                        base_url=self.base_url, on_labeled=self.metrics.record_labeled, limiter=limiter,
+                        **self.label_options
+                    )
+                    vectors.update(store)
+                    self.save_metrics()
+                    lag = self.metrics.snapshot()['lag_seconds']
+                    print(f"🏷️  Labeled {local_count + llm_count} ({local_count} locally), {failed} failed - "
+                          f"freshness lag p50 {lag['p50']}s / p95 {lag['p95']}s")
+        finally:
+            if cache is not None:
+                cache.close()
+            store.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Continuously scrape and categorize economic news")
+    parser.add_argument('--data-dir', default=DEFAULT_DATA_DIR,
+                        help="directory holding the store and caches (default: the project's data/)")
+    parser.add_argument('--sources', default=None, help="JSON feed registry (default: built-in sources)")
+    parser.add_argument('--config', default=DEFAULT_CONFIG_PATH,
+                        help="JSON file with openai_api_key (used when OPENAI_API_KEY is unset)")
+    parser.add_argument('--base-url', default=None, help="OpenAI-compatible endpoint (e.g. a local mock)")
+    parser.add_argument('--jitter', type=float, default=0.1, help="+/- fraction applied to every interval")
+    parser.add_argument('--max-backoff', type=int, default=8,
+                        help="max multiple of a source's interval after polls with nothing new")
+    parser.add_argument('--min-host-interval', type=float, default=2.0)
+    parser.add_argument('--retry-interval', type=float, default=60,
+                        help="seconds between retries of failed articles when nothing new arrives")
+    parser.add_argument('--max-attempts', type=int, default=3)
+    parser.add_argument('--batch-size', type=int, default=10)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--rpm', type=int, default=500)
+    parser.add_argument('--tpm', type=int, default=60_000)
+    parser.add_argument('--no-cache', action='store_true', help="bypass the LLM response cache")
+    parser.add_argument('--local-threshold', type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument('--no-local', action='store_true', help="send every article to the LLM")
+    parser.add_argument('--run-for', type=float, default=None, help="stop after this many seconds")
+    parser.add_argument('--metrics', default=None,
+                        help=f"stage metrics file (*.prom: Prometheus text, else JSON lines; "
+                             f"default: <data dir>/{STAGE_METRICS_FILE})")
+    parser.add_argument('--profile', default=None, metavar='DIR',
+                        help="profile the polling and categorization loops into DIR (written on shutdown)")
+    parser.add_argument('--profiler', choices=['cprofile', 'pyinstrument'], default='cprofile')
+    args = parser.parse_args()
+    if args.profile:
+        enable_profiling(args.profile, engine=args.profiler)
+
+    api_key = load_api_key(args.config)
+    if not api_key and args.base_url is None:
+        print(f"\n❌ No API key: set OPENAI_API_KEY or add openai_api_key to {args.config}")
+        exit(1)
+
+    daemon = IngestDaemon(
+        api_key or 'unused', data_dir=args.data_dir,
+        sources=load_sources(args.sources) if args.sources else None,
+        base_url=args.base_url, min_host_interval=args.min_host_interval, jitter=args.jitter,
+        max_backoff=args.max_backoff, retry_interval=args.retry_interval, max_attempts=args.max_attempts,
+        use_cache=not args.no_cache, metrics_path=args.metrics, batch_size=args.batch_size, concurrency=args.concurrency,
+        rpm=args.rpm, tpm=args.tpm, local_threshold=None if args.no_local else args.local_threshold
+    )
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: daemon.stop())
+    daemon.run(run_for=args.run_for)
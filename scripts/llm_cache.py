@@ -0,0 +1,123 @@
+"""
+Content-Addressed LLM Response Cache
+Categorization runs at temperature=0, so the same (model, prompt, title,
+description) always gets the same answer - serve repeats from disk instead
+of paying for another API call
+
+Keys include PROMPT_VERSION, a fingerprint of the prompt templates and the
+category list, so editing either automatically misses the old entries.
+Entries are evicted least-recently-used once the cache exceeds max_bytes.
+"""
+
+import hashlib
+import os
+import sqlite3
+import time
+
+from categorize_real_articles import ECONOMIC_CATEGORIES, build_batch_prompt, build_prompt
+
+DEFAULT_CACHE_PATH = '../data/llm_cache.sqlite'
+
+# Changes whenever the prompt wording or the category list changes
+PROMPT_VERSION = hashlib.sha256(
+    '\x1f'.join([
+        build_prompt('{title}', '{description}'),
+        build_batch_prompt([('{id}', '{title}', '{description}')]),
+        ','.join(ECONOMIC_CATEGORIES),
+    ]).encode('utf-8')
+).hexdigest()[:16]
+
+# Per-row bookkeeping on top of key + value (rowid, timestamps, index entry)
+_ROW_OVERHEAD = 48
+
+def cache_key(model, title, description, prompt_version=PROMPT_VERSION):
+    return hashlib.sha256(
+        '\x1f'.join([model, prompt_version, title or '', description or '']).encode('utf-8')
+    ).hexdigest()
+
+class LLMCache:
+    """
+    Usage:
+        cache = LLMCache()
+        category = cache.get(MODEL, title, description)   # None on a miss
+        cache.put(MODEL, title, description, category)
+        cache.flush()
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_bytes=64 * 1024 * 1024):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                category TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                last_access REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS responses_lru ON responses(last_access);
+        """)
+        self.total_bytes = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def get(self, model, title, description):
+        key = cache_key(model, title, description)
+        row = self.conn.execute("SELECT category FROM responses WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (time.time(), key))
+        return row[0]
+
+    def put(self, model, title, description, category):
+        """Remember a successful answer ('error' results are never cached)"""
+        if category == 'error':
+            return
+        key = cache_key(model, title, description)
+        size = len(key) + len(category) + _ROW_OVERHEAD
+        cursor = self.conn.execute(
+            "INSERT OR IGNORE INTO responses VALUES (?, ?, ?, ?)", (key, category, size, time.time())
+        )
+        if cursor.rowcount:
+            self.total_bytes += size
+        if self.total_bytes > self.max_bytes:
+            self._evict()
+
+    def _evict(self):
+        """Drop least-recently-used entries until the cache is back under 90% of max_bytes"""
+        target = self.max_bytes * 0.9
+        rows = self.conn.execute("SELECT key, size FROM responses ORDER BY last_access")
+        doomed = []
+        for key, size in rows:
+            if self.total_bytes <= target:
+                break
+            doomed.append((key,))
+            self.total_bytes -= size
+        self.conn.executemany("DELETE FROM responses WHERE key = ?", doomed)
+
+    def flush(self):
+        self.conn.commit()
+
+    def clear(self):
+        """Invalidate everything (e.g. after changing the model's behaviour out of band)"""
+        with self.conn:
+            self.conn.execute("DELETE FROM responses")
+        self.total_bytes = 0
+
+    def summary(self):
+        total = self.hits + self.misses
+        rate = (self.hits / total * 100) if total else 0.0
+        return (f"LLM cache: {self.hits} hits / {self.misses} misses ({rate:.0f}% hit rate), "
+                f"{len(self)} entries, {self.total_bytes / 1024:.0f} KiB")
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
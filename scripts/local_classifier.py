@@ -0,0 +1,159 @@
+"""
+Local Zero-Cost Pre-Classifier
+Keyword/regex rule engine that labels obvious headlines ("CPI", "Fed raises
+rates", "jobs report", "oil prices") without an LLM round trip
+
+Scoring is vectorized over a whole batch: one compiled pattern per category
+is counted across the title and description columns with pandas string
+methods. Title matches weigh double. Confidence is the winning score's share
+of all scores (with a +1 smoothing term), so a single weak hit or two
+competing categories stay below the threshold and go to the LLM.
+
+Evaluate against the labels the LLM already produced:
+    python local_classifier.py
+"""
+
+import argparse
+import re
+import time
+
+import pandas as pd
+
+LOCAL_LABELER = 'local-rules'
+DEFAULT_THRESHOLD = 0.75
+
+# Weighted patterns per category - weight 3 = near-certain signal, 1 = hint
+RULES = {
+    'inflation': [
+        (r'\binflation\b|\bcpi\b|consumer price index|\bpce\b|cost of living', 3),
+        (r'\bprices? (?:rise|rises|rising|soar|surge|jump)|\bdeflation\b|price pressures', 2),
+    ],
+    'monetary_policy': [
+        (r'\b(?:fed|federal reserve|ecb|bank of england|boe|boj|central bank)\b.{0,40}\brates?\b', 3),
+        (r'\brate (?:cut|hike|rise|decision)s?\b|\bfomc\b|monetary policy|\bpowell\b|\blagarde\b|\bbailey\b', 3),
+        (r'\binterest rates?\b|quantitative (?:easing|tightening)', 2),
+    ],
+    'gdp_growth': [
+        (r'\bgdp\b|gross domestic product', 3),
+        (r'\brecession\b|economic growth|economy (?:grew|shrank|contracted|expanded)', 2),
+        (r'\bgrowth\b', 1),
+    ],
+    'employment': [
+        (r'jobs report|nonfarm payrolls?|\bpayrolls?\b|unemployment|jobless claims', 3),
+        (r'labou?r market|\bhiring\b|\blayoffs?\b|\bwages?\b|\bworkers\b|\bjobs\b', 2),
+    ],
+    'trade': [
+        (r'\btariffs?\b|trade (?:war|deal|deficit|surplus|balance)', 3),
+        (r'\bimports?\b|\bexports?\b|\bwto\b|supply chains?', 2),
+    ],
+    'housing': [
+        (r'house prices|home prices|housing market|\bmortgages?\b|\bhousing\b', 3),
+        (r'\brents?\b|\brental\b|property market|\bconstruction\b|home ?sales', 2),
+    ],
+    'commodities': [
+        (r'\boil prices?\b|\bbrent\b|\bwti\b|\bopec\b|\bgold prices?\b', 3),
+        (r'\boil\b|\bgold\b|\bcopper\b|\bwheat\b|natural gas|\bcommodit(?:y|ies)\b', 2),
+    ],
+    'financial_markets': [
+        (r'\bs&p 500\b|\bdow\b|\bnasdaq\b|\bftse\b|wall street|stock market|\bstocks\b|\bshares\b', 3),
+        (r'\bbitcoin\b|\bcrypto|\bbonds?\b|\byields?\b|\bcurrenc(?:y|ies)\b|\bdollar\b|\bmarkets?\b', 2),
+    ],
+    'productivity': [
+        (r'\bproductivity\b|output per (?:worker|hour)', 3),
+        (r'\bautomation\b|tech investment|\befficiency\b', 1),
+    ],
+}
+
+_TAGS = re.compile(r'<[^>]+>')
+
+def _compile(patterns):
+    return [(re.compile(pattern, re.IGNORECASE), weight) for pattern, weight in patterns]
+
+_COMPILED = {category: _compile(patterns) for category, patterns in RULES.items()}
+
+def score_frame(titles, descriptions=None):
+    """
+    Vectorized rule scores: DataFrame (one column per category) aligned with titles
+    """
+    titles = pd.Series(titles, dtype='object').fillna('').astype(str)
+    if descriptions is None:
+        descriptions = pd.Series('', index=titles.index)
+    else:
+        descriptions = pd.Series(descriptions, index=titles.index, dtype='object').fillna('').astype(str)
+        descriptions = descriptions.str.replace(_TAGS, ' ', regex=True)
+
+    scores = {}
+    for category, patterns in _COMPILED.items():
+        total = 0
+        for pattern, weight in patterns:
+            # Title hits count double; description hits are capped at one per pattern
+            total = total + weight * (2 * titles.str.count(pattern) + descriptions.str.contains(pattern))
+        scores[category] = total
+    return pd.DataFrame(scores, index=titles.index)
+
+def classify_frame(titles, descriptions=None):
+    """
+    Returns a DataFrame with 'category' and 'confidence' for every row
+    """
+    scores = score_frame(titles, descriptions)
+    values = scores.to_numpy(dtype=float)
+    top = values.max(axis=1)
+    confidence = top / (values.sum(axis=1) + 1.0)
+    return pd.DataFrame({
+        'category': scores.idxmax(axis=1).where(top > 0, 'general_economics'),
+        'confidence': confidence,
+    }, index=scores.index)
+
+def route(titles, descriptions=None, threshold=DEFAULT_THRESHOLD):
+    """
+    Split a batch into locally labeled rows and rows that need the LLM
+
+    Returns (confident mask, categories) - categories are only meaningful
+    where the mask is True
+    """
+    result = classify_frame(titles, descriptions)
+    return result['confidence'] >= threshold, result['category']
+
+def evaluate(df, threshold=DEFAULT_THRESHOLD):
+    """
+    Compare local labels with LLM labels on already-categorized articles
+    (the rules aren't trained on them, so every labeled row is held out);
+    df must only hold LLM labels - rows the rules labeled would agree with
+    themselves
+    """
+    start = time.perf_counter()
+    confident, categories = route(df['title'], df.get('description'), threshold)
+    seconds = time.perf_counter() - start
+
+    routed = int(confident.sum())
+    agreement = (categories[confident] == df['llm_category'][confident].astype(str)).mean() if routed else float('nan')
+    return {
+        'articles': len(df),
+        'routed_locally': routed,
+        'local_fraction': routed / len(df) if len(df) else 0.0,
+        'agreement_with_llm': agreement,
+        'articles_per_second': len(df) / seconds if seconds else float('inf'),
+    }
+
+if __name__ == "__main__":
+    from article_store import open_store, DEFAULT_STORE_PATH
+    from categorize_real_articles import MODEL
+
+    parser = argparse.ArgumentParser(description="Evaluate the local rule classifier against LLM labels")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument('--store', default=DEFAULT_STORE_PATH)
+    args = parser.parse_args()
+
+    store = open_store(args.store)
+    # Legacy labels (no labeler recorded) came from the LLM as well
+    df = store.read(['id', 'title', 'description', 'llm_category'], labeled=True, labelers=[MODEL, None])
+    store.close()
+
+    report = evaluate(df, args.threshold)
+    print("=" * 70)
+    print("LOCAL PRE-CLASSIFIER EVALUATION")
+    print("=" * 70)
+    print(f"Articles (LLM-labeled, held out): {report['articles']}")
+    print(f"Routed locally @ {args.threshold:.2f}:      {report['routed_locally']} ({report['local_fraction']:.0%})")
+    print(f"Agreement with LLM on routed:     {report['agreement_with_llm']:.0%}")
+    print(f"Throughput:                       {report['articles_per_second']:,.0f} articles/s")
@@ -0,0 +1,318 @@
+"""
+Pipeline Metrics
+Process-wide counters and latency histograms for every stage (feed fetch and
+parse, dedup, LLM calls, store writes), exported as Prometheus text or JSON
+lines, plus an optional profiler around any stage
+
+    from metrics import METRICS, profile_stage
+
+    METRICS.counter('llm_requests_total', "Chat completions by outcome", outcome='ok').inc()
+    with METRICS.timer('feed_fetch_seconds', "Time to response headers", source=name):
+        response = fetch_feed(url)
+    with profile_stage('categorize'):     # stage_seconds{stage}, profiled when enabled
+        ...
+
+    METRICS.save('data/metrics.prom')     # .prom: Prometheus text, atomic rewrite
+    METRICS.save('data/metrics.jsonl')    # anything else: one JSON snapshot appended per call
+
+Profiling is off until enable_profiling(output_dir) is called; each profiled
+stage then writes <stage>-<time>.prof (cProfile, open with pstats/snakeviz)
+or .html (pyinstrument, when installed and requested).
+"""
+
+import bisect
+import contextlib
+import json
+import os
+import threading
+import time
+from datetime import datetime, timezone
+
+# Prefix of every exported Prometheus metric
+NAMESPACE = 'economic_news'
+
+# Seconds - covers a single store write (sub-ms) up to a slow, retried LLM call
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+class Counter:
+    """Monotonic count (requests, tokens, articles)"""
+
+    kind = 'counter'
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.value = 0
+
+    def inc(self, amount=1):
+        with self._lock:
+            self.value += amount
+
+    def snapshot(self):
+        return {'value': self.value}
+
+class Histogram:
+    """Observations sorted into fixed buckets (Prometheus style), plus count, sum, min and max"""
+
+    kind = 'histogram'
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self._lock = threading.Lock()
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)   # the last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.min = None
+        self.max = None
+
+    def observe(self, value):
+        with self._lock:
+            self.counts[bisect.bisect_left(self.buckets, value)] += 1
+            self.count += 1
+            self.sum += value
+            self.min = value if self.min is None else min(self.min, value)
+            self.max = value if self.max is None else max(self.max, value)
+
+    def quantile(self, q):
+        """
+        Estimate from the buckets (linear within a bucket, clamped to the
+        observed min/max); None before any observation
+        """
+        with self._lock:
+            counts, total, low, high = list(self.counts), self.count, self.min, self.max
+        if not total:
+            return None
+        rank = q * total
+        seen = 0
+        estimate = high
+        for i, n in enumerate(counts):
+            if n and seen + n >= rank:
+                lower = self.buckets[i - 1] if i else 0.0
+                upper = self.buckets[i] if i < len(self.buckets) else high
+                estimate = lower + (upper - lower) * (rank - seen) / n
+                break
+            seen += n
+        return min(high, max(low, estimate))
+
+    def snapshot(self):
+        with self._lock:
+            cumulative, running = {}, 0
+            for bound, n in zip(self.buckets + ('+Inf',), self.counts):
+                running += n
+                cumulative[str(bound)] = running
+            record = {'count': self.count, 'sum': round(self.sum, 6), 'min': self.min, 'max': self.max,
+                      'buckets': cumulative}
+        for name, q in (('p50', 0.5), ('p95', 0.95), ('p99', 0.99)):
+            value = self.quantile(q)
+            record[name] = None if value is None else round(value, 6)
+        return record
+
+def _duration(seconds):
+    return f"{seconds * 1000:.1f}ms" if seconds < 1 else f"{seconds:.2f}s"
+
+def _format_labels(labels, extra=None):
+    pairs = list(labels) + ([extra] if extra else [])
+    if not pairs:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in pairs)
+    return '{' + ','.join(f'{key}="{value}"' for (key, _), value in zip(pairs, escaped)) + '}'
+
+class MetricsRegistry:
+    """
+    Named metrics, one instance per (name, labels) pair, created on first use
+
+    Usage:
+        registry = MetricsRegistry()
+        registry.counter('articles_stored_total', "Articles appended to the store").inc(25)
+        registry.histogram('llm_request_seconds', "Chat completion latency").observe(0.8)
+        print(registry.to_prometheus())
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()   # several threads may publish to the same file
+        self._metrics = {}
+        self._help = {}
+        self.started = time.monotonic()
+
+    def _get(self, factory, name, doc, labels, **options):
+        key = (name, tuple(sorted(labels.items())))
+        metric = self._metrics.get(key)
+        if metric is None:
+            with self._lock:
+                metric = self._metrics.get(key)
+                if metric is None:
+                    metric = self._metrics[key] = factory(**options)
+                    self._help.setdefault(name, doc)
+        return metric
+
+    def counter(self, name, doc='', **labels):
+        return self._get(Counter, name, doc, labels)
+
+    def histogram(self, name, doc='', buckets=LATENCY_BUCKETS, **labels):
+        return self._get(Histogram, name, doc, labels, buckets=buckets)
+
+    @contextlib.contextmanager
+    def timer(self, name, doc='', **labels):
+        """Observe the seconds spent in the with-block (also when it raises)"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.histogram(name, doc, **labels).observe(time.perf_counter() - start)
+
+    def total(self, name, **labels):
+        """Sum of a counter over every label set matching `labels` (0 if never used)"""
+        wanted = set(labels.items())
+        with self._lock:
+            items = list(self._metrics.items())
+        return sum(metric.value for (metric_name, metric_labels), metric in items
+                   if metric_name == name and metric.kind == 'counter' and wanted <= set(metric_labels))
+
+    def reset(self):
+        with self._lock:
+            self._metrics.clear()
+            self._help.clear()
+            self.started = time.monotonic()
+
+    def _sorted(self):
+        with self._lock:
+            return sorted(self._metrics.items(), key=lambda item: item[0]), dict(self._help)
+
+    def to_prometheus(self):
+        """Prometheus text exposition format (node_exporter textfile collector ready)"""
+        items, docs = self._sorted()
+        uptime = f'{NAMESPACE}_uptime_seconds'
+        lines = [f"# HELP {uptime} Seconds since the metrics were started",
+                 f"# TYPE {uptime} gauge", f"{uptime} {time.monotonic() - self.started:.3f}"]
+        current = None
+        for (name, labels), metric in items:
+            full_name = f'{NAMESPACE}_{name}'
+            if name != current:
+                current = name
+                lines.append(f"# HELP {full_name} {docs.get(name) or name}")
+                lines.append(f"# TYPE {full_name} {metric.kind}")
+            if metric.kind == 'counter':
+                lines.append(f"{full_name}{_format_labels(labels)} {metric.value}")
+                continue
+            record = metric.snapshot()
+            for bound, n in record['buckets'].items():
+                lines.append(f"{full_name}_bucket{_format_labels(labels, ('le', bound))} {n}")
+            lines.append(f"{full_name}_sum{_format_labels(labels)} {record['sum']}")
+            lines.append(f"{full_name}_count{_format_labels(labels)} {record['count']}")
+        return '\n'.join(lines) + '\n'
+
+    def to_json(self):
+        """One snapshot as a dict (histograms carry bucket-estimated p50/p95/p99)"""
+        items, _ = self._sorted()
+        return {
+            'time': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'uptime_seconds': round(time.monotonic() - self.started, 3),
+            'metrics': [
+                {'name': name, 'type': metric.kind, 'labels': dict(labels), **metric.snapshot()}
+                for (name, labels), metric in items
+            ],
+        }
+
+    def save(self, path):
+        """
+        Write the metrics to `path`: *.prom is rewritten atomically in
+        Prometheus text format, any other path gets one JSON line appended
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._save_lock:
+            if path.endswith('.prom'):
+                tmp_path = path + '.tmp'
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    f.write(self.to_prometheus())
+                os.replace(tmp_path, path)
+            else:
+                with open(path, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(self.to_json()) + '\n')
+
+    def summary(self):
+        """Human-readable digest: where the time, tokens and retries went"""
+        lines = []
+        uptime = time.monotonic() - self.started
+        items, _ = self._sorted()
+        for (name, labels), metric in items:
+            if metric.kind != 'histogram' or not metric.count:
+                continue
+            label_text = ' '.join(f"{value}" for _, value in labels)
+            timing = (f"{_duration(metric.sum)}" if metric.count == 1 else
+                      f"{metric.count} x, mean {_duration(metric.sum / metric.count)}, "
+                      f"p50 ~{_duration(metric.quantile(0.5))}, p95 ~{_duration(metric.quantile(0.95))}")
+            lines.append(f"{name} {label_text}".rstrip() + f": {timing}")
+
+        requests = self.total('llm_requests_total')
+        if requests:
+            lines.append(f"LLM: {self.total('llm_requests_total', outcome='ok')} ok / {requests} calls, "
+                         f"{self.total('llm_retries_total')} retries, "
+                         f"{self.total('llm_requests_total', outcome='throttled')} throttled (429), "
+                         f"{self.total('llm_tokens_total', kind='prompt')} prompt + "
+                         f"{self.total('llm_tokens_total', kind='completion')} completion tokens")
+        for cache in ('feed_cache_total', 'llm_cache_total'):
+            hits, total = self.total(cache, result='hit'), self.total(cache)
+            if total:
+                lines.append(f"{cache}: {hits}/{total} hits ({hits / total:.0%})")
+        stored, labeled = self.total('articles_stored_total'), self.total('articles_labeled_total')
+        if (stored or labeled) and uptime > 0:
+            lines.append(f"Articles: {stored} stored ({stored / uptime:.1f}/s), "
+                         f"{labeled} labeled ({labeled / uptime:.1f}/s) in {uptime:.1f}s")
+        return '\n'.join(f"   {line}" for line in lines)
+
+# Shared by every module of the process
+METRICS = MetricsRegistry()
+
+_profiling = {'output_dir': None, 'engine': 'cprofile'}
+
+def enable_profiling(output_dir, engine='cprofile'):
+    """Profile every profile_stage block from now on ('cprofile' or 'pyinstrument')"""
+    os.makedirs(output_dir, exist_ok=True)
+    _profiling.update(output_dir=output_dir, engine=engine)
+
+def _start_profiler(engine):
+    if engine == 'pyinstrument':
+        try:
+            from pyinstrument import Profiler
+        except ImportError:
+            print("⚠️  pyinstrument is not installed - falling back to cProfile")
+        else:
+            profiler = Profiler()
+            profiler.start()
+            return profiler, 'html'
+
+    import cProfile
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError as e:
+        # Python 3.12+ allows one active cProfile per process (e.g. concurrent pipeline stages)
+        print(f"⚠️  Not profiling this stage: {e}")
+        return None, None
+    return profiler, 'prof'
+
+@contextlib.contextmanager
+def profile_stage(stage):
+    """
+    Time the with-block into stage_seconds{stage}; when profiling is
+    enabled, also profile it (the profiler follows the current thread only,
+    so enter this inside the stage's own thread)
+    """
+    output_dir = _profiling['output_dir']
+    profiler, extension = _start_profiler(_profiling['engine']) if output_dir else (None, None)
+    try:
+        with METRICS.timer('stage_seconds', "Wall time of a pipeline stage", stage=stage):
+            yield
+    finally:
+        if profiler is not None:
+            path = os.path.join(output_dir, f"{stage}-{datetime.now():%Y%m%d-%H%M%S}.{extension}")
+            if extension == 'html':
+                profiler.stop()
+                with open(path, 'w', encoding='utf-8') as f:
+                    f.write(profiler.output_html())
+            else:
+                profiler.disable()
+                profiler.dump_stats(path)
+            print(f"🔬 Profile of the {stage} stage: {path}")
@@ -0,0 +1,388 @@
+"""
+Streaming Pipeline
+Scrape → normalize + dedup → categorize → store in a single process
+
+Each stage runs in its own thread(s) and hands articles to the next one
+through a bounded queue, so:
+- categorization starts with the first parsed feed item instead of waiting
+  for every source to finish
+- memory stays flat however many articles flow through (at most
+  queue_size articles wait between two stages)
+- a full queue blocks the stage feeding it - when the LLM is the bottleneck
+  the scrapers simply slow down (backpressure)
+
+Articles are appended to the store as soon as they pass dedup, and labels
+as soon as they come back, so an interrupted run loses nothing. When a stage
+fails the others stop too (every queue wait polls a shared stop flag) and
+run_pipeline re-raises the error.
+
+Stage timings, LLM latency/tokens/retries and cache hit ratios are collected
+in metrics.METRICS (--metrics FILE exports them, --profile DIR profiles
+every stage).
+
+All files live in one data directory:
+    python scripts/pipeline.py --data-dir data --base-url http://127.0.0.1:8000/v1
+"""
+
+import argparse
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from article_store import ArticleStore, open_store, DEFAULT_STORE_PATH
+from async_categorizer import AdaptiveRateLimiter, categorize_articles
+from categorize_real_articles import MODEL, DEFAULT_CONFIG_PATH, load_api_key
+from dedup_index import DedupIndex, DEFAULT_INDEX_PATH
+from embeddings import ArticleVectors, EMBEDDINGS_DIR
+from feed_cache import FeedCache, DEFAULT_CACHE_PATH as FEED_CACHE_PATH
+from feed_sources import SOURCES, load_sources
+from llm_cache import LLMCache, DEFAULT_CACHE_PATH as LLM_CACHE_PATH
+from local_classifier import route, DEFAULT_THRESHOLD, LOCAL_LABELER
+from metrics import METRICS, enable_profiling, profile_stage
+from scrape_real_news import HostThrottle, create_session, stream_feed
+from text_normalize import normalize_articles
+
+# Resolved from this file, not the working directory
+DEFAULT_DATA_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data'))
+
+# End-of-stream marker passed down the queues
+_DONE = object()
+# Seconds between checks of the stop flag while waiting on a queue
+_POLL = 0.1
+
+class PipelineStopped(Exception):
+    """Raised inside a stage when another stage has failed"""
+
+def data_paths(data_dir):
+    """Locations of the pipeline's files inside data_dir"""
+    return {
+        'store': os.path.join(data_dir, os.path.basename(DEFAULT_STORE_PATH)),
+        'index': os.path.join(data_dir, os.path.basename(DEFAULT_INDEX_PATH)),
+        'feed_cache': os.path.join(data_dir, os.path.basename(FEED_CACHE_PATH)),
+        'llm_cache': os.path.join(data_dir, os.path.basename(LLM_CACHE_PATH)),
+        'seed_csv': os.path.join(data_dir, 'categorized_real_articles.csv'),
+        'embeddings': os.path.join(data_dir, EMBEDDINGS_DIR),
+    }
+
+class PipelineStats:
+    """
+    Thread-safe counters, time each stage spent blocked on a full queue, and
+    the stop flag every stage checks (set with the first stage failure)
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counts = {'scraped': 0, 'new': 0, 'duplicates': 0, 'local': 0, 'llm': 0, 'failed': 0}
+        self.blocked = {}
+        self.started = time.perf_counter()
+        self.stop = threading.Event()
+        self.error = None
+
+    def add(self, key, n=1):
+        with self._lock:
+            self.counts[key] += n
+
+    def fail(self, error):
+        """Keep the first stage failure and stop every stage"""
+        with self._lock:
+            if self.error is None:
+                self.error = error
+        self.stop.set()
+
+    def put(self, q, item, stage):
+        """
+        q.put that records how long `stage` waited for room downstream;
+        raises PipelineStopped instead of waiting on a stage that is gone
+        """
+        start = time.perf_counter()
+        while True:
+            if self.stop.is_set():
+                raise PipelineStopped()
+            try:
+                q.put(item, timeout=_POLL)
+                break
+            except queue.Full:
+                pass
+        waited = time.perf_counter() - start
+        with self._lock:
+            self.blocked[stage] = self.blocked.get(stage, 0.0) + waited
+        METRICS.counter('queue_blocked_seconds_total', "Time a stage waited on a full queue", stage=stage).inc(waited)
+
+def _finish(q, stats):
+    """Pass _DONE downstream, unless the pipeline is stopping and nobody reads it"""
+    while not stats.stop.is_set():
+        try:
+            q.put(_DONE, timeout=_POLL)
+            return
+        except queue.Full:
+            pass
+
+def _batches(q, size, linger, stop):
+    """
+    Group queue items into lists of up to `size`, yielding early when no new
+    item arrives within `linger` seconds; stops at _DONE or once stop is set
+    (the rest of the queue is abandoned)
+    """
+    while True:
+        try:
+            item = q.get(timeout=_POLL)
+        except queue.Empty:
+            if stop.is_set():
+                return
+            continue
+        if item is _DONE or stop.is_set():
+            return
+        batch = [item]
+        deadline = time.monotonic() + linger
+        while len(batch) < size:
+            try:
+                item = q.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                break
+            if item is _DONE:
+                yield batch
+                return
+            batch.append(item)
+        yield batch
+
+def scrape_stage(sources, out, stats, cache=None, min_host_interval=2.0, timeout=10):
+    """Stream every source concurrently into `out`, items in arrival order"""
+    session = create_session(pool_size=len(sources))
+    throttle = HostThrottle(min_host_interval)
+
+    def run(source):
+        print(f"📰 Streaming {source.name} RSS...")
+        try:
+            for article in stream_feed(source, session=session, throttle=throttle,
+                                       timeout=timeout, cache=cache):
+                stats.put(out, article, 'scrape')
+                stats.add('scraped')
+        except PipelineStopped:
+            raise
+        except Exception as e:
+            print(f"✗ {source.name} failed: {e}")
+
+    try:
+        with profile_stage('scrape'), ThreadPoolExecutor(max_workers=len(sources)) as pool:
+            list(pool.map(run, sources))
+    finally:
+        session.close()
+        if cache is not None:
+            cache.save()
+        _finish(out, stats)
+
+def dedup_stage(inbox, out, stats, paths, batch_size=50, linger=0.2):
+    """Normalize micro-batches, drop duplicates, store new articles and pass them on"""
+    # SQLite connections are per thread - open them here
+    index = DedupIndex(paths['index'])
+    store = ArticleStore(paths['store'])
+    try:
+        if len(index) == 0:
+            index.seed_from_csv(paths['seed_csv'])
+        with profile_stage('dedup'):
+            for batch in _batches(inbox, batch_size, linger, stats.stop):
+                new_articles = index.filter_new(normalize_articles(batch))
+                store.append_articles(new_articles)
+                index.register(new_articles)
+                stats.add('new', len(new_articles))
+                stats.add('duplicates', len(batch) - len(new_articles))
+                for article in new_articles:
+                    stats.put(out, article, 'dedup')
+    finally:
+        index.close()
+        store.close()
+        _finish(out, stats)
+
+def label_articles(batch, store, cache, api_key, base_url=None, concurrency=8, rpm=500, tpm=60_000,
+                   batch_size=10, local_threshold=DEFAULT_THRESHOLD, on_labeled=None, limiter=None):
+    """
+    Label a list of article dicts (id, title, description): local rules
+    first, the rest through the async engine (rate limits, retries, LLM
+    cache). Each label or failure is committed to the store as it arrives;
+    on_labeled(article, category) is called for every stored label.
+    Callers labeling batch after batch pass one shared limiter
+    (AdaptiveRateLimiter) so rpm/tpm hold across the calls.
+
+    Returns (labeled locally, labeled by the LLM, failed)
+    """
+    titles = [a['title'] for a in batch]
+    descriptions = [a['description'] or a['title'] for a in batch]
+    labeled = []
+
+    def commit(i, category, labeler):
+        store.append_labels({batch[i]['id']: category}, labeler=labeler)
+        labeled.append(i)
+        if on_labeled is not None:
+            on_labeled(batch[i], category)
+
+    remaining = list(range(len(batch)))
+    if local_threshold is not None:
+        with METRICS.timer('local_classify_seconds', "Local rule classifier, one batch"):
+            confident, categories = route(titles, descriptions, local_threshold)
+        for i in remaining:
+            if confident.iat[i]:
+                commit(i, categories.iat[i], LOCAL_LABELER)
+        remaining = [i for i in remaining if not confident.iat[i]]
+    local_count = len(labeled)
+    if not remaining:
+        return local_count, 0, 0
+
+    failed = []
+
+    def on_result(n, category):
+        if category != 'error':
+            commit(remaining[n], category, MODEL)
+
+    def on_error(n, error):
+        store.record_failure(batch[remaining[n]]['id'], error)
+        failed.append(n)
+
+    categorize_articles(
+        [(titles[i], descriptions[i]) for i in remaining],
+        api_key=api_key, base_url=base_url, concurrency=concurrency, rpm=rpm, tpm=tpm,
+        batch_size=batch_size, cache=cache, on_result=on_result, on_error=on_error, limiter=limiter
+    )
+    return local_count, len(labeled) - local_count, len(failed)
+
+def categorize_stage(inbox, stats, paths, api_key, micro_batch=None, linger=1.0, use_cache=True, **options):
+    """
+    Label micro-batches as they arrive (see label_articles for options),
+    then add the new articles to the similar-article vectors
+
+    micro_batch defaults to enough articles to keep every worker busy
+    (concurrency x batch_size)
+    """
+    micro_batch = micro_batch or options.get('concurrency', 8) * max(1, options.get('batch_size', 10))
+    store = ArticleStore(paths['store'])
+    cache = LLMCache(paths['llm_cache']) if use_cache else None
+    vectors = ArticleVectors(paths['embeddings'])
+    # One rate budget for the whole stage, not a fresh one per micro-batch
+    limiter = AdaptiveRateLimiter(rpm=options.get('rpm', 500), tpm=options.get('tpm', 60_000))
+    try:
+        with profile_stage('categorize'):
+            for batch in _batches(inbox, micro_batch, linger, stats.stop):
+                local_count, llm_count, failed = label_articles(batch, store, cache, api_key,
+                                                                limiter=limiter, **options)
+                stats.add('local', local_count)
+                stats.add('llm', llm_count)
+                stats.add('failed', failed)
+                vectors.update(store)
+    finally:
+        if cache is not None:
+            cache.close()
+        store.close()
+
+def _run_stage(stats, stage, *args, **kwargs):
+    """Thread body: run one stage; its failure stops the others and is kept for run_pipeline"""
+    try:
+        stage(*args, **kwargs)
+    except PipelineStopped:
+        pass
+    except BaseException as e:
+        print(f"❌ {threading.current_thread().name} stage failed: {e!r}")
+        stats.fail(e)
+
+def run_pipeline(api_key, data_dir=DEFAULT_DATA_DIR, sources=None, base_url=None, queue_size=100,
+                 min_host_interval=2.0, concurrency=8, rpm=500, tpm=60_000, batch_size=10,
+                 use_cache=True, local_threshold=DEFAULT_THRESHOLD):
+    """
+    Run scrape → normalize + dedup → categorize → store until every source
+    is exhausted and every new article has been labeled
+
+    queue_size bounds each inter-stage queue. Returns a PipelineStats;
+    if a stage fails, every stage stops and its exception is re-raised.
+    """
+    print("=" * 70)
+    print("STREAMING PIPELINE")
+    print("=" * 70)
+
+    paths = data_paths(data_dir)
+    # First run: pull the legacy CSVs into the store before the stages open it
+    open_store(paths['store'], data_dir=data_dir).close()
+
+    sources = sources or SOURCES
+    stats = PipelineStats()
+    scraped = queue.Queue(maxsize=queue_size)
+    fresh = queue.Queue(maxsize=queue_size)
+
+    threads = [
+        threading.Thread(target=_run_stage, name='scrape',
+                         args=(stats, scrape_stage, sources, scraped, stats, FeedCache(paths['feed_cache']),
+                               min_host_interval)),
+        threading.Thread(target=_run_stage, name='dedup', args=(stats, dedup_stage, scraped, fresh, stats, paths)),
+        threading.Thread(target=_run_stage, name='categorize',
+                         args=(stats, categorize_stage, fresh, stats, paths, api_key),
+                         kwargs=dict(base_url=base_url, concurrency=concurrency, rpm=rpm, tpm=tpm,
+                                     batch_size=batch_size, use_cache=use_cache,
+                                     local_threshold=local_threshold)),
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    if stats.error is not None:
+        raise stats.error
+
+    elapsed = time.perf_counter() - stats.started
+    counts = stats.counts
+    print("\n" + "=" * 70)
+    print("✅ PIPELINE COMPLETE!")
+    print("=" * 70)
+    print(f"📰 Scraped {counts['scraped']} items: {counts['new']} new, {counts['duplicates']} duplicates")
+    print(f"🏷️  Labeled {counts['local'] + counts['llm']} ({counts['local']} locally, {counts['llm']} by the LLM), "
+          f"{counts['failed']} failed")
+    print(f"⏱️  {elapsed:.1f}s ({counts['new'] / elapsed if elapsed else 0:.1f} new articles/s)")
+    for stage, seconds in stats.blocked.items():
+        print(f"   {stage} stage waited {seconds:.1f}s on a full queue")
+    print("📈 Stage metrics:")
+    print(METRICS.summary())
+    print(f"✓ Saved to: {paths['store']}")
+    return stats
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Scrape, categorize and store articles in one streaming run")
+    parser.add_argument('--data-dir', default=DEFAULT_DATA_DIR,
+                        help="directory holding the store and caches (default: the project's data/)")
+    parser.add_argument('--sources', default=None, help="JSON feed registry (default: built-in sources)")
+    parser.add_argument('--queue-size', type=int, default=100, help="articles buffered between two stages")
+    parser.add_argument('--min-host-interval', type=float, default=2.0)
+    parser.add_argument('--batch-size', type=int, default=10, help="articles per prompt (1 = one prompt each)")
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--rpm', type=int, default=500)
+    parser.add_argument('--tpm', type=int, default=60_000)
+    parser.add_argument('--base-url', default=None, help="OpenAI-compatible endpoint (e.g. a local mock)")
+    parser.add_argument('--no-cache', action='store_true', help="bypass the LLM response cache")
+    parser.add_argument('--local-threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help="confidence needed to label an article locally without the LLM")
+    parser.add_argument('--no-local', action='store_true', help="send every article to the LLM")
+    parser.add_argument('--config', default=DEFAULT_CONFIG_PATH,
+                        help="JSON file with openai_api_key (used when OPENAI_API_KEY is unset)")
+    parser.add_argument('--metrics', default=None,
+                        help="write stage metrics here (*.prom: Prometheus text, else JSON lines)")
+    parser.add_argument('--profile', default=None, metavar='DIR', help="profile every stage into DIR")
+    parser.add_argument('--profiler', choices=['cprofile', 'pyinstrument'], default='cprofile')
+    args = parser.parse_args()
+    if args.profile:
+        enable_profiling(args.profile, engine=args.profiler)
+
+    api_key = load_api_key(args.config)
+    if not api_key:
+        print("\n🔑 Enter your OpenAI API key:")
+        api_key = input("API Key: ").strip()
+    
+    if not api_key.startswith('sk-') and args.base_url is None:
+        print("\n❌ Invalid API key!")
+        exit(1)
+    
+    run_pipeline(
+        api_key, data_dir=args.data_dir,
+        sources=load_sources(args.sources) if args.sources else None,
+        base_url=args.base_url, queue_size=args.queue_size, min_host_interval=args.min_host_interval,
+        concurrency=args.concurrency, rpm=args.rpm, tpm=args.tpm, batch_size=args.batch_size,
+        use_cache=not args.no_cache, local_threshold=None if args.no_local else args.local_threshold
+    )
+    if args.metrics:
+        METRICS.save(args.metrics)
+        print(f"✓ Metrics written to: {args.metrics}")
@@ -4,219 +4,327 @@ Tries multiple sources to get real economic articles
 """
 
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
 import pandas as pd
 from datetime import datetime
+from feed_cache import FeedCache, DEFAULT_CACHE_PATH
+from feed_sources import SOURCES
+from dedup_index import DedupIndex, DEFAULT_INDEX_PATH
+from article_store import open_store, DEFAULT_STORE_PATH
+from text_normalize import normalize_articles
+from metrics import METRICS, enable_profiling, profile_stage
+import argparse
+import threading
 import time
 import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor, wait
+from urllib.parse import urlsplit
 
-def scrape_guardian_business():
+def create_session(pool_size=10):
     """
-    Scrape The Guardian Business RSS feed
-    Usually works well!
+    Create one pooled keep-alive session shared by all feed requests
     """
-    print("\n📰 Trying The Guardian Business RSS...")
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+class HostThrottle:
+    """
+    Per-host politeness limiter
+    Requests to the same host are spaced at least min_interval seconds apart,
+    requests to different hosts never wait on each other
+    """
+
+    def __init__(self, min_interval=2.0):
+        self.min_interval = min_interval
+        self._lock = threading.Lock()
+        self._next_slot = {}
+
+    def wait(self, url, deadline_at=None):
+        """
+        Sleep until url's host may be requested again; raises TimeoutError
+        (without taking the slot) when that would be past deadline_at
+        """
+        host = urlsplit(url).netloc
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            if deadline_at is not None and slot >= deadline_at:
+                raise TimeoutError("deadline reached while waiting for the host throttle")
+            self._next_slot[host] = slot + self.min_interval
+        delay = slot - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+def fetch_feed(url, session=None, throttle=None, timeout=10, headers=None, cache=None, stream=False):
+    """
+    GET a feed URL, through the shared session and host throttle when given
+    With a FeedCache the request is conditional and may come back as 304
+    """
+    if throttle is not None:
+        throttle.wait(url)
+    if cache is not None:
+        headers = {**(headers or {}), **cache.conditional_headers(url)}
+    http = session if session is not None else requests
+    response = http.get(url, timeout=timeout, headers=headers, stream=stream)
+    response.raise_for_status()
+    return response
+
+def time_left(timeout, deadline_at=None):
+    """
+    Request timeout capped by the seconds left until deadline_at
+    (a time.monotonic() value); raises TimeoutError once it has passed
+    """
+    if deadline_at is None:
+        return timeout
+    left = deadline_at - time.monotonic()
+    if left <= 0:
+        raise TimeoutError("deadline reached")
+    return min(timeout, left)
+
+def _until(chunks, deadline_at):
+    for chunk in chunks:
+        if deadline_at is not None and time.monotonic() >= deadline_at:
+            raise TimeoutError("deadline reached while reading the feed")
+        yield chunk
+
+# Bytes read from the socket per streamed chunk
+CHUNK_SIZE = 16 * 1024
+
+def iter_feed_items(chunks, source, scraped_date=None):
+    """
+    Shared item-extraction engine for every registered source (generator)
+
+    Feeds XML incrementally from an iterable of byte chunks and yields one
+    article dict per <item> as soon as it is complete. Processed items are
+    dropped from the tree, and nothing more is read once source.max_items
+    items have been seen, so memory stays flat however large the feed is.
+
+    Each <item>'s children are read in a single pass instead of one find()
+    per field, and the scrape timestamp is computed once per batch.
+    """
+    if scraped_date is None:
+        scraped_date = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
     
-    url = "https://www.theguardian.com/business/economics/rss"
-    articles = []
+    parser = ET.XMLPullParser(events=('start', 'end'))
+    parents = []
+    position = 0
     
-    try:
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
+    for chunk in chunks:
+        parser.feed(chunk)
         
-        root = ET.fromstring(response.content)
-        
-        for item in root.findall('.//item')[:15]:
-            title = item.find('title')
-            description = item.find('description')
-            link = item.find('link')
-            pubDate = item.find('pubDate')
+        for event, elem in parser.read_events():
+            if event == 'start':
+                parents.append(elem)
+                continue
+            
+            parents.pop()
+            if elem.tag != 'item':
+                continue
+            
+            article = _build_article(elem, source, scraped_date)
             
-            if title is not None and description is not None:
-                # Clean description (remove HTML tags)
-                desc_text = description.text
-                if desc_text:
-                    soup = BeautifulSoup(desc_text, 'html.parser')
-                    clean_desc = soup.get_text()
-                else:
-                    clean_desc = ""
-                
-                article = {
-                    'title': title.text if title.text else '',
-                    'description': clean_desc[:300],
-                    'content': clean_desc,
-                    'link': link.text if link is not None and link.text else '',
-                    'date': pubDate.text if pubDate is not None and pubDate.text else '',
-                    'source': 'The Guardian',
-                    'scraped_date': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                }
-                articles.append(article)
+            # Free the finished item (and its children) right away
+            if parents:
+                parents[-1].remove(elem)
+            
+            if article is not None:
                 print(f"  ✓ Got: {article['title'][:60]}...")
-        
-        print(f"✓ Successfully scraped {len(articles)} articles from The Guardian!")
-        return articles
-        
-    except Exception as e:
-        print(f"✗ The Guardian failed: {e}")
-        return []
+                yield article
+            
+            position += 1
+            if position >= source.max_items:
+                return
+    
+    parser.close()
 
-def scrape_ft_economics():
+def _build_article(item, source, scraped_date):
     """
-    Try Financial Times RSS
+    Turn one <item> element into an article dict (None if it should be skipped)
+    The description is kept raw - normalize_articles cleans the whole batch at once
     """
-    print("\n📰 Trying Financial Times RSS...")
+    fields = {}
+    for child in item:
+        fields.setdefault(child.tag, child.text)
     
-    url = "https://www.ft.com/economics?format=rss"
-    articles = []
+    if 'title' not in fields:
+        return None
+    if source.require_description and 'description' not in fields:
+        return None
     
-    try:
-        response = requests.get(url, timeout=10, headers={
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        })
-        response.raise_for_status()
-        
-        root = ET.fromstring(response.content)
-        
-        for item in root.findall('.//item')[:15]:
-            title = item.find('title')
-            description = item.find('description')
-            link = item.find('link')
-            pubDate = item.find('pubDate')
-            
-            if title is not None:
-                article = {
-                    'title': title.text if title.text else '',
-                    'description': description.text[:300] if description is not None and description.text else '',
-                    'content': description.text if description is not None and description.text else '',
-                    'link': link.text if link is not None and link.text else '',
-                    'date': pubDate.text if pubDate is not None and pubDate.text else '',
-                    'source': 'Financial Times',
-                    'scraped_date': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                }
-                articles.append(article)
-                print(f"  ✓ Got: {article['title'][:60]}...")
-        
-        print(f"✓ Successfully scraped {len(articles)} articles from FT!")
-        return articles
-        
-    except Exception as e:
-        print(f"✗ Financial Times failed: {e}")
-        return []
+    title = fields['title'] or ''
+    desc_text = fields.get('description') or ''
+    
+    content_text = desc_text
+    if not content_text and source.title_as_content:
+        content_text = fields['title']
+    
+    return {
+        'title': title,
+        'description': desc_text,
+        'content': content_text,
+        'link': fields.get('link') or '',
+        'date': fields.get('pubDate') or '',
+        'source': (fields.get(source.source_tag) if source.source_tag else None) or source.name,
+        'scraped_date': scraped_date
+    }
 
-def scrape_reuters_business():
+def parse_feed(content, source, scraped_date=None):
+    """
+    Parse a complete, already downloaded feed body
     """
-    Try Reuters RSS
+    return list(iter_feed_items([content], source, scraped_date))
+
+def stream_feed(source, session=None, throttle=None, timeout=10, cache=None, deadline_at=None):
     """
-    print("\n📰 Trying Reuters Business RSS...")
+    Fetch one registered FeedSource as a streamed response and yield its
+    articles while the body is still downloading
+
+    The socket is closed as soon as the item cap is reached (or the caller
+    stops iterating), so the rest of a large feed is never read.
+
+    With deadline_at (a time.monotonic() value) the request timeout is
+    capped by the time left, the body is abandoned with TimeoutError once
+    the deadline passes, and a feed finished late is not cached.
     
-    url = "https://www.reutersagency.com/feed/?taxonomy=best-topics&post_type=best"
-    articles = []
+    Metrics per source: fetch time (to response headers, throttle wait
+    excluded), parse time (body download + XML parsing, time the caller
+    spends between items excluded), items, errors and feed cache hits.
+    """
+    url = source.url
+    if throttle is not None:
+        throttle.wait(url, deadline_at)
+    try:
+        with METRICS.timer('feed_fetch_seconds', "Feed request time to response headers", source=source.name):
+            response = fetch_feed(url, session=session, timeout=time_left(timeout, deadline_at),
+                                  headers=source.headers, cache=cache, stream=True)
+    except Exception:
+        METRICS.counter('feed_errors_total', "Feed requests or parses that failed", source=source.name).inc()
+        raise
     
     try:
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
+        if cache is not None:
+            cached = cache.lookup(url, response)
+            METRICS.counter('feed_cache_total', "Conditional GETs by result",
+                            result='miss' if cached is None else 'hit').inc()
+            if cached is not None:
+                print(f"✓ Feed unchanged - reused {len(cached)} cached articles from {source.name}")
+                yield from cached
+                return
         
-        root = ET.fromstring(response.content)
+        articles = []
+        parse_seconds = 0.0
+        start = time.perf_counter()
+        for article in iter_feed_items(_until(response.iter_content(CHUNK_SIZE), deadline_at), source):
+            parse_seconds += time.perf_counter() - start
+            articles.append(article)
+            yield article
+            start = time.perf_counter()
+        parse_seconds += time.perf_counter() - start
+        METRICS.histogram('feed_parse_seconds', "Feed body download + parse time",
+                          source=source.name).observe(parse_seconds)
+        METRICS.counter('feed_items_total', "Articles parsed from feeds", source=source.name).inc(len(articles))
         
-        for item in root.findall('.//item')[:15]:
-            title = item.find('title')
-            description = item.find('description')
-            link = item.find('link')
-            pubDate = item.find('pubDate')
-            
-            if title is not None:
-                article = {
-                    'title': title.text if title.text else '',
-                    'description': description.text[:300] if description is not None and description.text else '',
-                    'content': description.text if description is not None and description.text else '',
-                    'link': link.text if link is not None and link.text else '',
-                    'date': pubDate.text if pubDate is not None and pubDate.text else '',
-                    'source': 'Reuters',
-                    'scraped_date': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                }
-                articles.append(article)
-                print(f"  ✓ Got: {article['title'][:60]}...")
-        
-        print(f"✓ Successfully scraped {len(articles)} articles from Reuters!")
-        return articles
-        
-    except Exception as e:
-        print(f"✗ Reuters failed: {e}")
-        return []
+        if cache is not None and (deadline_at is None or time.monotonic() < deadline_at):
+            cache.store(url, response, articles)
+    except Exception:
+        METRICS.counter('feed_errors_total', "Feed requests or parses that failed", source=source.name).inc()
+        raise
+    finally:
+        response.close()
 
-def scrape_google_news():
+def scrape_source(source, session=None, throttle=None, timeout=10, cache=None, deadline_at=None):
     """
-    Google News RSS - Economics topic
-    Usually reliable!
+    Fetch and parse one registered FeedSource
     """
-    print("\n📰 Trying Google News RSS...")
-    
-    url = "https://news.google.com/rss/search?q=economics+when:7d&hl=en-US&gl=US&ceid=US:en"
-    articles = []
+    print(f"\n📰 Trying {source.name} RSS...")
     
     try:
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-        
-        root = ET.fromstring(response.content)
-        
-        for item in root.findall('.//item')[:20]:
-            title = item.find('title')
-            description = item.find('description')
-            link = item.find('link')
-            pubDate = item.find('pubDate')
-            source_elem = item.find('source')
-            
-            if title is not None:
-                article = {
-                    'title': title.text if title.text else '',
-                    'description': description.text[:300] if description is not None and description.text else '',
-                    'content': description.text if description is not None and description.text else title.text,
-                    'link': link.text if link is not None and link.text else '',
-                    'date': pubDate.text if pubDate is not None and pubDate.text else '',
-                    'source': source_elem.text if source_elem is not None and source_elem.text else 'Google News',
-                    'scraped_date': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                }
-                articles.append(article)
-                print(f"  ✓ Got: {article['title'][:60]}...")
-        
-        print(f"✓ Successfully scraped {len(articles)} articles from Google News!")
+        articles = list(stream_feed(source, session=session, throttle=throttle,
+                                    timeout=timeout, cache=cache, deadline_at=deadline_at))
+        print(f"✓ Successfully scraped {len(articles)} articles from {source.name}!")
         return articles
         
     except Exception as e:
-        print(f"✗ Google News failed: {e}")
+        print(f"✗ {source.name} failed: {e}")
         return []
 
-def scrape_all_sources():
+@profile_stage('scrape')
+def scrape_all_sources(sources=None, max_articles=30, deadline=30, min_host_interval=2.0,
+                       max_workers=None, session=None, cache=None):
     """
-    Try all sources and combine results
+    Fetch all registered sources concurrently and combine results
+
+    Every feed is requested in parallel over one pooled keep-alive session,
+    so a run takes as long as the slowest feed instead of the sum of all of
+    them. Politeness is enforced per host (min_host_interval seconds between
+    requests to the same host) and the whole run is bounded by `deadline`
+    seconds - sources still pending at the deadline are dropped. Every
+    request's timeout is capped by the time left, and a fetch still running
+    at the deadline gives up at its next chunk (a stalled read within its
+    timeout), so the pool drains before the cache is saved and the session
+    closed.
+
+    Results are combined in priority order, stopping once max_articles is
+    reached (None = keep everything).
+    
+    With a FeedCache, unchanged feeds are revalidated with a conditional GET
+    and served from the cache; hit/miss counts are reported at the end.
+    
+    Descriptions come back normalized (text_normalize): tags, entities and
+    tracking URLs stripped, truncated on a token budget.
+    
+    Timed (and optionally profiled) as the 'scrape' stage, see metrics.
     """
     print("=" * 70)
     print("REAL ECONOMIC NEWS SCRAPER")
     print("=" * 70)
     print("\nTrying multiple sources...")
     
-    all_articles = []
+    sources = sources or SOURCES
+    own_session = session is None
+    if own_session:
+        session = create_session(pool_size=len(sources))
+    throttle = HostThrottle(min_host_interval)
+    deadline_at = time.monotonic() + deadline
     
-    # Try each source
-    sources = [
-        scrape_google_news,      # Try Google News first (most reliable)
-        scrape_guardian_business, # Then Guardian
-        scrape_reuters_business,  # Then Reuters
-        scrape_ft_economics       # Finally FT
+    pool = ThreadPoolExecutor(max_workers=max_workers or len(sources))
+    futures = [
+        pool.submit(scrape_source, source, session=session, throttle=throttle,
+                    timeout=10, cache=cache, deadline_at=deadline_at)
+        for source in sources
     ]
+    done, pending = wait(futures, timeout=deadline)
+    # Stragglers stop on their own at the deadline; wait for them so nothing
+    # still uses the session or writes to the cache after this point
+    pool.shutdown(wait=True, cancel_futures=True)
     
-    for scraper in sources:
-        articles = scraper()
-        all_articles.extend(articles)
-        time.sleep(2)  # Be polite - wait between requests
+    if pending:
+        print(f"\n⏱️  Deadline of {deadline}s reached - dropped {len(pending)} slow source(s)")
+    
+    all_articles = []
+    
+    for future in futures:
+        if future not in done:
+            continue
+        all_articles.extend(future.result())
         
         # If we have enough articles, stop
-        if len(all_articles) >= 30:
+        if max_articles is not None and len(all_articles) >= max_articles:
             break
     
+    if own_session:
+        session.close()
+    
+    all_articles = normalize_articles(all_articles)
+    
     print("\n" + "=" * 70)
     print(f"TOTAL ARTICLES COLLECTED: {len(all_articles)}")
+    if cache is not None:
+        cache.save()
+        print(cache.summary())
     print("=" * 70)
     
     if len(all_articles) == 0:
@@ -229,23 +337,37 @@ def scrape_all_sources():
     
     return all_articles
 
-def save_articles(articles, filename='../data/scraped_articles.csv'):
+def save_articles(articles, store, index=None):
     """
-    Save scraped articles to CSV
+    Append scraped articles to the article store
+    
+    With a DedupIndex only articles never seen before are saved, each with a
+    stable id that continues from previous runs.
     """
     if not articles:
         print("\n❌ No articles to save!")
         return
     
+    if index is not None:
+        scraped = len(articles)
+        articles = index.filter_new(articles)
+        print(f"\n🧹 Dedup: {len(articles)} new / {scraped - len(articles)} already seen")
+        if not articles:
+            print("\n✓ Nothing new since the last run")
+            return
+    
     df = pd.DataFrame(articles)
     
     # Clean up and standardize
-    df['id'] = ['R' + str(i+1).zfill(3) for i in range(len(df))]
+    if index is None:
+        df['id'] = ['R' + str(i+1).zfill(3) for i in range(len(df))]
     df = df[['id', 'title', 'description', 'content', 'source', 'date', 'link', 'scraped_date']]
     
     # Save
-    df.to_csv(filename, index=False)
-    print(f"\n✓ Saved {len(articles)} articles to: {filename}")
+    store.append_articles(df.to_dict('records'))
+    if index is not None:
+        index.register(articles)
+    print(f"\n✓ Saved {len(articles)} articles to: {store.path}")
     
     # Print summary
     print("\n" + "=" * 70)
@@ -259,18 +381,33 @@ def save_articles(articles, filename='../data/scraped_articles.csv'):
     return df
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Scrape economic news from every registered feed")
+    parser.add_argument('--metrics', default=None,
+                        help="write stage metrics here (*.prom: Prometheus text, else JSON lines)")
+    parser.add_argument('--profile', default=None, metavar='DIR', help="profile the scrape into DIR")
+    parser.add_argument('--profiler', choices=['cprofile', 'pyinstrument'], default='cprofile')
+    args = parser.parse_args()
+    if args.profile:
+        enable_profiling(args.profile, engine=args.profiler)
+    
     print("\n🚀 Starting Real News Scraper...")
     print("This will try multiple sources to get real economic articles")
     
-    # Scrape articles
-    articles = scrape_all_sources()
+    # Scrape articles (unchanged feeds are served from the conditional GET cache)
+    articles = scrape_all_sources(cache=FeedCache(DEFAULT_CACHE_PATH))
     
-    # Save results
+    # Save results - only stories not seen in earlier runs
     if articles:
-        df = save_articles(articles)
+        store = open_store(DEFAULT_STORE_PATH)
+        index = DedupIndex(DEFAULT_INDEX_PATH)
+        if len(index) == 0:
+            index.seed_from_csv('../data/categorized_real_articles.csv')
+        df = save_articles(articles, store, index=index)
+        index.close()
+        store.close()
         print("\n✅ Scraping complete!")
         print("\nNext steps:")
-        print("1. Check: data/scraped_articles.csv")
+        print("1. Check: data/articles.sqlite")
         print("2. Run LLM categorization on these real articles")
         print("3. Build dashboard to visualize results")
     else:
@@ -278,3 +415,9 @@ if __name__ == "__main__":
         print("1. Check your internet connection")
         print("2. Try running again later")
         print("3. Consider using NewsAPI as backup")
+    
+    print("\n📈 Stage metrics:")
+    print(METRICS.summary())
+    if args.metrics:
+        METRICS.save(args.metrics)
+        print(f"✓ Metrics written to: {args.metrics}")
@@ -0,0 +1,84 @@
+"""
+Text Normalization Stage
+Cleans a whole batch of descriptions at once with compiled regexes
+(no per-item HTML parser):
+
+- strips tags (including a tag cut in half by an upstream truncation),
+  HTML entities and URLs (Google News descriptions are mostly anchor markup
+  around a tracking link)
+- collapses whitespace
+- truncates descriptions on an estimated token budget, at a word boundary
+- falls back to the title when the description only echoes it
+"""
+
+import html
+import re
+
+import pandas as pd
+
+# Prompt budget for one description (~4 characters per token)
+DESCRIPTION_TOKEN_BUDGET = 80
+
+# Only real tag shapes (a letter or '/' after '<'), so '5% < 6%' survives;
+# the second alternative is a tag cut off by truncation at the very end
+_TAG = re.compile(r'</?[A-Za-z][^>]*>|</?[A-Za-z][^>]*$')
+_URL = re.compile(r'https?://\S+|www\.\S+')
+_SPACE = re.compile(r'\s+')
+_KEY = re.compile(r'[\W_]+')
+
+def estimate_tokens(text):
+    """Rough token count (~4 characters per token)"""
+    return len(text) // 4 + 1
+
+def clean_series(texts):
+    """Strip tags, entities and URLs from a Series of HTML snippets"""
+    texts = pd.Series(texts, dtype='object').fillna('').astype(str)
+    # Tags are stripped before unescaping only - an unescaped '&lt;' is text, not markup
+    texts = texts.str.replace(_TAG, ' ', regex=True).map(html.unescape)
+    texts = texts.str.replace(_URL, ' ', regex=True)
+    return texts.str.replace(_SPACE, ' ', regex=True).str.strip()
+
+def truncate_tokens(text, budget=DESCRIPTION_TOKEN_BUDGET):
+    """Cut text to roughly `budget` tokens, at a word boundary"""
+    limit = budget * 4
+    if len(text) <= limit:
+        return text
+    cut = text.rfind(' ', 0, limit)
+    return text[:cut if cut > 0 else limit].rstrip(' ,;:-') + '…'
+
+def _echoes(title_key, description_key):
+    if not description_key:
+        return True
+    if title_key.startswith(description_key):
+        return True
+    # "<title> <publisher>" - the description adds nothing but the source name
+    return description_key.startswith(title_key) and len(description_key) - len(title_key) <= 40
+
+def normalize_frame(df, budget=DESCRIPTION_TOKEN_BUDGET):
+    """
+    Normalize the 'description' (and 'content', if present) columns of a batch
+
+    description -> clean text within the token budget, or the title when the
+                   original only repeats the headline
+    content     -> clean full text
+    """
+    df = df.copy()
+    titles = df['title'].fillna('').astype(str)
+    descriptions = clean_series(df['description'])
+
+    title_keys = titles.str.lower().str.replace(_KEY, '', regex=True)
+    description_keys = descriptions.str.lower().str.replace(_KEY, '', regex=True)
+    echo = [_echoes(t, d) for t, d in zip(title_keys, description_keys)]
+
+    df['description'] = descriptions.where(~pd.Series(echo, index=df.index), titles).map(
+        lambda text: truncate_tokens(text, budget)
+    )
+    if 'content' in df:
+        df['content'] = clean_series(df['content'])
+    return df
+
+def normalize_articles(articles, budget=DESCRIPTION_TOKEN_BUDGET):
+    """normalize_frame for a list of article dicts"""
+    if not articles:
+        return articles
+    return normalize_frame(pd.DataFrame(articles), budget).to_dict('records')
@@ -0,0 +1,78 @@
+"""
+Store bookkeeping: the label ledger (latest label wins), the dead-letter
+list of articles that keep failing, and the aggregate counts kept in step
+with every label
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+from article_store import ArticleStore
+
+def _articles():
+    return [
+        {'id': 'R001', 'title': 'CPI cools', 'description': 'Prices rose less.', 'source': 'Wire',
+         'date': 'Wed, 17 Dec 2025 12:00:00 GMT', 'link': 'https://wire.example.com/1',
+         'scraped_date': '2025-12-17 13:00:00'},
+        {'id': 'R002', 'title': 'Fed holds rates', 'description': 'No change.', 'source': 'Wire',
+         'date': 'Thu, 18 Dec 2025 12:00:00 GMT', 'link': 'https://wire.example.com/2',
+         'scraped_date': '2025-12-18 13:00:00'},
+        {'id': 'R003', 'title': 'Jobs report beats', 'description': 'Payrolls up.', 'source': 'Paper',
+         'date': 'Thu, 18 Dec 2025 15:00:00 GMT', 'link': 'https://paper.example.org/3',
+         'scraped_date': '2025-12-18 16:00:00'},
+    ]
+
+def _store(tmp_path):
+    store = ArticleStore(str(tmp_path / 'articles.sqlite'))
+    assert store.append_articles(_articles()) == 3
+    assert store.append_articles(_articles()[:1]) == 0  # ids already stored are skipped
+    return store
+
+def _counts(store, by):
+    return {tuple(row[:-1]): row[-1] for row in store.aggregate(by).itertuples(index=False)}
+
+def test_latest_label_wins(tmp_path):
+    store = _store(tmp_path)
+    store.append_labels({'R001': 'general_economics', 'R002': 'monetary_policy'}, labeler='local-rules')
+    store.append_labels({'R001': 'inflation'}, labeler='gpt-3.5-turbo')
+
+    df = store.read(['id', 'llm_category'], labeled=True).set_index('id')
+    assert df['llm_category'].to_dict() == {'R001': 'inflation', 'R002': 'monetary_policy'}
+    assert store.read(['id'], labeled=False)['id'].tolist() == ['R003']
+    assert store.read(['id'], labeled=True, labelers=['local-rules'])['id'].tolist() == ['R002']
+    store.close()
+
+def test_repeat_failures_become_dead_letters(tmp_path):
+    store = _store(tmp_path)
+    for attempt in range(3):
+        store.record_failure('R002', f"timeout {attempt}")
+    store.record_failure('R003', "bad reply")
+    store.append_labels({'R003': 'error'})
+
+    dead = store.dead_letters(max_attempts=3)
+    assert dead[['id', 'attempts', 'last_error']].values.tolist() == [['R002', 3, 'timeout 2']]
+    # Still to label: R001, and R003 (an 'error' label) - R002 is left out as a dead letter
+    assert store.read(['id'], labeled=False, max_attempts=3)['id'].tolist() == ['R001', 'R003']
+
+    # A label clears the failure count
+    store.append_labels({'R002': 'monetary_policy'})
+    assert store.dead_letters(max_attempts=1).empty
+    store.close()
+
+def test_aggregates_follow_relabels(tmp_path):
+    store = _store(tmp_path)
+    store.append_labels({'R001': 'inflation', 'R002': 'inflation', 'R003': 'error'})
+    assert _counts(store, 'llm_category') == {('inflation',): 2}
+    assert _counts(store, ['day', 'source']) == {('2025-12-17', 'Wire'): 1, ('2025-12-18', 'Wire'): 1}
+
+    store.append_labels({'R002': 'monetary_policy', 'R003': 'employment'})
+    assert _counts(store, 'llm_category') == {('inflation',): 1, ('monetary_policy',): 1, ('employment',): 1}
+    assert _counts(store, 'source') == {('Wire',): 2, ('Paper',): 1}
+
+    # The bulk path recomputes the same counts
+    store.relabel({'R001': 'employment', 'R002': 'employment'})
+    assert _counts(store, 'llm_category') == {('employment',): 3}
+    assert store.aggregate('day', since='2025-12-18')['n'].tolist() == [2]
+    store.close()
@@ -0,0 +1,30 @@
+"""
+Parsing of batched replies: valid items are kept per id, anything else is
+left out so the categorizer re-splits and retries it
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+from categorize_real_articles import parse_batch_response, parse_category
+
+def test_parse_batch_response_keeps_valid_items():
+    reply = ('Here you go:\n```json\n[{"id": "1", "category": "Inflation"},\n'
+             ' {"id": 2, "category": "employment"}]\n```')
+    assert parse_batch_response(reply, ['1', '2']) == {'1': 'inflation', '2': 'employment'}
+
+def test_parse_batch_response_drops_unknown_ids_and_labels():
+    reply = ('[{"id": "1", "category": "weather"}, {"id": "9", "category": "inflation"}, '
+             '"3: inflation", {"id": "2", "category": "monetary_policy"}]')
+    assert parse_batch_response(reply, ['1', '2', '3']) == {'2': 'monetary_policy'}
+
+def test_parse_batch_response_without_an_array():
+    assert parse_batch_response('inflation', ['1']) == {}
+    assert parse_batch_response('[{"id": "1", "category": ', ['1']) == {}
+    assert parse_batch_response(None, ['1']) == {}
+
+def test_parse_category_falls_back_to_general_economics():
+    assert parse_category(' Inflation\n') == 'inflation'
+    assert parse_category('not a category') == 'general_economics'
@@ -0,0 +1,82 @@
+"""
+Near-duplicate decisions of the cross-run dedup index, on articles shaped
+the way the scraper and the normalization stage hand them over
+"""
+
+import os
+import sys
+from xml.sax.saxutils import escape
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+from dedup_index import DedupIndex
+from feed_sources import SOURCES
+from scrape_real_news import parse_feed
+from text_normalize import normalize_articles
+
+def _google_news_item(n, title, publisher, date):
+    """One Google News <item>: the description is the headline anchor plus the publisher"""
+    link = f"https://news.google.com/rss/articles/CBMi{n}?oc=5"
+    description = (f'<a href="{link}" target="_blank">{title}</a>'
+                   f'&nbsp;&nbsp;<font color="#6f6f6f">{publisher}</font>')
+    return (f"<item><title>{escape(title)} - {escape(publisher)}</title><link>{link}</link>"
+            f"<pubDate>{date}</pubDate><description>{escape(description)}</description>"
+            f'<source url="https://example.com">{escape(publisher)}</source></item>')
+
+def _google_news(items):
+    feed = '<rss><channel>' + ''.join(_google_news_item(n, *item) for n, item in enumerate(items)) + '</channel></rss>'
+    return normalize_articles(parse_feed(feed.encode('utf-8'), SOURCES[0]))
+
+def _article(title, description, link, date='Wed, 17 Dec 2025 12:00:00 GMT', source='Wire'):
+    return {'title': title, 'description': description, 'link': link, 'date': date,
+            'source': source, 'scraped_date': '2025-12-17 12:00:00'}
+
+def test_google_news_headlines_differing_by_one_word_are_kept(tmp_path):
+    index = DedupIndex(str(tmp_path / 'index.sqlite'))
+    articles = _google_news([
+        ("Fed holds interest rates steady as inflation cools", "Reuters", "Wed, 17 Dec 2025 19:00:00 GMT"),
+        ("ECB holds interest rates steady as inflation cools", "Reuters", "Thu, 18 Dec 2025 13:00:00 GMT"),
+        ("Stock market today: Dow, S&P 500 and Nasdaq fall", "Yahoo Finance", "Tue, 16 Dec 2025 21:00:00 GMT"),
+        ("Stock market today: Dow, S&P 500 and Nasdaq rise", "Yahoo Finance", "Wed, 17 Dec 2025 21:00:00 GMT"),
+        # Same headline from another outlet - the title fingerprint catches it
+        ("Fed holds interest rates steady as inflation cools", "CNBC", "Wed, 17 Dec 2025 20:00:00 GMT"),
+    ])
+    new = index.filter_new(articles)
+    assert [article['title'] for article in new] == [article['title'] for article in articles[:4]]
+    index.close()
+
+def test_syndicated_story_is_a_duplicate(tmp_path):
+    index = DedupIndex(str(tmp_path / 'index.sqlite'))
+    description = ("The central bank left its benchmark rate unchanged on Wednesday and signalled "
+                   "that borrowing costs would stay high until inflation is back near target.")
+    first = _article("Central bank leaves rates unchanged", description, 'https://wire.example.com/a/1')
+    syndicated = _article("Central bank leaves rates unchanged, signals patience",
+                          description.replace('Wednesday', 'Wed.'), 'https://paper.example.org/economy/42')
+    assert len(index.filter_new([first, syndicated])) == 1
+    index.close()
+
+def test_recurring_headline_outside_window_is_new(tmp_path):
+    index = DedupIndex(str(tmp_path / 'index.sqlite'))
+    monday = _article("Stock market today", "", 'https://markets.example.com/1', date='Mon, 08 Dec 2025 21:00:00 GMT')
+    index.register(index.filter_new([monday]))
+    next_week = _article("Stock market today", "", 'https://markets.example.com/2', date='Mon, 15 Dec 2025 21:00:00 GMT')
+    same_day = _article("Stock market today", "", 'https://markets.example.com/3', date='Mon, 08 Dec 2025 22:00:00 GMT')
+    assert len(index.filter_new([next_week])) == 1
+    assert index.filter_new([same_day]) == []
+    index.close()
+
+def test_only_registered_articles_are_remembered(tmp_path):
+    path = str(tmp_path / 'index.sqlite')
+    index = DedupIndex(path)
+    article = _article("Jobless claims fall", "Fewer Americans filed for benefits.", 'https://wire.example.com/a/2')
+    assert len(index.filter_new([article])) == 1
+    # Not registered (the store write failed) - the next batch sees it as new again
+    new = index.filter_new([article])
+    assert len(new) == 1
+    index.register(new)
+    index.close()
+
+    index = DedupIndex(path)
+    assert len(index) == 1
+    assert index.filter_new([article]) == []
+    index.close()
@@ -0,0 +1,42 @@
+"""
+Refit trigger of the similar-article vectors: the SVD is refitted (new
+generation, every article re-embedded) once the store has doubled since the
+last fit, and new articles are only embedded incrementally before that
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+from article_store import ArticleStore
+from embeddings import ArticleVectors
+
+TOPICS = ['inflation eases as prices cool', 'central bank holds interest rates',
+          'unemployment rate ticks up', 'oil prices jump after supply cut']
+
+def _articles(start, stop):
+    return [
+        {'id': f'T{i}', 'title': f"{TOPICS[i % len(TOPICS)]} ({i})",
+         'description': f"Analysts react to story {i} about {TOPICS[(i + 1) % len(TOPICS)]}.",
+         'source': 'Test', 'scraped_date': '2026-01-01 00:00:00'}
+        for i in range(start, stop)
+    ]
+
+def test_refit_when_store_doubles(tmp_path):
+    store = ArticleStore(str(tmp_path / 'articles.sqlite'))
+    vectors = ArticleVectors(str(tmp_path / 'embeddings'))
+    store.append_articles(_articles(0, 100))
+    assert vectors.update(store) == 100
+    assert vectors.version() == (1, 100)
+
+    # Just under 2x the 100 the model was fitted on: new rows only, same generation
+    store.append_articles(_articles(100, 199))
+    assert vectors.update(store) == 99
+    assert vectors.version() == (1, 199)
+
+    # 2x: refit and re-embed everything
+    store.append_articles(_articles(199, 200))
+    assert vectors.update(store) == 200
+    assert vectors.version() == (2, 200)
+    store.close()
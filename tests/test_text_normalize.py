@@ -0,0 +1,45 @@
+"""
+Batch text normalization: tag/entity/URL stripping, the echo fallback to
+the title and the token-budget truncation
+"""
+
+import os
+import sys
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+from text_normalize import clean_series, normalize_frame
+
+def test_clean_series_keeps_escaped_text():
+    cleaned = clean_series([
+        '<p>Inflation fell to &lt; 3% in May, below forecasts</p>',
+        'Rates: 5% &lt; 6% &gt; 4%',
+        'a < b',
+    ])
+    assert cleaned.tolist() == ['Inflation fell to < 3% in May, below forecasts', 'Rates: 5% < 6% > 4%', 'a < b']
+
+def test_clean_series_strips_markup_urls_and_cut_tags():
+    cleaned = clean_series([
+        '<a href="https://news.google.com/rss/articles/CBMi1?oc=5">Oil jumps</a>&nbsp;&nbsp;<font color="#6f6f6f">Reuters</font>',
+        'Read more at https://example.com/story?id=1 <img src="https://exa',
+        None,
+    ])
+    assert cleaned.tolist() == ['Oil jumps Reuters', 'Read more at', '']
+
+def test_normalize_frame_falls_back_to_title_and_truncates():
+    df = pd.DataFrame({
+        'title': ['Oil jumps', 'Jobs report beats forecasts', 'Wages rise'],
+        'description': [
+            '<a href="https://x.example/1">Oil jumps</a>&nbsp;&nbsp;<font>Reuters</font>',
+            '',
+            'Average hourly earnings ' * 40,
+        ],
+    })
+    out = normalize_frame(df, budget=10)
+    assert out['description'].tolist()[:2] == ['Oil jumps', 'Jobs report beats forecasts']
+    assert out['description'][2].endswith('…')
+    assert len(out['description'][2]) <= 10 * 4 + 1
+    # The input frame is left alone
+    assert df['description'][1] == ''